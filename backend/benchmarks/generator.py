@@ -0,0 +1,146 @@
+"""
+Seeded generator of realistic Kubernetes manifests for benchmarks.
+
+    from benchmarks.generator import generate_documents, generate_yaml
+    docs = generate_documents(count=1000, seed=42, containers=3, violation_rate=0.2)
+
+The same seed and parameters always produce the same documents.  Workloads
+draw sidecars from a small shared pool, as real charts do, so repeated
+container blocks show up like they would in a monorepo.
+"""
+from typing import Any, Dict, List, Optional
+import random
+
+import yaml
+
+try:
+    from yaml import CSafeDumper as _Dumper
+except ImportError:  # pragma: no cover - depends on the PyYAML build
+    _Dumper = yaml.SafeDumper
+
+DEFAULT_MIX = {
+    "Deployment": 35,
+    "StatefulSet": 8,
+    "Pod": 12,
+    "Service": 20,
+    "ConfigMap": 15,
+    "Secret": 10,
+}
+
+WORKLOAD_KINDS = {"Deployment", "StatefulSet"}
+
+_APPS = ["api", "web", "worker", "billing", "search", "auth", "cart", "ledger", "gateway", "metrics"]
+_IMAGES = ["nginx", "redis", "postgres", "python", "node", "golang", "envoyproxy/envoy",
+           "registry.example.com:5000/team/app", "ghcr.io/acme/service"]
+_SIDECARS = [
+    {"name": "istio-proxy", "image": "docker.io/istio/proxyv2:1.20.1"},
+    {"name": "fluent-bit", "image": "fluent/fluent-bit:2.2"},
+    {"name": "vault-agent", "image": "hashicorp/vault:1.15"},
+]
+_CONFIG_KEYS = ["LOG_LEVEL", "FEATURE_FLAGS", "TIMEOUT", "REGION", "CACHE_TTL"]
+_SUSPICIOUS_KEYS = ["DB_PASSWORD", "api_token", "SECRET_KEY"]
+
+
+class _Gen:
+    def __init__(self, seed: int, containers: int, violation_rate: float):
+        self.rng = random.Random(seed)
+        self.containers = containers
+        self.p = violation_rate
+
+    def violate(self) -> bool:
+        return self.rng.random() < self.p
+
+    def metadata(self, kind: str, i: int, app: str) -> Dict[str, Any]:
+        md: Dict[str, Any] = {"name": f"{app}-{kind.lower()}-{i}", "namespace": self.rng.choice(["default", "prod", "staging"])}
+        if not self.violate():
+            md["labels"] = {"app": app, "tier": self.rng.choice(["frontend", "backend"])}
+        if self.violate() and self.rng.random() < 0.2:
+            del md["name"]
+        return md
+
+    def image(self) -> str:
+        base = self.rng.choice(_IMAGES)
+        if self.violate():
+            return self.rng.choice([base, f"{base}:latest"])
+        return f"{base}:{self.rng.randint(1, 20)}.{self.rng.randint(0, 9)}"
+
+    def container(self, app: str, n: int) -> Dict[str, Any]:
+        c: Dict[str, Any] = {"name": f"{app}-{n}", "image": self.image(),
+                             "ports": [{"containerPort": 8000 + n}]}
+        sc: Dict[str, Any] = {}
+        if self.violate():
+            sc["privileged"] = True
+        if self.violate():
+            sc["runAsUser"] = 0
+        else:
+            sc["runAsNonRoot"] = True
+            sc["runAsUser"] = 1000 + n
+        c["securityContext"] = sc
+        if not self.violate():
+            c["resources"] = {"requests": {"cpu": "100m", "memory": "128Mi"},
+                              "limits": {"cpu": "500m", "memory": "256Mi"}}
+        return c
+
+    def pod_spec(self, app: str) -> Dict[str, Any]:
+        containers = [self.container(app, n) for n in range(self.containers)]
+        # sidecars are shared verbatim across workloads
+        if self.containers > 1 and self.rng.random() < 0.6:
+            containers[-1] = dict(self.rng.choice(_SIDECARS))
+        spec: Dict[str, Any] = {"containers": containers}
+        volumes = [{"name": "config", "configMap": {"name": f"{app}-config"}}]
+        if self.violate():
+            volumes.append({"name": "host", "hostPath": {"path": "/var/run"}})
+        spec["volumes"] = volumes
+        return spec
+
+    def document(self, kind: str, i: int) -> Dict[str, Any]:
+        app = self.rng.choice(_APPS)
+        api_version = "apps/v1" if kind in WORKLOAD_KINDS else "v1"
+        doc: Dict[str, Any] = {"apiVersion": api_version, "kind": kind, "metadata": self.metadata(kind, i, app)}
+        if kind in WORKLOAD_KINDS:
+            doc["spec"] = {
+                "replicas": self.rng.randint(1, 5),
+                "selector": {"matchLabels": {"app": app}},
+                "template": {"metadata": {"labels": {"app": app}}, "spec": self.pod_spec(app)},
+            }
+            if kind == "StatefulSet":
+                doc["spec"]["serviceName"] = app
+        elif kind == "Pod":
+            doc["spec"] = self.pod_spec(app)
+        elif kind == "Service":
+            doc["spec"] = {"selector": {"app": app}, "ports": [{"port": 80, "targetPort": 8000}]}
+        elif kind == "ConfigMap":
+            keys = self.rng.sample(_CONFIG_KEYS, 3)
+            if self.violate():
+                keys.append(self.rng.choice(_SUSPICIOUS_KEYS))
+            doc["data"] = {k: str(self.rng.randint(0, 100)) for k in keys}
+        elif kind == "Secret":
+            doc["type"] = "Opaque"
+            doc["data"] = {"password": "c2VjcmV0"}
+            if self.violate():
+                doc["stringData"] = {"token": "plaintext"}
+        return doc
+
+
+def generate_documents(count: int = 1000, seed: int = 0, containers: int = 2,
+                       violation_rate: float = 0.2,
+                       mix: Optional[Dict[str, int]] = None) -> List[Dict[str, Any]]:
+    """
+    Return ``count`` manifests.
+
+    ``containers`` is the container fan-out per PodSpec, ``violation_rate`` the
+    probability each potential rule violation is injected, and ``mix`` the
+    relative weight of each kind (defaults to ``DEFAULT_MIX``).
+    """
+    gen = _Gen(seed, containers, violation_rate)
+    mix = mix or DEFAULT_MIX
+    kinds = list(mix)
+    weights = [mix[k] for k in kinds]
+    return [gen.document(gen.rng.choices(kinds, weights)[0], i) for i in range(count)]
+
+
+def generate_yaml(count: int = 1000, seed: int = 0, containers: int = 2,
+                  violation_rate: float = 0.2, mix: Optional[Dict[str, int]] = None) -> str:
+    """Multi-document YAML text for ``generate_documents(...)``."""
+    docs = generate_documents(count, seed, containers, violation_rate, mix)
+    return yaml.dump_all(docs, Dumper=_Dumper, sort_keys=False)
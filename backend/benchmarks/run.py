@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Benchmark harness for the analyzer.
+
+Usage (from backend/):
+    python -m benchmarks.run [--docs N] [--containers N] [--violations P]
+                             [--seed S] [--repeat R] [--only NAME ...]
+                             [--output results.json] [--compare baseline.json]
+
+Runs per-stage microbenchmarks (parse, parse_json, schema, best_practices, security,
+engine, engine over repeated templates, report, serialize) and end-to-end runs (cli.main, POST /api/v1/scan,
+POST /api/v1/scan/batch, POST /validate) on a seeded synthetic corpus, plus
+process startup: ``cli.py --help`` and a small scan as fresh processes, the
+latter in-process and through a warm ``cli.py --daemon``.
+Results are printed as a table and, with --output, written as JSON so runs
+on different commits can be compared with --compare.
+"""
+from contextlib import redirect_stdout
+from typing import Any, Callable, Dict, List, Optional
+import argparse
+import atexit
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.generator import generate_documents, generate_yaml
+
+
+def _time(fn: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    fn()  # warm-up: imports, lazily built tables
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return {
+        "min_s": min(samples),
+        "median_s": statistics.median(samples),
+        "mean_s": statistics.fmean(samples),
+        "max_s": max(samples),
+        "repeat": repeat,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10)
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def _startup_benchmarks(cli_path: str) -> Dict[str, Callable[[], Any]]:
+    """Fresh ``cli.py`` processes: what a pre-commit hook or an editor pays per run."""
+    fd, small = tempfile.mkstemp(suffix=".yaml")
+    with os.fdopen(fd, "w") as fh:
+        fh.write(generate_yaml(5, seed=7))
+    atexit.register(os.unlink, small)
+    socket_path = os.path.join(tempfile.mkdtemp(), "kya-bench.sock")
+    daemon: List[subprocess.Popen] = []
+
+    def run(*args: str):
+        subprocess.run([sys.executable, cli_path, *args], stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL, check=False)
+
+    def run_daemon():
+        if not daemon:
+            daemon.append(subprocess.Popen([sys.executable, cli_path, "--daemon", "--socket", socket_path],
+                                           stderr=subprocess.DEVNULL))
+            atexit.register(daemon[0].terminate)
+            deadline = time.monotonic() + 30
+            while not os.path.exists(socket_path):
+                if time.monotonic() > deadline or daemon[0].poll() is not None:
+                    raise RuntimeError("cli.py --daemon did not start")
+                time.sleep(0.05)
+        run("--socket", socket_path, small)
+
+    return {
+        "startup_help": lambda: run("--help"),
+        "startup_scan": lambda: run("--no-daemon", small),
+        "startup_scan_daemon": run_daemon,
+    }
+
+
+def build_benchmarks(text: str, docs: List[Dict[str, Any]], pods: List[Dict[str, Any]]) -> Dict[str, Callable[[], Any]]:
+    from k8s_analyzer.analyzer.parser import parse_yaml_documents
+    from k8s_analyzer.analyzer.schema_validator import validate_schema_for_docs
+    from k8s_analyzer.analyzer.best_practices import find_best_practices_issues
+    from k8s_analyzer.analyzer.security_checks import find_security_issues
+    from k8s_analyzer.analyzer.engine import run_rules
+    from k8s_analyzer.analyzer.report import build_report
+    from k8s_analyzer.analyzer.serialize import dumps_report
+
+    findings = run_rules(docs)
+    # the corpus as `kubectl get -o json` prints it
+    dump = json.dumps({"apiVersion": "v1", "kind": "List", "items": docs, "metadata": {}}, indent=4)
+    # the same templates rendered into 20 namespaces, as in a fleet dump
+    fleet = [dict(d, metadata=dict(d.get("metadata") or {}, namespace=f"env-{n}"))
+             for n in range(20) for d in docs[:max(1, len(docs) // 20)]]
+    benches: Dict[str, Callable[[], Any]] = {
+        "parse": lambda: parse_yaml_documents(text),
+        "parse_json": lambda: parse_yaml_documents(dump),
+        "schema": lambda: validate_schema_for_docs(docs),
+        "best_practices": lambda: find_best_practices_issues(docs),
+        "security": lambda: find_security_issues(docs),
+        "engine": lambda: run_rules(docs),
+        "engine_profiled": lambda: run_rules(docs, profile={}),
+        "engine_fleet": lambda: run_rules(fleet),
+        "report": lambda: build_report(findings),
+        "serialize_pretty": lambda: dumps_report(findings, indent=2),
+        "serialize_compact": lambda: dumps_report(findings),
+    }
+
+    # end to end: CLI
+    import cli
+    fd, path = tempfile.mkstemp(suffix=".yaml")
+    with os.fdopen(fd, "w") as fh:
+        fh.write(text)
+    atexit.register(os.unlink, path)
+
+    def run_cli():
+        with redirect_stdout(io.StringIO()):
+            cli.main(["cli.py", "--no-cache", "--no-daemon", path])
+
+    benches["e2e_cli"] = run_cli
+    benches.update(_startup_benchmarks(cli.__file__))
+
+    # end to end: FastAPI routes through a local test client (needs httpx)
+    try:
+        from fastapi.testclient import TestClient
+    except Exception:
+        print("fastapi.testclient unavailable (pip install httpx); skipping API benchmarks",
+              file=sys.stderr)
+        return benches
+
+    import logging
+    from k8s_analyzer.main import app
+    from k8s_analyzer.analyzer.cache import configure_scan_cache, get_scan_cache
+    from k8s_analyzer.admission.webhook_handler import verdict_cache
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    client = TestClient(app)
+    reviews = [
+        {"apiVersion": "admission.k8s.io/v1", "kind": "AdmissionReview",
+         "request": {"uid": f"uid-{i}", "object": pod}}
+        for i, pod in enumerate(pods)
+    ]
+
+    def api_scan():
+        r = client.post("/api/v1/scan", data={"raw_yaml": text})
+        r.raise_for_status()
+
+    def api_scan_uncached():
+        if get_scan_cache().max_bytes != 0:
+            configure_scan_cache(path=None, max_bytes=0)
+        api_scan()
+
+    def api_scan_cached():
+        if get_scan_cache().max_bytes == 0:
+            configure_scan_cache(path=None)
+        api_scan()
+
+    # the same corpus as 50 named inputs in one batch request
+    per_input = max(1, len(docs) // 50)
+    batch = [{"name": f"part-{i}.yaml", "content": generate_yaml(per_input, seed=i)} for i in range(50)]
+
+    def api_batch_uncached():
+        if get_scan_cache().max_bytes != 0:
+            configure_scan_cache(path=None, max_bytes=0)
+        client.post("/api/v1/scan/batch", json=batch).raise_for_status()
+
+    def validate_cold():
+        verdict_cache.clear()
+        for review in reviews:
+            client.post("/validate", json=review).raise_for_status()
+
+    def validate_warm():
+        for review in reviews:
+            client.post("/validate", json=review).raise_for_status()
+
+    benches["e2e_api_scan"] = api_scan_uncached
+    benches["e2e_api_scan_cached"] = api_scan_cached
+    benches["e2e_api_batch"] = api_batch_uncached
+    benches["e2e_validate_cold"] = validate_cold
+    benches["e2e_validate_warm"] = validate_warm
+    return benches
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]):
+    print(f"\n{'benchmark':<24}{'baseline':>12}{'current':>12}{'change':>10}")
+    for name, res in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base:
+            continue
+        b, c = base["median_s"], res["median_s"]
+        change = (c - b) / b * 100 if b else 0.0
+        print(f"{name:<24}{b * 1000:>10.2f}ms{c * 1000:>10.2f}ms{change:>+9.1f}%")
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(prog="benchmarks.run", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--docs", type=int, default=2000, help="documents in the corpus")
+    parser.add_argument("--containers", type=int, default=3, help="containers per PodSpec")
+    parser.add_argument("--violations", type=float, default=0.2, help="violation probability (0-1)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--reviews", type=int, default=200, help="admission reviews per /validate run")
+    parser.add_argument("--only", nargs="*", metavar="NAME", help="run only these benchmarks")
+    parser.add_argument("--output", metavar="FILE", help="write JSON results")
+    parser.add_argument("--compare", metavar="FILE", help="baseline JSON results to compare against")
+    args = parser.parse_args(argv[1:])
+
+    text = generate_yaml(args.docs, args.seed, args.containers, args.violations)
+    docs = generate_documents(args.docs, args.seed, args.containers, args.violations)
+    pods = generate_documents(args.reviews, args.seed + 1, args.containers, args.violations, mix={"Pod": 1})
+
+    from k8s_analyzer.analyzer.parser import YAML_PARSER
+
+    benches = build_benchmarks(text, docs, pods)
+    if args.only:
+        unknown = set(args.only) - set(benches)
+        if unknown:
+            parser.error(f"unknown benchmark(s): {', '.join(sorted(unknown))}")
+        benches = {k: v for k, v in benches.items() if k in args.only}
+
+    results: Dict[str, Any] = {
+        "meta": {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "yaml_parser": YAML_PARSER,
+            "docs": args.docs,
+            "containers": args.containers,
+            "violations": args.violations,
+            "seed": args.seed,
+            "reviews": args.reviews,
+            "input_bytes": len(text.encode()),
+        },
+        "results": {},
+    }
+
+    print(f"{'benchmark':<24}{'median':>12}{'min':>12}")
+    for name, fn in benches.items():
+        res = _time(fn, args.repeat)
+        results["results"][name] = res
+        print(f"{name:<24}{res['median_s'] * 1000:>10.2f}ms{res['min_s'] * 1000:>10.2f}ms")
+
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(results, fh, indent=2)
+    if args.compare:
+        with open(args.compare) as fh:
+            compare(results, json.load(fh))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
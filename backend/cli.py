@@ -3,60 +3,518 @@
 Simple CLI to scan kube YAML files locally.
 
 Usage:
-    python cli.py file1.yaml file2.yaml ...
+    python cli.py [--stream] [--jobs N] [--keep-going] [--cache FILE] [--profile]
+                  [--incremental] [--state FILE] [--changed-since REF]
+                  [--policy FILE] [--k8s-version X.Y] [--positions] [--group]
+                  [--no-daemon] [--socket PATH] path [path ...]
+    python cli.py --daemon [--socket PATH]
+    (a path may be a file, a directory scanned recursively for *.yaml/*.yml,
+    or a glob pattern; files may also hold JSON or NDJSON, e.g. the output of
+    `kubectl get all -A -o json`, whose List is scanned item by item)
+Options:
+    --stream     : analyze one document at a time and print each finding as a
+                   JSON line (NDJSON) as soon as it is produced (cross-resource
+                   XREF_* rules need the whole file and are skipped)
+    --jobs N     : scan files on N worker processes (0 = one per CPU)
+    --keep-going : report unreadable/unparsable files on stderr and continue
+    --cache FILE : reuse results for unchanged files via a SQLite cache shared
+                   across runs (default: $KYA_SCAN_CACHE_PATH, in-memory only;
+                   not used with --stream)
+    --incremental: re-scan only files whose mtime/size/content changed since
+                   the previous run, reusing recorded findings for the rest
+                   (state in --state FILE, default $KYA_SCAN_STATE_PATH)
+    --changed-since REF : incremental, but only treat files reported by
+                   `git diff --name-only REF` (and untracked files) as changed
+    --policy FILE: rule policy (default $KYA_POLICY_PATH); see
+                   k8s_analyzer/analyzer/policy.py for the format
+    --k8s-version X.Y : Kubernetes version whose OpenAPI schemas documents are
+                   validated against (default $KYA_K8S_SCHEMA_VERSION; "none"
+                   disables schema validation)
+    --positions  : add the source line/column of each finding to the report
+    --group      : collapse identical findings across the documents of each
+                   file into groups with an occurrence count and doc indexes
+    --profile    : print parse/analyze time and per-analyzer and per-rule
+                   evaluation time to stderr after the report
+    --daemon     : serve scans from one warm process (modules imported,
+                   schemas compiled, scan cache filled) on a Unix socket
+                   until interrupted; other runs use it automatically while
+                   it listens, with the same output and exit codes
+    --no-daemon  : always scan in-process
+    --socket PATH: daemon socket (default $KYA_DAEMON_SOCKET, else
+                   $XDG_RUNTIME_DIR/kya-<uid>.sock)
 Exit codes:
     0 : no findings (or only LOW)
-    1 : usage/parse error
+    1 : usage/parse error (with --keep-going: only if nothing worse was found)
     2 : findings include MEDIUM or HIGH (configurable)
     3 : critical findings detected
 """
+import os
 import sys
-import json
-from typing import List
-from k8s_analyzer.analyzer.parser import parse_yaml_documents
-from k8s_analyzer.analyzer.schema_validator import validate_schema_for_docs
-from k8s_analyzer.analyzer.best_practices import find_best_practices_issues
-from k8s_analyzer.analyzer.security_checks import find_security_issues
-from k8s_analyzer.analyzer.report import build_report
-
-def scan_text(text: str):
-    docs = parse_yaml_documents(text)
-    findings = []
-    findings.extend(validate_schema_for_docs(docs))
-    findings.extend(find_best_practices_issues(docs))
-    findings.extend(find_security_issues(docs))
+import glob
+import time
+import argparse
+from collections import Counter
+from functools import partial
+from typing import TYPE_CHECKING, List, Optional, Tuple
+from k8s_analyzer.core.settings import settings
+
+# The analyzer is imported where it is used: `--help`, a run answered by the
+# daemon and a one-file scan should not pay for what they never touch (worker
+# pools, the SQLite cache, incremental state, grouping).
+if TYPE_CHECKING:
+    from k8s_analyzer.analyzer.analyzer_core import ScanStats
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+class _ArgumentParser(argparse.ArgumentParser):
+    # usage errors exit with 1; argparse's default of 2 means "findings" here
+    def error(self, message):
+        self.print_usage(sys.stderr)
+        print(f"{self.prog}: error: {message}", file=sys.stderr)
+        raise SystemExit(1)
+
+
+def _build_arg_parser() -> argparse.ArgumentParser:
+    parser = _ArgumentParser(prog="cli.py", description="Scan Kubernetes YAML files locally.")
+    parser.add_argument("files", nargs="*", metavar="path",
+                        help="YAML files, directories or glob patterns to scan")
+    parser.add_argument("--stream", action="store_true",
+                        help="emit findings as NDJSON while scanning, one document at a time "
+                             "(skips cross-resource rules)")
+    parser.add_argument("--jobs", "-j", type=int, default=1, metavar="N",
+                        help="number of worker processes (0 = one per CPU, default 1)")
+    parser.add_argument("--keep-going", action="store_true",
+                        help="record per-file errors and keep scanning the remaining files")
+    parser.add_argument("--cache", metavar="FILE", default=settings.SCAN_CACHE_PATH,
+                        help="SQLite file caching results of unchanged files across runs")
+    parser.add_argument("--no-cache", action="store_true", help="always re-parse and re-analyze")
+    parser.add_argument("--cache-stats", action="store_true",
+                        help="print cache hit/miss counts to stderr")
+    parser.add_argument("--incremental", action="store_true",
+                        help="reuse findings of files unchanged since the previous run")
+    parser.add_argument("--state", metavar="FILE", default=settings.SCAN_STATE_PATH,
+                        help="state file for --incremental (default %(default)s)")
+    parser.add_argument("--changed-since", metavar="REF",
+                        help="incremental scan limited to files changed against a git ref")
+    parser.add_argument("--policy", metavar="FILE", default=settings.POLICY_PATH,
+                        help="rule policy file (enable/disable/severity by kind, namespace, labels)")
+    parser.add_argument("--k8s-version", metavar="X.Y", default=settings.K8S_SCHEMA_VERSION,
+                        help="Kubernetes version for OpenAPI schema validation (default %(default)s)")
+    parser.add_argument("--positions", action="store_true",
+                        help="report the source line/column of each finding")
+    parser.add_argument("--group", action="store_true",
+                        help="report identical findings once per file, with a count and document indexes")
+    parser.add_argument("--profile", action="store_true",
+                        help="print a per-stage and per-rule timing breakdown to stderr")
+    parser.add_argument("--daemon", action="store_true",
+                        help="serve scans from a warm process on a Unix socket until interrupted")
+    parser.add_argument("--no-daemon", action="store_true",
+                        help="scan in-process even when a daemon is listening")
+    parser.add_argument("--socket", metavar="PATH", default=settings.DAEMON_SOCKET,
+                        help="daemon socket (default $KYA_DAEMON_SOCKET or $XDG_RUNTIME_DIR/kya-<uid>.sock)")
+    return parser
+
+
+YAML_SUFFIXES = (".yaml", ".yml")
+
+
+def expand_paths(args: List[str]) -> List[str]:
+    """Expand directories and glob patterns into a sorted, de-duplicated file list."""
+    paths: List[str] = []
+    for arg in args:
+        if os.path.isdir(arg):
+            found = []
+            for root, dirs, files in os.walk(arg):
+                dirs.sort()
+                found.extend(os.path.join(root, f) for f in files if f.endswith(YAML_SUFFIXES))
+            paths.extend(sorted(found))
+        elif glob.has_magic(arg):
+            paths.extend(sorted(p for p in glob.glob(arg, recursive=True) if os.path.isfile(p)))
+        else:
+            # plain paths are kept even if missing so the read error is reported
+            paths.append(arg)
+    return list(dict.fromkeys(paths))
+
+
+_use_cache = True
+_profile = False
+_positions = False
+# (pid, path) the scan cache was configured for; a forked worker builds its own
+_cache_owner = None
+
+
+def _analyze_text(text: str, stats: Optional["ScanStats"] = None):
+    from k8s_analyzer.analyzer.analyzer_core import analyze_text
+
+    findings, _, scan_stats = analyze_text(text, strict=True, profile=_profile, positions=_positions)
+    if stats is not None:
+        stats.merge(scan_stats)
     return findings
 
-def main(argv: List[str]):
-    if len(argv) < 2:
-        print("Usage: cli.py <file1.yaml> [file2.yaml ...]")
-        return 1
-    overall_findings = []
-    for path in argv[1:]:
+
+def scan_text(text: str, stats: Optional["ScanStats"] = None):
+    analyze = partial(_analyze_text, stats=stats)
+    if not _use_cache:
+        return analyze(text)
+    from k8s_analyzer.analyzer.cache import get_scan_cache
+    from k8s_analyzer.analyzer.source_map import POSITIONS_VARIANT
+
+    return get_scan_cache().scan(text, analyze, POSITIONS_VARIANT if _positions else "")
+
+
+def _init_worker(path: Optional[str], use_cache: bool, profile: bool = False,
+                 policy_path: Optional[str] = settings.POLICY_PATH, positions: bool = False,
+                 k8s_version: Optional[str] = settings.K8S_SCHEMA_VERSION):
+    # also the process-pool initializer, so workers share the on-disk layer,
+    # the policy and the schema version
+    from k8s_analyzer.analyzer.cache import configure_scan_cache, get_scan_cache
+    from k8s_analyzer.analyzer.openapi import configure_schemas
+    from k8s_analyzer.analyzer.policy import configure_policy
+
+    global _use_cache, _profile, _positions, _cache_owner
+    _use_cache = use_cache
+    _profile = profile
+    _positions = positions
+    configure_policy(policy_path)
+    configure_schemas(k8s_version)
+    if use_cache:
+        if _cache_owner == (os.getpid(), path):
+            # the daemon's next run: keep the warm entries; keys follow the
+            # policy and schemas just configured
+            get_scan_cache().rekey()
+        else:
+            configure_scan_cache(path=path)
+            _cache_owner = (os.getpid(), path)
+
+
+def exit_code_for(summary) -> int:
+    # determine exit code: 3=CRITICAL,2=HIGH/MEDIUM,0 otherwise
+    if summary.get("CRITICAL", 0) > 0:
+        return 3
+    if summary.get("HIGH", 0) > 0 or summary.get("MEDIUM", 0) > 0:
+        return 2
+    return 0
+
+
+def _finish(code: int, had_errors: bool) -> int:
+    # with --keep-going, file errors only decide the exit code when no findings do
+    return code if code or not had_errors else 1
+
+
+def scan_file(path: str) -> Tuple[str, Optional[list], Optional[str], bool, Optional["ScanStats"]]:
+    """
+    Scan one file; returns (path, findings, error, cache_hit, stats), where
+    stats is only collected with --profile. Runs in worker processes.
+    """
+    from k8s_analyzer.analyzer.analyzer_core import ScanStats
+    from k8s_analyzer.analyzer.cache import get_scan_cache
+
+    stats = ScanStats() if _profile else None
+    try:
+        with open(path, "r") as fh:
+            txt = fh.read()
+    except Exception as e:
+        return path, None, f"Failed to read {path}: {e}", False, stats
+    cache = get_scan_cache()
+    hits_before = cache.hits + cache.disk_hits
+    try:
+        findings = scan_text(txt, stats)
+    except Exception as e:
+        return path, None, f"Error scanning {path}: {e}", False, stats
+    return path, findings, None, cache.hits + cache.disk_hits > hits_before, stats
+
+
+def _stream_file_lines(path: str) -> Tuple[str, Optional[List[Tuple[str, str]]], Optional[str], Optional["ScanStats"]]:
+    """--stream worker for --jobs > 1: one file's (severity, NDJSON line) pairs, or its error."""
+    from k8s_analyzer.analyzer.analyzer_core import ScanStats, analyze_stream
+    from k8s_analyzer.analyzer.serialize import ndjson_line
+
+    lines: List[Tuple[str, str]] = []
+    stats = ScanStats() if _profile else None
+    try:
+        fh = open(path, "r")
+    except Exception as e:
+        return path, None, f"Failed to read {path}: {e}", stats
+    with fh:
+        if stats is not None:
+            stats.size += os.fstat(fh.fileno()).st_size
         try:
-            with open(path, "r") as fh:
-                txt = fh.read()
+            for finding in analyze_stream(fh, stats, _positions):
+                lines.append((finding.severity.upper(), ndjson_line(finding, {"file": path})))
         except Exception as e:
-            print(f"Failed to read {path}: {e}", file=sys.stderr)
-            return 1
+            return path, None, f"Error scanning {path}: {e}", stats
+    return path, lines, None, stats
+
+
+def print_profile(stats: "ScanStats", files: int, wall_seconds: float, cache_hits: int = 0, out=None):
+    """Per-stage, per-analyzer and per-rule timing table (times summed across workers)."""
+    # resolved per call: the daemon redirects sys.stderr per run
+    out = out or sys.stderr
+
+    def row(label: str, seconds: float, calls: Optional[int] = None):
+        line = f"{label:<28}{seconds * 1000:>12.3f}"
+        if calls:
+            line += f"{int(calls):>10}{seconds / calls * 1e6:>12.2f}"
+        print(line, file=out)
+
+    print(f"profile: {files} files ({cache_hits} from cache), {stats.documents} documents, "
+          f"{stats.findings} findings, {stats.size / 1024:.1f} KiB input, {wall_seconds * 1000:.3f} ms wall", file=out)
+    print(f"{'stage / analyzer / rule':<28}{'ms':>12}{'calls':>10}{'us/call':>12}", file=out)
+    row("parse", stats.parse_seconds)
+    row("analyze", stats.analyze_seconds)
+    by_analyzer = stats.analyzer_seconds()
+    for name in sorted(by_analyzer, key=by_analyzer.get, reverse=True):
+        row(f"  {name}", by_analyzer[name])
+        rules = [(rid, v) for rid, v in stats.rules.items() if stats.analyzers[rid] == name]
+        for rule_id, (seconds, calls) in sorted(rules, key=lambda item: item[1][0], reverse=True):
+            row(f"    {rule_id}", seconds, calls)
+
+
+def stream_files(paths: List[str], out=None, keep_going: bool = False,
+                 stats: Optional["ScanStats"] = None, positions: bool = False) -> int:
+    """Scan ``paths`` document by document, writing one JSON finding per line."""
+    from k8s_analyzer.analyzer.analyzer_core import analyze_stream
+    from k8s_analyzer.analyzer.serialize import ndjson_line
+
+    out = out or sys.stdout
+    severities = Counter()
+    had_errors = False
+    for path in paths:
         try:
-            findings = scan_text(txt)
-            overall_findings.extend(findings)
+            fh = open(path, "r")
         except Exception as e:
-            print(f"Error scanning {path}: {e}", file=sys.stderr)
-            return 1
+            print(f"Failed to read {path}: {e}", file=sys.stderr)
+            if not keep_going:
+                return 1
+            had_errors = True
+            continue
+        with fh:
+            if stats is not None:
+                stats.size += os.fstat(fh.fileno()).st_size
+            try:
+                for finding in analyze_stream(fh, stats, positions):
+                    severities[finding.severity.upper()] += 1
+                    out.write(ndjson_line(finding, {"file": path}))
+                    out.flush()
+            except Exception as e:
+                print(f"Error scanning {path}: {e}", file=sys.stderr)
+                if not keep_going:
+                    return 1
+                had_errors = True
+    return _finish(exit_code_for(severities), had_errors)
 
-    report = build_report(overall_findings)
-    # print JSON report
-    print(report.json(indent=2, ensure_ascii=False))
 
-    # determine exit code: 3=CRITICAL,2=HIGH/MEDIUM,0 otherwise
-    if report.summary.get("CRITICAL", 0) > 0:
-        return 3
-    if report.summary.get("HIGH", 0) > 0 or report.summary.get("MEDIUM", 0) > 0:
-        return 2
+def _parallel_map(fn, paths: List[str], jobs: int,
+                  initargs=(None, False, False, settings.POLICY_PATH, False, settings.K8S_SCHEMA_VERSION)):
+    from concurrent.futures import ProcessPoolExecutor
+
+    # results come back in input order, so merging stays deterministic
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=initargs) as pool:
+        chunksize = max(1, len(paths) // (jobs * 4))
+        yield from pool.map(fn, paths, chunksize=chunksize)
+
+
+def _warm_up():
+    # what the daemon's first run would otherwise pay for
+    from k8s_analyzer.analyzer import aggregate, analyzer_core, incremental, serialize  # noqa: F401
+    from k8s_analyzer.analyzer.engine import ruleset_fingerprint
+
+    _init_worker(settings.SCAN_CACHE_PATH, True)
+    ruleset_fingerprint()
+
+
+def serve_daemon(socket_path: Optional[str] = settings.DAEMON_SOCKET) -> int:
+    from k8s_analyzer.core.daemon import serve
+
+    _warm_up()
+    try:
+        serve(lambda argv: main(["cli.py", "--no-daemon", *argv]), ROOT,
+              [os.path.abspath(__file__), os.path.join(ROOT, "k8s_analyzer")], socket_path,
+              ready=lambda path: print(f"cli.py: scanner daemon listening on {path}", file=sys.stderr))
+    except (OSError, RuntimeError) as e:
+        print(f"cli.py: error: {e}", file=sys.stderr)
+        return 1
     return 0
 
+
+def run_in_daemon(argv: List[str], socket_path: Optional[str] = settings.DAEMON_SOCKET) -> Optional[int]:
+    """Exit code of ``argv`` run by the daemon, after printing its output; None without one."""
+    from k8s_analyzer.core.daemon import DaemonUnavailable, run_remote
+
+    try:
+        reply = run_remote(argv[1:], ROOT, socket_path)
+    except DaemonUnavailable:
+        return None
+    sys.stdout.write(reply["stdout"])
+    sys.stdout.flush()
+    sys.stderr.write(reply["stderr"])
+    return reply["code"]
+
+
+def main(argv: List[str]):
+    parser = _build_arg_parser()
+    try:
+        args = parser.parse_args(argv[1:])
+        if args.daemon:
+            if args.files:
+                parser.error("--daemon takes no paths")
+            return serve_daemon(args.socket)
+        if not args.files:
+            parser.error("the following arguments are required: path")
+    except SystemExit as e:
+        return e.code
+
+    # --stream output must reach the terminal as it is produced
+    if not (args.no_daemon or args.stream):
+        rc = run_in_daemon(argv, args.socket)
+        if rc is not None:
+            return rc
+
+    from k8s_analyzer.analyzer.analyzer_core import ScanStats
+    from k8s_analyzer.analyzer.openapi import SchemaError, configure_schemas
+    from k8s_analyzer.analyzer.policy import PolicyError, configure_policy
+
+    try:
+        configure_policy(args.policy)
+        configure_schemas(args.k8s_version)
+    except (PolicyError, SchemaError) as e:
+        print(f"cli.py: error: {e}", file=sys.stderr)
+        return 1
+
+    args.incremental = args.incremental or bool(args.changed_since)
+    for flag in ("incremental", "group"):
+        if getattr(args, flag) and args.stream:
+            print(f"cli.py: error: --{flag} cannot be combined with --stream", file=sys.stderr)
+            return 1
+
+    paths = expand_paths(args.files)
+    if not paths:
+        print("No YAML files matched the given paths", file=sys.stderr)
+        return 1
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    jobs = min(jobs, len(paths))
+
+    started = time.perf_counter()
+    profile = ScanStats() if args.profile else None
+
+    if args.stream and jobs == 1:
+        rc = stream_files(paths, keep_going=args.keep_going, stats=profile, positions=args.positions)
+        if profile is not None:
+            print_profile(profile, len(paths), time.perf_counter() - started)
+        return rc
+
+    had_errors = False
+
+    if args.stream:
+        severities = Counter()
+        for path, lines, error, stats in _parallel_map(_stream_file_lines, paths, jobs,
+                                                       initargs=(None, False, args.profile, args.policy,
+                                                                 args.positions, args.k8s_version)):
+            if stats is not None:
+                profile.merge(stats)
+            if error:
+                print(error, file=sys.stderr)
+                if not args.keep_going:
+                    return 1
+                had_errors = True
+                continue
+            for severity, line in lines:
+                severities[severity] += 1
+                sys.stdout.write(line)
+            sys.stdout.flush()
+        if profile is not None:
+            print_profile(profile, len(paths), time.perf_counter() - started)
+        return _finish(exit_code_for(severities), had_errors)
+
+    state = None
+    reused = {}
+    to_scan = paths
+    if args.incremental:
+        from k8s_analyzer.analyzer.incremental import ScanState, git_baseline
+        from k8s_analyzer.analyzer.source_map import POSITIONS_VARIANT
+
+        baseline = None
+        if args.changed_since:
+            try:
+                baseline = git_baseline(args.changed_since)
+            except RuntimeError as e:
+                print(f"cli.py: error: {e}", file=sys.stderr)
+                return 1
+        state = ScanState.load(args.state, POSITIONS_VARIANT if args.positions else "")
+        for path in paths:
+            findings = state.reuse(path, baseline)
+            if findings is not None:
+                reused[path] = findings
+        to_scan = [p for p in paths if p not in reused]
+        jobs = max(1, min(jobs, len(to_scan)))
+
+    use_cache = not args.no_cache
+    worker_args = (args.cache, use_cache, args.profile, args.policy, args.positions, args.k8s_version)
+    _init_worker(*worker_args)
+    if jobs > 1:
+        results = _parallel_map(scan_file, to_scan, jobs, initargs=worker_args)
+    else:
+        results = map(scan_file, to_scan)
+    scanned = {}
+    hits = misses = 0
+    for path, findings, error, cache_hit, stats in results:
+        if stats is not None:
+            profile.merge(stats)
+        if findings is not None and use_cache:
+            hits += cache_hit
+            misses += not cache_hit
+        if error:
+            print(error, file=sys.stderr)
+            if state is not None:
+                state.forget(path)
+            if not args.keep_going:
+                return 1
+            had_errors = True
+            continue
+        if state is not None:
+            state.record(path, findings)
+        scanned[path] = findings
+
+    # merged in input order, so the report matches a full scan
+    from k8s_analyzer.analyzer.aggregate import FindingAggregator
+    from k8s_analyzer.analyzer.report import summarize
+    from k8s_analyzer.analyzer.serialize import dumps_grouped_report, write_report
+
+    overall_findings = []
+    aggregator = FindingAggregator() if args.group else None
+    for path in paths:
+        file_findings = reused.get(path) or scanned.get(path) or ()
+        overall_findings.extend(file_findings)
+        if aggregator is not None:
+            # doc indexes are per file, so groups are too
+            aggregator.extend(file_findings, scope=path)
+
+    if state is not None:
+        try:
+            state.save()
+        except OSError as e:
+            print(f"Failed to write scan state {args.state}: {e}", file=sys.stderr)
+
+    if args.cache_stats:
+        print(f"scan cache: {hits} hits, {misses} misses", file=sys.stderr)
+        if state is not None:
+            print(f"incremental: {state.reused} reused, {state.rescanned} rescanned", file=sys.stderr)
+
+    # print JSON report (same bytes as build_report(...).model_dump() through
+    # json.dumps(indent=2), without building the Pydantic models)
+    if aggregator is not None:
+        sys.stdout.write(dumps_grouped_report(aggregator, indent=2))
+    else:
+        write_report(sys.stdout, overall_findings, indent=2)
+    sys.stdout.write("\n")
+
+    if profile is not None:
+        print_profile(profile, len(paths), time.perf_counter() - started, cache_hits=hits + len(reused))
+
+    _, summary = summarize(overall_findings)
+    return _finish(exit_code_for(summary), had_errors)
+
 if __name__ == "__main__":
     rc = main(sys.argv)
     sys.exit(rc)
@@ -1,14 +1,19 @@
 from fastapi import APIRouter, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 import logging
 
-from .webhook_handler import admission_review_response
+from .webhook_handler import admission_review_bytes
 
 router = APIRouter()
 logger = logging.getLogger("admission_router")
 
 @router.post("/validate")
 async def validate(request: Request):
-    body = await request.json()
-    resp = admission_review_response(body)
-    return JSONResponse(content=resp, status_code=200)
+    # raw bytes in, pre-serialized bytes out: no JSONResponse re-encoding
+    body = await request.body()
+    try:
+        resp = await admission_review_bytes(body)
+    except ValueError as e:
+        logger.warning("Invalid AdmissionReview: %s", e)
+        return JSONResponse(content={"detail": "Invalid AdmissionReview"}, status_code=400)
+    return Response(content=resp, status_code=200, media_type="application/json")
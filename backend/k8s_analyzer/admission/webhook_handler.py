@@ -1,17 +1,48 @@
-from typing import Dict, Any
-import base64
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, Tuple
+import asyncio
+import hashlib
+import json
 import logging
+import sqlite3
+import threading
+import time
+
+from k8s_analyzer.core.settings import settings
+from k8s_analyzer.core import metrics
+from k8s_analyzer.analyzer.analyzer_core import SEVERITY_ORDER
+from k8s_analyzer.analyzer.engine import run_rules, ruleset_fingerprint, RuleTimeout
+from k8s_analyzer.analyzer.images import get_image_policy
+from k8s_analyzer.analyzer.policy import IGNORE_ANNOTATION, get_policy
+from k8s_analyzer.core.shared_store import SharedStore
 
 logger = logging.getLogger("webhook_handler")
 
+def _mapping(value: Any, where: str) -> Dict[str, Any]:
+    # absent is empty; any other non-object is a malformed review (400)
+    if value is None:
+        return {}
+    if not isinstance(value, dict):
+        raise ValueError(f"{where} must be a JSON object")
+    return value
+
 def _extract_uid(ar: Dict[str, Any]) -> str:
-    try:
-        return ar.get("request", {}).get("uid")
-    except Exception:
-        return None
+    return _mapping(ar.get("request"), "request").get("uid")
+
+# operations whose object (if any) is not being admitted: nothing to validate
+_UNVALIDATED_OPERATIONS = frozenset(("DELETE", "CONNECT"))
 
-def _get_object(ar: Dict[str, Any]):
-    return ar.get("request", {}).get("object", {})
+def _nothing_to_validate(ar: Dict[str, Any], obj: Dict[str, Any]) -> bool:
+    return not obj or _mapping(ar.get("request"), "request").get("operation") in _UNVALIDATED_OPERATIONS
+
+def _get_object(ar: Dict[str, Any]) -> Dict[str, Any]:
+    # DELETE/CONNECT reviews carry "object": null
+    obj = _mapping(_mapping(ar.get("request"), "request").get("object"), "request.object")
+    metadata = _mapping(obj.get("metadata"), "request.object.metadata")
+    _mapping(metadata.get("annotations"), "request.object.metadata.annotations")
+    _mapping(metadata.get("labels"), "request.object.metadata.labels")
+    return obj
 
 
 # --------------------------------------------------------------------------
@@ -19,29 +50,9 @@ def _get_object(ar: Dict[str, Any]):
 # --------------------------------------------------------------------------
 
 def should_skip_validation(obj: Dict[str, Any]) -> bool:
-    metadata = obj.get("metadata", {})
-    name = metadata.get("name", "")
-    labels = metadata.get("labels", {}) or {}
-    namespace = metadata.get("namespace", "default")
-
-    # Skip own analyzer components
-    analyzer_names = ["analyzer-backend", "analyzer-frontend", "analyzer-webhook"]
-    if any(n in name for n in analyzer_names):
-        return True
-
-    # Skip if special label exists
-    if labels.get("skip-webhook") == "true":
-        return True
-
-    # Skip system namespaces
-    if namespace in ["kube-system", "kube-public", "kube-node-lease"]:
-        return True
-
-    # Skip typical system pods (optional)
-    if labels.get("app.kubernetes.io/name") in ["coredns", "kube-proxy"]:
-        return True
-
-    return False
+    # analyzer components, system namespaces, skip-webhook label, system pods;
+    # compiled from the policy's bypass section (defaults in analyzer/policy.py)
+    return get_policy().bypasses(obj)
 
 
 def _find_container_images(obj: Dict[str, Any]):
@@ -68,53 +79,62 @@ def _find_container_images(obj: Dict[str, Any]):
     return images
 
 
-def _image_uses_latest_or_no_tag(image: str) -> bool:
-    # Bypass analyzer images
-    if image.startswith("ghcr.io/ansh-verma1404/k8s-yaml-analyzer-backend"):
-        return False
+SKIP_MESSAGE = "Validation skipped for internal/system components"
+NO_OBJECT_MESSAGE = "No object to validate; allowed."
 
-    if "@" in image:
-        image = image.split("@")[0]
 
-    last_slash = image.rfind("/")
-    remainder = image[last_slash + 1:]
+def _rule_failed(rule, exc):
+    logger.error("Rule %s failed during admission review, skipping it", rule.rule_id, exc_info=exc)
 
-    if ":" not in remainder:
-        return True
-    tag = remainder.split(":", 1)[1]
-    return tag == "" or tag == "latest"
 
+def evaluate_object(obj: Dict[str, Any], deadline: Optional[float] = None) -> Tuple[bool, Optional[str]]:
+    """
+    Return ``(allowed, status message)`` for an admitted object.
 
-def admission_review_response(admission_review: Dict[str, Any]) -> Dict[str, Any]:
-    uid = _extract_uid(admission_review)
-    obj = _get_object(admission_review)
-    images = _find_container_images(obj)
-
-    # Skip validation for system/analyzer pods
+    Runs the shared analyzer ruleset on the object as received (no YAML
+    round-trip); findings at or above ``settings.FAIL_ON_SEVERITY`` deny it.
+    Raises ``RuleTimeout`` once ``deadline`` (a ``time.perf_counter()`` value)
+    has passed.
+    """
+    if not obj:
+        return True, NO_OBJECT_MESSAGE
     if should_skip_validation(obj):
-        return {
-            "apiVersion": "admission.k8s.io/v1",
-            "kind": "AdmissionReview",
-            "response": {
-                "uid": uid,
-                "allowed": True,
-                "status": {"message": "Validation skipped for internal/system components"}
-            }
-        }, 200
+        return True, SKIP_MESSAGE
 
+    images = _find_container_images(obj)
     allowed = True
     messages = []
 
-    # Normal rule: deny images without tag or with latest
+    # Image policy: registries, digests, and no untagged or :latest images
+    image_policy = get_image_policy()
     for image in images:
-        if _image_uses_latest_or_no_tag(image):
+        violation = image_policy.violation(image)
+        if violation is not None:
+            allowed = False
+            messages.append(violation)
+
+    # Shared ruleset (schema, best practices, security)
+    threshold = SEVERITY_ORDER.get(settings.FAIL_ON_SEVERITY.upper(), SEVERITY_ORDER["HIGH"])
+    # the object's own ignore annotation does not apply here (see Policy.for_admission)
+    policy = get_policy().for_admission()
+    for f in run_rules([obj], on_error=_rule_failed, deadline=deadline, policy=policy):
+        if SEVERITY_ORDER.get(f.severity.upper(), 0) >= threshold:
             allowed = False
-            messages.append(f"Disallowed image tag in {image} (no tag or :latest).")
+            messages.append(f"{f.rule_id} ({f.severity}): {f.message}")
 
     if not images:
         messages.append("No containers detected; allowed.")
 
-    status = {"message": "; ".join(messages)} if messages else None
+    return allowed, ("; ".join(messages) if messages else None)
+
+
+def admission_review_response(admission_review: Dict[str, Any]) -> Dict[str, Any]:
+    uid = _extract_uid(admission_review)
+    obj = _get_object(admission_review)
+    if _nothing_to_validate(admission_review, obj):
+        allowed, message = True, NO_OBJECT_MESSAGE
+    else:
+        allowed, message = evaluate_object(obj)
 
     response = {
         "apiVersion": "admission.k8s.io/v1",
@@ -124,7 +144,294 @@ def admission_review_response(admission_review: Dict[str, Any]) -> Dict[str, Any
             "allowed": allowed
         }
     }
-    if status:
-        response["response"]["status"] = status
+    if message:
+        response["response"]["status"] = {"message": message}
 
     return response, 200
+
+
+# --------------------------------------------------------------------------
+# FAST PATH: verdict cache + pre-serialized responses
+# --------------------------------------------------------------------------
+# ReplicaSet scale-ups send near-identical pods many times a second.  The
+# verdict only depends on the pod template and bypass-relevant metadata, so
+# it is cached under a hash of those, and the response body is kept as bytes
+# with only the uid spliced in per request.
+
+_RESPONSE_HEAD = b'{"apiVersion":"admission.k8s.io/v1","kind":"AdmissionReview","response":{"uid":'
+
+# volatile metadata that does not influence the verdict
+_VOLATILE_ANNOTATIONS = ("kubectl.kubernetes.io/last-applied-configuration",)
+_UNTRUSTED_ANNOTATIONS = _VOLATILE_ANNOTATIONS + (IGNORE_ANNOTATION,)
+
+
+def _response_tail(allowed: bool, message: Optional[str]) -> bytes:
+    body = {"allowed": allowed}
+    if message:
+        body["status"] = {"message": message}
+    # '"allowed":...' without the braces, closed after the uid
+    return b"," + json.dumps(body, separators=(",", ":")).encode()[1:-1] + b"}}"
+
+
+_SKIP_TAIL = _response_tail(True, SKIP_MESSAGE)
+_NO_OBJECT_TAIL = _response_tail(True, NO_OBJECT_MESSAGE)
+_ALLOWED_PREFIX = b',"allowed":true'
+
+
+def verdict_key(obj: Dict[str, Any]) -> str:
+    """Hash of everything but the per-replica identity (name, uid, status, ...)."""
+    metadata = obj.get("metadata") or {}
+    # the ignore annotation only decides the verdict when the server honors it
+    ignored = _VOLATILE_ANNOTATIONS if settings.WEBHOOK_HONOR_IGNORE_ANNOTATION else _UNTRUSTED_ANNOTATIONS
+    annotations = {
+        k: v for k, v in (metadata.get("annotations") or {}).items()
+        if k not in ignored
+    }
+    keyed = {k: v for k, v in obj.items() if k not in ("metadata", "status")}
+    keyed["metadata"] = {
+        "namespace": metadata.get("namespace"),
+        "labels": metadata.get("labels"),
+        "annotations": annotations,
+        "has_name": bool(metadata.get("name")),
+    }
+    canonical = json.dumps(keyed, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(canonical.encode(), digest_size=16).hexdigest()
+
+
+class VerdictCache:
+    """
+    Small LRU of verdict key -> pre-serialized response tail, optionally in
+    front of a SQLite file shared with other processes (the server's workers),
+    so a verdict evaluated by one of them is a hit in all of them.
+    """
+
+    def __init__(self, max_entries: int = settings.WEBHOOK_VERDICT_CACHE_SIZE,
+                 path: Optional[str] = settings.WEBHOOK_VERDICT_CACHE_PATH):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._shared = SharedStore(path, "webhook_verdicts") if path else None
+        self._prefix: Optional[str] = None
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    def _shared_key(self, key: str) -> str:
+        # the file outlives this process, so what else decides a verdict goes in the key
+        if self._prefix is None:
+            self._prefix = (f"{ruleset_fingerprint()}:{get_policy().fingerprint}:"
+                            f"{get_image_policy().fingerprint}:"
+                            f"{settings.FAIL_ON_SEVERITY.upper()}:{settings.APP_VERSION}:")
+        return self._prefix + key
+
+    def _remember(self, key: str, tail: bytes):
+        with self._lock:
+            self._entries[key] = tail
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, key: str) -> Optional[bytes]:
+        """This process's entry for ``key``; cheap enough for the event loop."""
+        with self._lock:
+            tail = self._entries.get(key)
+            if tail is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            return tail
+
+    def get_shared(self, key: str) -> Optional[bytes]:
+        """
+        The shared file's entry for ``key`` after ``get`` missed (blocking, so
+        off the event loop); ``None`` counts as a miss.
+        """
+        tail = None
+        if self._shared is not None:
+            try:
+                tail = self._shared.get(self._shared_key(key))
+            except sqlite3.Error:
+                logger.exception("Failed to read shared verdict cache")
+        if tail is None:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.shared_hits += 1
+        if self.max_entries > 0:
+            self._remember(key, tail)
+        return tail
+
+    def put(self, key: str, tail: bytes):
+        if self.max_entries <= 0:
+            return
+        self._remember(key, tail)
+        if self._shared is not None:
+            try:
+                self._shared.put(self._shared_key(key), tail)
+            except sqlite3.Error:
+                logger.exception("Failed to write shared verdict cache")
+
+    def open(self):
+        """Open the shared file now, so a bad path fails at startup rather than in a review."""
+        if self._shared is not None:
+            self._shared.open()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class WebhookLatency:
+    """
+    Review latency against ``settings.WEBHOOK_LATENCY_BUDGET_MS``.
+
+    Over-budget reviews are counted for /metrics and logged as one summary
+    line per ``warn_interval_s``, not one per review: under load every review
+    can miss the budget.
+    """
+
+    def __init__(self, budget_ms: float = settings.WEBHOOK_LATENCY_BUDGET_MS, warn_interval_s: float = 60.0):
+        self.budget_ms = budget_ms
+        self.warn_interval_s = warn_interval_s
+        self._lock = threading.Lock()
+        self.reviews = 0
+        self.over_budget = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        # over-budget reviews not logged yet, the slowest of them, and when the last line was
+        self._unlogged = 0
+        self._unlogged_max_ms = 0.0
+        self._logged_at = float("-inf")
+
+    def observe(self, elapsed_ms: float):
+        summary = None
+        with self._lock:
+            self.reviews += 1
+            self.total_ms += elapsed_ms
+            if elapsed_ms > self.max_ms:
+                self.max_ms = elapsed_ms
+            if elapsed_ms > self.budget_ms:
+                self.over_budget += 1
+                self._unlogged += 1
+                if elapsed_ms > self._unlogged_max_ms:
+                    self._unlogged_max_ms = elapsed_ms
+                now = time.monotonic()
+                if now - self._logged_at >= self.warn_interval_s:
+                    summary = (self._unlogged, self._unlogged_max_ms)
+                    self._unlogged, self._unlogged_max_ms, self._logged_at = 0, 0.0, now
+        if summary is not None:
+            logger.warning("%d admission review(s) over the %.2fms budget since the last report (slowest %.2fms)",
+                           summary[0], self.budget_ms, summary[1])
+
+
+verdict_cache = VerdictCache()
+webhook_latency = WebhookLatency()
+
+
+_TIMEOUT_TAIL = _response_tail(
+    settings.WEBHOOK_FAIL_OPEN,
+    "Policy evaluation timed out; request {}".format(
+        "allowed (fail open)" if settings.WEBHOOK_FAIL_OPEN else "denied (fail closed)"),
+)
+
+_ERROR_TAIL = _response_tail(
+    settings.WEBHOOK_FAIL_OPEN,
+    "Policy evaluation failed; request {}".format(
+        "allowed (fail open)" if settings.WEBHOOK_FAIL_OPEN else "denied (fail closed)"),
+)
+
+# rule evaluation runs here so the event loop can enforce the review budget
+_review_pool = ThreadPoolExecutor(max_workers=settings.WEBHOOK_WORKERS,
+                                  thread_name_prefix="admission")
+timeouts = 0
+errors = 0
+
+
+def _evaluate_tail(obj: Dict[str, Any], key: str, deadline: float) -> Tuple[bytes, str]:
+    tail = verdict_cache.get_shared(key)
+    if tail is not None:
+        return tail, "shared_cache"
+    try:
+        tail = _response_tail(*evaluate_object(obj, deadline=deadline))
+    except RuleTimeout:
+        raise
+    except Exception:
+        # an unexpected failure gets the timeout's verdict, and is not cached
+        logger.exception("Admission review evaluation failed; failing %s",
+                         "open" if settings.WEBHOOK_FAIL_OPEN else "closed")
+        return _ERROR_TAIL, "error"
+    verdict_cache.put(key, tail)
+    return tail, "evaluated"
+
+
+async def admission_review_bytes(body: bytes) -> bytes:
+    """
+    Serialized AdmissionReview response for a raw request body.
+
+    Same verdict as ``admission_review_response``.  Reviews with nothing to
+    validate (no object, DELETE, CONNECT), skipped objects and verdicts cached in this process are answered inline; otherwise a worker
+    thread looks the verdict up in the shared cache or runs the ruleset, under
+    a hard ``settings.WEBHOOK_TIMEOUT_MS`` budget, after which the review fails
+    open or closed per ``settings.WEBHOOK_FAIL_OPEN`` (timed-out verdicts are
+    not cached); so does a review whose evaluation fails.  Raises ValueError
+    on a body that is not a JSON object.
+    """
+    global timeouts, errors
+    started = time.perf_counter()
+    admission_review = json.loads(body)
+    if not isinstance(admission_review, dict):
+        raise ValueError("AdmissionReview must be a JSON object")
+    uid = _extract_uid(admission_review)
+    obj = _get_object(admission_review)
+
+    if _nothing_to_validate(admission_review, obj):
+        tail = _NO_OBJECT_TAIL
+        source = "skip"
+    elif should_skip_validation(obj):
+        tail = _SKIP_TAIL
+        source = "skip"
+    else:
+        key = verdict_key(obj)
+        tail = verdict_cache.get(key)
+        source = "cache"
+        if tail is None:
+            budget = settings.WEBHOOK_TIMEOUT_MS / 1000.0
+            deadline = started + budget
+            loop = asyncio.get_running_loop()
+            try:
+                tail, source = await asyncio.wait_for(
+                    loop.run_in_executor(_review_pool, _evaluate_tail, obj, key, deadline),
+                    timeout=max(0.0, deadline - time.perf_counter()),
+                )
+            except (asyncio.TimeoutError, RuleTimeout):
+                timeouts += 1
+                logger.error("Admission review %s exceeded %.0fms budget; failing %s",
+                             uid, settings.WEBHOOK_TIMEOUT_MS,
+                             "open" if settings.WEBHOOK_FAIL_OPEN else "closed")
+                tail = _TIMEOUT_TAIL
+                source = "timeout"
+            if source == "error":
+                errors += 1
+
+    out = _RESPONSE_HEAD + json.dumps(uid).encode() + tail
+    elapsed = time.perf_counter() - started
+    webhook_latency.observe(elapsed * 1000.0)
+    metrics.WEBHOOK_REVIEW_SECONDS.observe(elapsed, source)
+    metrics.WEBHOOK_VERDICTS.inc(1, "true" if tail.startswith(_ALLOWED_PREFIX) else "false")
+    return out
+
+
+def webhook_stats() -> Dict[str, Any]:
+    lat = webhook_latency
+    return {
+        "reviews": lat.reviews,
+        "over_budget": lat.over_budget,
+        "budget_ms": lat.budget_ms,
+        "avg_ms": round(lat.total_ms / lat.reviews, 3) if lat.reviews else 0.0,
+        "max_ms": round(lat.max_ms, 3),
+        "verdict_cache_hits": verdict_cache.hits,
+        "verdict_cache_shared_hits": verdict_cache.shared_hits,
+        "verdict_cache_misses": verdict_cache.misses,
+        "timeouts": timeouts,
+        "errors": errors,
+    }
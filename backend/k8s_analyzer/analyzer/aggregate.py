@@ -0,0 +1,96 @@
+# backend/app/analyzer/aggregate.py
+"""
+Collapse identical findings across documents.
+
+Findings are identical when rule metadata, path and message match; only the
+document differs (the same rule hitting the same container spec in every
+replica of a fleet dump).  ``FindingAggregator`` folds findings in as they
+arrive, so it works on the streaming path too: memory grows with the number
+of distinct groups, not findings, and each group keeps at most
+``max_doc_indexes`` document indexes while its ``count`` keeps going.
+
+Duplicates within one document never reach this layer; the engine drops
+them when it emits findings.
+"""
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from k8s_analyzer.analyzer.findings import CompactFinding, RuleMeta
+from k8s_analyzer.core.settings import settings
+
+
+class FindingGroup:
+    __slots__ = ("meta", "message", "path", "count", "doc_indexes")
+
+    def __init__(self, meta: RuleMeta, message: str, path: Optional[str]):
+        self.meta = meta
+        self.message = message
+        self.path = path
+        self.count = 0
+        self.doc_indexes: List[int] = []
+
+    @property
+    def rule_id(self) -> str:
+        return self.meta.rule_id
+
+    @property
+    def severity(self) -> str:
+        return self.meta.severity
+
+    def to_dict(self) -> Dict[str, Any]:
+        # same key order as api.v1.models.FindingGroup
+        meta = self.meta
+        return {
+            "rule_id": meta.rule_id,
+            "title": meta.title,
+            "message": self.message,
+            "severity": meta.severity,
+            "path": self.path,
+            "count": self.count,
+            "doc_indexes": self.doc_indexes,
+        }
+
+    def __repr__(self):
+        return f"FindingGroup(rule_id={self.rule_id!r}, path={self.path!r}, count={self.count})"
+
+
+class FindingAggregator:
+    def __init__(self, max_doc_indexes: int = settings.AGGREGATE_MAX_DOC_INDEXES):
+        self.max_doc_indexes = max_doc_indexes
+        # insertion order is first-occurrence order
+        self._groups: Dict[Tuple[RuleMeta, Optional[str], str, Any], FindingGroup] = {}
+        self.findings = 0
+
+    def add(self, finding: CompactFinding, scope: Any = None):
+        """Fold in one finding; findings of different ``scope`` (e.g. file) never share a group."""
+        key = (finding.meta, finding.path, finding.message, scope)
+        group = self._groups.get(key)
+        if group is None:
+            group = self._groups[key] = FindingGroup(finding.meta, finding.message, finding.path)
+        group.count += 1
+        self.findings += 1
+        if finding.doc_index is not None and len(group.doc_indexes) < self.max_doc_indexes:
+            group.doc_indexes.append(finding.doc_index)
+
+    def extend(self, findings: Iterable[CompactFinding], scope: Any = None):
+        for f in findings:
+            self.add(f, scope)
+
+    def groups(self) -> List[FindingGroup]:
+        return list(self._groups.values())
+
+    def summary(self) -> Tuple[bool, Dict[str, int]]:
+        """``(ok, severity summary)`` over every finding added, as ``summarize`` gives."""
+        from k8s_analyzer.analyzer.report import summarize_counts
+
+        counts: Dict[str, int] = {}
+        for group in self._groups.values():
+            severity = group.severity.upper()
+            counts[severity] = counts.get(severity, 0) + group.count
+        return summarize_counts(counts)
+
+
+def group_findings(findings: Iterable[CompactFinding],
+                   max_doc_indexes: int = settings.AGGREGATE_MAX_DOC_INDEXES) -> FindingAggregator:
+    aggregator = FindingAggregator(max_doc_indexes)
+    aggregator.extend(findings)
+    return aggregator
@@ -1,5 +1,15 @@
-from typing import List, Dict, Tuple, Set
-from k8s_analyzer.api.v1.models import Finding
+from dataclasses import dataclass, field
+from typing import List, Dict, Tuple, Set, Iterator, Union, IO, Optional
+import logging
+import time
+from k8s_analyzer.analyzer.findings import CompactFinding
+
+logger = logging.getLogger("k8s-yaml-analyzer.analyzer")
+
+
+class YamlParseError(ValueError):
+    """Raised by ``analyze_text`` when the input is not valid YAML."""
+
 
 SEVERITY_ORDER = {
     "CRITICAL": 4,
@@ -8,18 +18,18 @@ SEVERITY_ORDER = {
     "LOW": 1,
 }
 
-def dedupe_findings(findings: List[Finding]) -> List[Finding]:
-    """Remove duplicate findings by (rule_id, doc_index, path, message)."""
-    seen: Set[Tuple[str, int, str, str]] = set()
+def dedupe_findings(findings: List[CompactFinding]) -> List[CompactFinding]:
+    """
+    Remove duplicate findings by (rule, doc_index, path, message).
+
+    Engine output is already free of duplicates; this is for lists merged
+    from several sources.
+    """
+    seen: Set[Tuple] = set()
     result = []
 
     for f in findings:
-        key = (
-            f.rule_id,
-            f.doc_index or -1,
-            f.path or "",
-            f.message or "",
-        )
+        key = (f.meta, f.doc_index, f.path, f.message)
         if key not in seen:
             seen.add(key)
             result.append(f)
@@ -27,17 +37,181 @@ def dedupe_findings(findings: List[Finding]) -> List[Finding]:
     return result
 
 
-def analyze_all(docs) -> List[Finding]:
+@dataclass
+class ScanStats:
+    """Timing and volume of one scan (or several, merged). Picklable for worker processes."""
+    parse_seconds: float = 0.0
+    analyze_seconds: float = 0.0
+    documents: int = 0
+    findings: int = 0
+    size: int = 0
+    # rule_id -> [seconds, calls]; only filled for profiled scans
+    rules: Dict[str, List[float]] = field(default_factory=dict)
+    # rule_id -> analyzer, for grouping ``rules``
+    analyzers: Dict[str, str] = field(default_factory=dict)
+
+    def add_profile(self, profile):
+        """Fold an engine ``RuleProfile`` into ``rules``."""
+        for rule, (seconds, calls) in profile.items():
+            slot = self.rules.setdefault(rule.rule_id, [0.0, 0])
+            slot[0] += seconds
+            slot[1] += calls
+            self.analyzers[rule.rule_id] = rule.analyzer
+
+    def merge(self, other: "ScanStats"):
+        self.parse_seconds += other.parse_seconds
+        self.analyze_seconds += other.analyze_seconds
+        self.documents += other.documents
+        self.findings += other.findings
+        self.size += other.size
+        for rule_id, (seconds, calls) in other.rules.items():
+            slot = self.rules.setdefault(rule_id, [0.0, 0])
+            slot[0] += seconds
+            slot[1] += calls
+        self.analyzers.update(other.analyzers)
+
+    def analyzer_seconds(self) -> Dict[str, float]:
+        totals: Dict[str, float] = {}
+        for rule_id, (seconds, _) in self.rules.items():
+            name = self.analyzers[rule_id]
+            totals[name] = totals.get(name, 0.0) + seconds
+        return totals
+
+    def record(self):
+        """Observe this scan in the process-wide metrics registry."""
+        from k8s_analyzer.core import metrics
+
+        metrics.PARSE_SECONDS.observe(self.parse_seconds)
+        metrics.ANALYZE_SECONDS.observe(self.analyze_seconds)
+        metrics.DOCUMENTS_PER_REQUEST.observe(self.documents)
+        metrics.FINDINGS_PER_REQUEST.observe(self.findings)
+        for name, seconds in self.analyzer_seconds().items():
+            metrics.ANALYZER_SECONDS.observe(seconds, name)
+        for rule_id, (seconds, _) in self.rules.items():
+            metrics.RULE_SECONDS.observe(seconds, rule_id)
+
+
+def analyze_all(docs) -> List[CompactFinding]:
     """Unified entrypoint used by FastAPI & CLI."""
-    from k8s_analyzer.analyzer.schema_validator import validate_schema_for_docs
-    from k8s_analyzer.analyzer.best_practices import find_best_practices_issues
-    from k8s_analyzer.analyzer.security_checks import find_security_issues
-
-    all_findings: List[Finding] = []
-    all_findings.extend(validate_schema_for_docs(docs))
-    all_findings.extend(find_best_practices_issues(docs))
-    all_findings.extend(find_security_issues(docs))
-
-    # Remove duplicates across all validators
-    final = dedupe_findings(all_findings)
-    return final
+    from k8s_analyzer.analyzer.engine import run_rules
+
+    # every validator runs in one walk over the documents; the engine drops
+    # duplicate findings as it emits them
+    return run_rules(docs)
+
+
+def _timed_documents(docs: Iterator, stats: ScanStats) -> Iterator:
+    # time spent pulling the next document is parse time
+    while True:
+        started = time.perf_counter()
+        try:
+            item = next(docs)
+        except StopIteration:
+            stats.parse_seconds += time.perf_counter() - started
+            return
+        stats.parse_seconds += time.perf_counter() - started
+        stats.documents += 1
+        yield item
+
+
+def _positioned_documents(docs: Iterator, source_map) -> Iterator:
+    # iter_findings yields a document's findings before pulling the next one,
+    # so only the current document's positions are kept
+    previous = None
+    for idx, doc in docs:
+        if previous is not None:
+            source_map.forget(previous)
+        previous = idx
+        yield idx, doc
+
+
+def _positioned_findings(findings: Iterator[CompactFinding], source_map) -> Iterator[CompactFinding]:
+    for finding in findings:
+        source_map.annotate((finding,))
+        yield finding
+
+
+def analyze_stream(stream: Union[str, IO], stats: Optional[ScanStats] = None,
+                   positions: bool = False) -> Iterator[CompactFinding]:
+    """
+    Parse and analyze ``stream`` one document at a time, yielding findings as they are produced.
+
+    With ``stats``, parse time, per-rule time and counts are accumulated into it
+    as the stream is consumed (rule time stands in for ``analyze_seconds``).
+    With ``positions``, findings carry their source ``line``/``column``.
+    """
+    from k8s_analyzer.analyzer.parser import iter_yaml_documents
+    from k8s_analyzer.analyzer.engine import iter_findings
+
+    if positions:
+        from k8s_analyzer.analyzer.source_map import SourceMap
+        source_map = SourceMap()
+        docs = _positioned_documents(iter_yaml_documents(stream, source_map=source_map), source_map)
+    else:
+        source_map = None
+        docs = iter_yaml_documents(stream)
+
+    if stats is None:
+        findings = iter_findings(docs)
+    else:
+        findings = _profiled_stream(docs, stats)
+    return findings if source_map is None else _positioned_findings(findings, source_map)
+
+
+def _profiled_stream(docs: Iterator, stats: ScanStats) -> Iterator[CompactFinding]:
+    from k8s_analyzer.analyzer.engine import iter_findings
+
+    profile: Dict = {}
+    try:
+        for finding in iter_findings(_timed_documents(docs, stats), profile=profile):
+            stats.findings += 1
+            yield finding
+    finally:
+        stats.add_profile(profile)
+        stats.analyze_seconds += sum(seconds for seconds, _ in profile.values())
+
+
+def analyze_text(text: str, strict: bool = False, profile: bool = False,
+                 positions: bool = False) -> Tuple[List[CompactFinding], List[str], ScanStats]:
+    """
+    Parse and analyze ``text``, returning ``(findings, failed_rule_ids, stats)``.
+
+    A failing rule is logged and skipped so the remaining checks still run,
+    unless ``strict`` is set, in which case its exception propagates.  With
+    ``profile``, ``stats`` also carries per-rule timings; with ``positions``,
+    findings carry their source ``line``/``column`` (recorded while parsing).
+    Module-level and picklable so it can run in a worker process.
+    """
+    from k8s_analyzer.analyzer.parser import parse_yaml_documents
+    from k8s_analyzer.analyzer.engine import run_rules
+
+    source_map = None
+    if positions:
+        from k8s_analyzer.analyzer.source_map import SourceMap
+        source_map = SourceMap()
+
+    stats = ScanStats(size=len(text))
+    started = time.perf_counter()
+    try:
+        docs = parse_yaml_documents(text, source_map=source_map)
+    except Exception as e:
+        raise YamlParseError(str(e)) from e
+    parsed = time.perf_counter()
+    stats.parse_seconds = parsed - started
+    stats.documents = len(docs)
+
+    failed_rules: List[str] = []
+
+    def _rule_failed(rule, exc):
+        failed_rules.append(rule.rule_id)
+        logger.error("Rule %s failed, continuing with other checks", rule.rule_id, exc_info=exc)
+
+    rule_profile: Optional[Dict] = {} if profile else None
+    findings = run_rules(docs, on_error=None if strict else _rule_failed, profile=rule_profile)
+    if source_map is not None:
+        source_map.annotate(findings)
+    stats.analyze_seconds = time.perf_counter() - parsed
+    stats.findings = len(findings)
+    if rule_profile:
+        stats.add_profile(rule_profile)
+    return findings, failed_rules, stats
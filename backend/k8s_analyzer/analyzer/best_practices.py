@@ -1,53 +1,30 @@
 from typing import List, Dict, Any
-from k8s_analyzer.api.v1.models import Finding
-
-
-def find_best_practices_issues(docs: List[Dict[str, Any]]) -> List[Finding]:
-    findings = []
-
-    for idx, doc in enumerate(docs):
-        kind = (doc.get("kind") or "").lower()
-        spec = doc.get("spec", {})
-
-        # Determine PodSpec
-        if kind == "pod":
-            pod_spec = spec
-        else:
-            pod_spec = spec.get("template", {}).get("spec", {})
-
-        if not pod_spec:
-            continue
-
-        containers = pod_spec.get("containers", []) or []
-
-        # -------------------------------------------------------------------
-        # BP_001: Missing requests/limits
-        # -------------------------------------------------------------------
-        for i, c in enumerate(containers):
-            res = c.get("resources", {})
-            if not res or not res.get("requests") or not res.get("limits"):
-                findings.append(Finding(
-                    rule_id="BP_001",
-                    title="Missing CPU/Memory requests or limits",
-                    message=f"Container '{c.get('name', str(i))}' does not define resources.requests and resources.limits",
-                    severity="MEDIUM",
-                    path=f"spec.containers[{i}].resources",
-                    doc_index=idx
-                ))
-
-        # -------------------------------------------------------------------
-        # BP_002: Image tag (ONLY place for image tag check)
-        # -------------------------------------------------------------------
-        for i, c in enumerate(containers):
-            image = c.get("image", "")
-            if image and (":" not in image or image.endswith(":latest")):
-                findings.append(Finding(
-                    rule_id="BP_002",
-                    title="Use explicit image tags",
-                    message=f"Container '{c.get('name', str(i))}' uses ':latest' or no tag: {image}",
-                    severity="LOW",
-                    path=f"spec.containers[{i}].image",
-                    doc_index=idx
-                ))
-
-    return findings
+from k8s_analyzer.analyzer.findings import CompactFinding
+from k8s_analyzer.analyzer.engine import rule, run_rules, CONTAINER, _mapping
+from k8s_analyzer.analyzer.images import parse_image
+
+
+# -------------------------------------------------------------------
+# BP_001: Missing requests/limits
+# -------------------------------------------------------------------
+@rule("BP_001", "Missing CPU/Memory requests or limits", "MEDIUM", CONTAINER, "best_practices",
+      path="spec.containers[{index}].resources")
+def _missing_resources(c, i):
+    res = _mapping(c.get("resources"))
+    if not res or not res.get("requests") or not res.get("limits"):
+        return f"Container '{c.get('name', str(i))}' does not define resources.requests and resources.limits"
+
+
+# -------------------------------------------------------------------
+# BP_002: Image tag (ONLY place for image tag check)
+# -------------------------------------------------------------------
+@rule("BP_002", "Use explicit image tags", "LOW", CONTAINER, "best_practices",
+      path="spec.containers[{index}].image")
+def _untagged_image(c, i):
+    image = c.get("image")
+    if image and isinstance(image, str) and parse_image(image).floating:
+        return f"Container '{c.get('name', str(i))}' uses ':latest' or no tag: {image}"
+
+
+def find_best_practices_issues(docs: List[Dict[str, Any]]) -> List[CompactFinding]:
+    return run_rules(docs, analyzers=("best_practices",))
@@ -0,0 +1,151 @@
+# backend/app/analyzer/cache.py
+"""
+Content-addressed cache of scan results.
+
+Entries are keyed by sha256(ruleset fingerprint + policy fingerprint + app
+version + YAML text), so an unchanged manifest skips parsing and analysis
+entirely, and any rule or policy change invalidates every entry.  A
+``variant`` (e.g. "positions") keeps differently-shaped results apart.
+Results live in an in-memory LRU bounded by payload size, optionally backed
+by a SQLite file shared between processes and runs (``core/shared_store.py``).
+"""
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+
+from k8s_analyzer.analyzer.findings import CompactFinding
+from k8s_analyzer.core.settings import settings
+from k8s_analyzer.core.shared_store import SharedStore
+
+logger = logging.getLogger("k8s-yaml-analyzer.cache")
+
+
+class ScanCache:
+    def __init__(self, max_bytes: int = settings.SCAN_CACHE_MAX_BYTES, path: Optional[str] = None):
+        self.max_bytes = max_bytes
+        self.path = path
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._prefix: Optional[bytes] = None
+        self._disk = SharedStore(path, "scan_cache") if path is not None else None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # -- keys -----------------------------------------------------------------
+
+    def key(self, text: str, variant: str = "") -> str:
+        if self._prefix is None:
+            from k8s_analyzer.analyzer.engine import ruleset_fingerprint
+            from k8s_analyzer.analyzer.policy import get_policy
+            self._prefix = f"{ruleset_fingerprint()}:{get_policy().fingerprint}:{settings.APP_VERSION}:".encode()
+        prefix = self._prefix + f"{variant}:".encode() if variant else self._prefix
+        return hashlib.sha256(prefix + text.encode("utf-8", "surrogatepass")).hexdigest()
+
+    def rekey(self):
+        """Derive keys from the current ruleset and policy again (after reconfiguring either)."""
+        self._prefix = None
+
+    # -- memory layer ---------------------------------------------------------
+
+    def _remember(self, key: str, payload: bytes):
+        if len(payload) > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._size -= len(old)
+        self._entries[key] = payload
+        self._size += len(payload)
+        while self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+            self.evictions += 1
+
+    # -- public API -----------------------------------------------------------
+
+    def get(self, key: str) -> Optional[List[CompactFinding]]:
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                payload = None
+                if self._disk is not None:
+                    try:
+                        payload = self._disk.get(key)
+                    except sqlite3.Error:
+                        # locked or corrupt file: scan as on any other miss
+                        logger.exception("Failed to read scan cache entry")
+                if payload is None:
+                    self.misses += 1
+                    return None
+                self._remember(key, payload)
+                self.disk_hits += 1
+        return [CompactFinding.from_dict(f) for f in json.loads(payload)]
+
+    def put(self, key: str, findings: List[CompactFinding]):
+        payload = json.dumps([f.to_dict() for f in findings], ensure_ascii=False).encode()
+        with self._lock:
+            self._remember(key, payload)
+            if self._disk is not None:
+                try:
+                    self._disk.put(key, payload)
+                except sqlite3.Error:
+                    logger.exception("Failed to write scan cache entry")
+
+    def scan(self, text: str, analyze: Callable[[str], List[CompactFinding]],
+             variant: str = "") -> List[CompactFinding]:
+        """Return cached findings for ``text``, running ``analyze(text)`` on a miss."""
+        key = self.key(text, variant)
+        findings = self.get(key)
+        if findings is None:
+            findings = analyze(text)
+            self.put(key, findings)
+        return findings
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._size,
+            }
+
+    def open(self):
+        """Open the disk layer now, so a bad path fails at startup rather than in a request."""
+        if self._disk is not None:
+            self._disk.open()
+
+    def close(self):
+        with self._lock:
+            if self._disk is not None:
+                self._disk.close()
+
+
+_scan_cache: Optional[ScanCache] = None
+
+
+def configure_scan_cache(path: Optional[str] = settings.SCAN_CACHE_PATH,
+                         max_bytes: int = settings.SCAN_CACHE_MAX_BYTES) -> ScanCache:
+    """Replace the process-wide cache (e.g. to point the CLI at a shared SQLite file)."""
+    global _scan_cache
+    if _scan_cache is not None:
+        _scan_cache.close()
+    _scan_cache = ScanCache(max_bytes=max_bytes, path=path)
+    return _scan_cache
+
+
+def get_scan_cache() -> ScanCache:
+    if _scan_cache is None:
+        return configure_scan_cache()
+    return _scan_cache
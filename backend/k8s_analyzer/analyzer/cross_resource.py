@@ -0,0 +1,87 @@
+from k8s_analyzer.analyzer.engine import rule, BUNDLE, _mapping
+from k8s_analyzer.analyzer.resource_index import CONTROLLER_KINDS
+
+# Cross-resource checks: each document against the ResourceIndex of the whole
+# input (run_rules over two or more documents; not on the streaming path).
+
+# overlapping workloads named in one XREF_003 message
+_MAX_SHOWN = 3
+
+_KIND_NAMES = {"configmap": "ConfigMap", "secret": "Secret", "persistentvolumeclaim": "PersistentVolumeClaim"}
+
+
+# -------------------------------------------------------------------
+# XREF_001: Service selecting nothing
+# -------------------------------------------------------------------
+@rule("XREF_001", "Service selector matches no pods", "MEDIUM", BUNDLE, "best_practices",
+      path="spec.selector", kinds=["service"])
+def _service_without_pods(doc, bundle):
+    spec = _mapping(doc.get("spec"))
+    selector = spec.get("selector")
+    if not selector or not isinstance(selector, dict) or spec.get("type") == "ExternalName":
+        return None
+    namespace = bundle.namespace_of(doc)
+    # an input with no workloads in the namespace (a services-only file) proves nothing
+    if not bundle.has_pods(namespace) or bundle.selects_any(namespace, selector):
+        return None
+    shown = ", ".join(f"{k}={v}" for k, v in selector.items())
+    return f"Selector {shown} matches no Pod or workload template in namespace '{namespace}'"
+
+
+# -------------------------------------------------------------------
+# XREF_002: ConfigMap / Secret / PVC not in the input
+# -------------------------------------------------------------------
+@rule("XREF_002", "Reference to a resource missing from the input", "LOW", BUNDLE, "best_practices",
+      path="{key}")
+def _missing_references(doc, bundle):
+    refs = bundle.references.get(bundle.index_of(doc))
+    if not refs:
+        return None
+    namespace = bundle.namespace_of(doc)
+    # only kinds the input defines in the namespace: a partial bundle (workloads
+    # here, their ConfigMaps applied from elsewhere) proves nothing, as in XREF_001
+    missing = [
+        (f"{_KIND_NAMES[r.kind]} '{r.name}' is not defined in namespace '{namespace}' of this input", r.path)
+        for r in refs
+        if not r.optional and bundle.defines(r.kind, namespace) and bundle.get(r.kind, namespace, r.name) is None
+    ]
+    return missing or None
+
+
+# -------------------------------------------------------------------
+# XREF_003: Controllers fighting over the same pods
+# -------------------------------------------------------------------
+@rule("XREF_003", "Workload selectors overlap", "HIGH", BUNDLE, "best_practices",
+      path="spec.selector", kinds=sorted(CONTROLLER_KINDS))
+def _overlapping_selectors(doc, bundle):
+    selector = _mapping(doc.get("spec")).get("selector")
+    if not selector or not isinstance(selector, dict):
+        return None
+    if doc["kind"].lower() == "replicationcontroller":
+        match_labels, match_expressions = selector, None
+    else:
+        # a malformed half is left out (SCHEMA_004 reports it)
+        match_labels = _mapping(selector.get("matchLabels"))
+        match_expressions = selector.get("matchExpressions")
+        if not isinstance(match_expressions, list):
+            match_expressions = None
+        if not match_labels and not match_expressions:
+            return None
+    idx = bundle.index_of(doc)
+    members, member_set = bundle.controllers(bundle.namespace_of(doc), match_labels, match_expressions)
+    # a Deployment selecting the pods of its own ReplicaSets is the point
+    excluded = bundle.related(idx)
+    excluded.add(idx)
+    count = len(members) - len(excluded & member_set)
+    if count <= 0:
+        return None
+    # one finding per workload naming a few others: listing every pair would
+    # make n workloads sharing labels cost n^2
+    shown = []
+    for other in members:
+        if other not in excluded:
+            shown.append("{} '{}'".format(*bundle.identity(other)))
+            if len(shown) == _MAX_SHOWN:
+                break
+    more = count - len(shown)
+    return f"Selector also matches the pods of {', '.join(shown)}" + (f" and {more} more workloads" if more > 0 else "")
@@ -0,0 +1,463 @@
+# backend/app/analyzer/engine.py
+"""
+Single-pass rule engine.
+
+Rules register themselves with the node type they inspect (document, PodSpec,
+container, volume, ConfigMap key, or a document checked against the rest of
+the input) and, optionally, the kinds they apply to.  The engine walks every
+document once, resolves the PodSpec once and dispatches each node to the
+rules that asked for it.
+
+Rules are pure functions of their node, so within a scan the hits of a
+PodSpec or container whose content was already seen are replayed from a
+``ScanMemo`` instead of re-evaluated (see analyzer/memo.py).
+"""
+from dataclasses import dataclass, field
+import hashlib
+import time
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple, TYPE_CHECKING
+
+from k8s_analyzer.analyzer.findings import CompactFinding, RuleMeta, intern_meta
+from k8s_analyzer.analyzer.memo import SubtreeMemo
+from k8s_analyzer.analyzer.policy import Policy, RuleView, get_policy
+from k8s_analyzer.core.settings import settings
+
+if TYPE_CHECKING:
+    from k8s_analyzer.analyzer.resource_index import ResourceIndex
+
+# node types a rule can subscribe to
+DOCUMENT = "document"
+POD_SPEC = "pod_spec"
+CONTAINER = "container"
+VOLUME = "volume"
+CONFIGMAP_KEY = "configmap_key"
+# a document, with the ResourceIndex of every document in the input as key;
+# only evaluated by run_rules over more than one document
+BUNDLE = "bundle"
+
+NODE_TYPES = (DOCUMENT, POD_SPEC, CONTAINER, VOLUME, CONFIGMAP_KEY, BUNDLE)
+
+# analyzer groups, in the order their findings are reported
+ANALYZERS = ("schema", "best_practices", "security")
+
+
+class RuleTimeout(TimeoutError):
+    """Raised when a scan runs past its ``deadline``."""
+
+
+# identity equality/hash: rules are dict keys on the hot path
+@dataclass(frozen=True, eq=False)
+class Rule:
+    rule_id: str
+    title: str
+    severity: str
+    node: str
+    analyzer: str
+    check: Callable[[Any, Any], Optional[str]]
+    path: Optional[str] = None
+    kinds: Optional[FrozenSet[str]] = None
+    once_per_doc: bool = False
+    meta: RuleMeta = field(init=False, repr=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "meta", intern_meta(self.rule_id, self.title, self.severity))
+
+    def format_path(self, key: Any) -> Optional[str]:
+        if self.path is None or key is None:
+            return self.path
+        return self.path.format(index=key, key=key)
+
+
+class RuleRegistry:
+    """Holds rules and a per-(node, kind) dispatch table."""
+
+    def __init__(self):
+        self._rules: List[Rule] = []
+        self._dispatch: Dict[Tuple[str, str], Tuple[Rule, ...]] = {}
+
+    def register(self, rule: Rule) -> Rule:
+        if rule.node not in NODE_TYPES:
+            raise ValueError(f"Unknown node type for {rule.rule_id}: {rule.node}")
+        if rule.analyzer not in ANALYZERS:
+            raise ValueError(f"Unknown analyzer for {rule.rule_id}: {rule.analyzer}")
+        self._rules.append(rule)
+        self._dispatch.clear()
+        return rule
+
+    @property
+    def rules(self) -> Tuple[Rule, ...]:
+        return tuple(self._rules)
+
+    def rules_for(self, node: str, kind: str) -> Tuple[Rule, ...]:
+        key = (node, kind)
+        rules = self._dispatch.get(key)
+        if rules is None:
+            rules = tuple(
+                r for r in self._rules
+                if r.node == node and (r.kinds is None or kind in r.kinds)
+            )
+            self._dispatch[key] = rules
+        return rules
+
+
+REGISTRY = RuleRegistry()
+
+
+def rule(rule_id: str, title: str, severity: str, node: str, analyzer: str,
+         path: Optional[str] = None, kinds: Optional[Iterable[str]] = None,
+         once_per_doc: bool = False):
+    """
+    Decorator registering a check with the default registry.
+
+    The check is called as ``check(node, key)`` where ``key`` is the container /
+    volume index, the ConfigMap key, the ``ResourceIndex`` for BUNDLE rules, or
+    None for documents and PodSpecs.  It returns the finding message, or None
+    when the node is fine.  ``path`` may use ``{index}`` / ``{key}`` placeholders.
+    A check reporting several problems returns a list of ``(message, key)`` pairs
+    instead, each key filling ``path``.
+    """
+    def decorator(check):
+        REGISTRY.register(Rule(
+            rule_id=rule_id,
+            title=title,
+            severity=severity,
+            node=node,
+            analyzer=analyzer,
+            check=check,
+            path=path,
+            kinds=frozenset(k.lower() for k in kinds) if kinds is not None else None,
+            once_per_doc=once_per_doc,
+        ))
+        return check
+    return decorator
+
+
+def ruleset_fingerprint(registry: Optional[RuleRegistry] = None) -> str:
+    """
+    Hash of every registered rule's metadata and check bytecode.
+
+    Changes whenever a rule is added, removed or edited, so it can key caches of
+    analysis results.
+    """
+    if registry is None:
+        _load_builtin_rules()
+        registry = REGISTRY
+    h = hashlib.sha256()
+
+    def add_code(code):
+        h.update(code.co_code)
+        for const in code.co_consts:
+            # nested code objects (comprehensions) repr with their address
+            if hasattr(const, "co_code"):
+                add_code(const)
+            else:
+                h.update(repr(const).encode())
+
+    for r in registry.rules:
+        h.update(repr((r.rule_id, r.title, r.severity, r.node, r.analyzer, r.path,
+                       sorted(r.kinds or ()), r.once_per_doc)).encode())
+        add_code(r.check.__code__)
+    if registry is REGISTRY:
+        # SCHEMA_004 results depend on the selected Kubernetes schemas, all of
+        # them on how inputs are split into documents, BP_002 on how image
+        # references are parsed
+        from k8s_analyzer.analyzer.images import IMAGE_REF_VERSION
+        from k8s_analyzer.analyzer.openapi import get_schemas
+        from k8s_analyzer.analyzer.parser import PARSE_VERSION
+        h.update(get_schemas().fingerprint.encode())
+        h.update(f"parse:{PARSE_VERSION}".encode())
+        h.update(f"images:{IMAGE_REF_VERSION}".encode())
+    return h.hexdigest()
+
+
+def _load_builtin_rules():
+    # rule modules register themselves on import
+    from k8s_analyzer.analyzer import schema_validator, best_practices, security_checks, cross_resource  # noqa: F401
+
+
+# the walk steps over values of the wrong type; SCHEMA_004 reports them
+def _mapping(value: Any) -> Dict[str, Any]:
+    return value if isinstance(value, dict) else {}
+
+
+def _items(value: Any) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    if isinstance(value, list):
+        for i, item in enumerate(value):
+            if isinstance(item, dict):
+                yield i, item
+
+
+def _kind(doc: Dict[str, Any]) -> str:
+    kind = doc.get("kind")
+    return kind.lower() if isinstance(kind, str) else ""
+
+
+def get_pod_spec(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the PodSpec of a Pod or of a workload template (empty if none, or not a mapping)."""
+    spec = _mapping(doc.get("spec"))
+    if _kind(doc) == "pod":
+        return spec
+    return _mapping(_mapping(spec.get("template")).get("spec"))
+
+
+# rule -> [seconds, calls], filled when a scan is profiled
+RuleProfile = Dict[Rule, List[float]]
+
+# hits of one subtree in evaluation order: [(rule, [(message, key), ...]), ...]
+Recorded = List[Tuple[Rule, List[Tuple[str, Any]]]]
+
+
+class ScanMemo:
+    """
+    Recorded rule hits of the PodSpecs and containers seen so far in one scan
+    (only valid for one analyzer selection).  PodSpec entries are tagged with
+    the rules that ran, container entries also with the container index,
+    which messages and paths may use; doc indexes are attached later, in
+    ``_findings``.
+    """
+    __slots__ = ("pod_specs", "containers")
+
+    def __init__(self):
+        self.pod_specs: SubtreeMemo[Recorded] = SubtreeMemo(min_hit_rate=0.25)
+        # a container hit saves only a few cheap rule calls
+        self.containers: SubtreeMemo[Recorded] = SubtreeMemo(min_hit_rate=0.5)
+
+
+def _bundle(docs: List[Any], registry: RuleRegistry, analyzers: FrozenSet[str]) -> Optional["ResourceIndex"]:
+    # indexes for BUNDLE rules, built only when one of them will run
+    if len(docs) < 2 or not any(r.node == BUNDLE and r.analyzer in analyzers for r in registry.rules):
+        return None
+    from k8s_analyzer.analyzer.resource_index import ResourceIndex
+    return ResourceIndex(docs)
+
+
+def _scan_memo(docs: Any) -> Optional[ScanMemo]:
+    # a single document (the webhook) cannot repeat itself
+    if settings.SUBTREE_MEMO_MAX_ENTRIES <= 0 or (isinstance(docs, list) and len(docs) < 2):
+        return None
+    return ScanMemo()
+
+
+def _walk_document(doc: Dict[str, Any], registry: RuleRegistry,
+                   analyzers: FrozenSet[str], on_error,
+                   deadline: Optional[float] = None,
+                   profile: Optional[RuleProfile] = None,
+                   policy: Optional[Policy] = None,
+                   memo: Optional[ScanMemo] = None,
+                   bundle: Optional["ResourceIndex"] = None) -> Tuple[Dict[Rule, List[Tuple[str, Any]]], Optional[RuleView]]:
+    """
+    Walk one document, returning ``({rule: [(message, key), ...]}, view)`` for
+    rules that fired; ``view`` is the policy's RuleView for the document, if any.
+    With a ``memo``, PodSpecs and containers already evaluated in this scan
+    replay their recorded hits.  BUNDLE rules only run given a ``bundle``.
+    """
+    hits: Dict[Rule, List[Tuple[str, Any]]] = {}
+    perf_counter = time.perf_counter
+
+    def evaluate(rules, node, key, record=None):
+        # with ``record``, hits are appended there instead and once_per_doc
+        # is left to ``replay``, so the recording holds for any document;
+        # False when a rule failed and was reported to on_error
+        ok = True
+        for r in rules:
+            if r.analyzer not in analyzers:
+                continue
+            if record is None and r.once_per_doc and r in hits:
+                continue
+            if deadline is not None and perf_counter() > deadline:
+                raise RuleTimeout(f"scan deadline exceeded before {r.rule_id}")
+            try:
+                if profile is None:
+                    message = r.check(node, key)
+                else:
+                    started = perf_counter()
+                    message = r.check(node, key)
+                    slot = profile.get(r)
+                    if slot is None:
+                        slot = profile[r] = [0.0, 0]
+                    slot[0] += perf_counter() - started
+                    slot[1] += 1
+            except Exception as e:
+                if on_error is None:
+                    raise
+                on_error(r, e)
+                ok = False
+                continue
+            if message is not None:
+                if record is not None:
+                    record.append((r, message if message.__class__ is list else [(message, key)]))
+                elif message.__class__ is list:
+                    hits.setdefault(r, []).extend(message)
+                else:
+                    hits.setdefault(r, []).append((message, key))
+        return ok
+
+    def replay(recorded):
+        for r, pairs in recorded:
+            if r.once_per_doc and r in hits:
+                continue
+            hits.setdefault(r, []).extend(pairs)
+
+    if not isinstance(doc, dict):
+        # let document rules report on malformed input; nothing to walk into
+        evaluate(registry.rules_for(DOCUMENT, ""), doc, None)
+        return hits, None
+
+    kind = _kind(doc)
+    view = policy.view_for(doc, kind) if policy is not None else None
+    if view is None:
+        rules_for = registry.rules_for
+    else:
+        # disabled rules drop out of the dispatch tuples
+        def rules_for(node, kind):
+            return view.rules_for(registry, node, kind)
+
+    evaluate(rules_for(DOCUMENT, kind), doc, None)
+
+    pod_spec_rules = rules_for(POD_SPEC, kind)
+    container_rules = rules_for(CONTAINER, kind)
+    volume_rules = rules_for(VOLUME, kind)
+    pod_spec = get_pod_spec(doc) if pod_spec_rules or container_rules or volume_rules else None
+    if pod_spec:
+        pod_key = memo.pod_specs.key(pod_spec, (pod_spec_rules, container_rules, volume_rules)) if memo is not None else None
+        cached = memo.pod_specs.get(pod_key) if pod_key is not None else None
+        if cached is not None:
+            replay(cached)
+        else:
+            # record the whole PodSpec only when it can be stored
+            recorded = [] if pod_key is not None else None
+            ok = evaluate(pod_spec_rules, pod_spec, None, recorded)
+            if container_rules:
+                for i, c in _items(pod_spec.get("containers")):
+                    key = memo.containers.key(c, (container_rules, i)) if memo is not None else None
+                    if key is None:
+                        ok = evaluate(container_rules, c, i, recorded) and ok
+                        continue
+                    found = memo.containers.get(key)
+                    if found is None:
+                        found = []
+                        if evaluate(container_rules, c, i, found):
+                            memo.containers.put(key, found)
+                        else:
+                            ok = False
+                    if recorded is None:
+                        replay(found)
+                    else:
+                        recorded.extend(found)
+            if volume_rules:
+                for i, v in _items(pod_spec.get("volumes")):
+                    ok = evaluate(volume_rules, v, i, recorded) and ok
+            if recorded is not None:
+                replay(recorded)
+                if ok:
+                    memo.pod_specs.put(pod_key, recorded)
+
+    key_rules = rules_for(CONFIGMAP_KEY, kind)
+    if key_rules and kind == "configmap":
+        for key in _mapping(doc.get("data")):
+            evaluate(key_rules, key, key)
+
+    if bundle is not None:
+        evaluate(rules_for(BUNDLE, kind), doc, bundle)
+
+    return hits, view
+
+
+def _findings(hits: Dict[Rule, List[Tuple[str, Any]]], rules: Tuple[Rule, ...],
+              idx: int, view: Optional[RuleView] = None) -> Iterator[Tuple[Rule, CompactFinding]]:
+    """
+    Findings of one document.  A rule hitting the same path with the same
+    message twice (e.g. a static path over several containers) is reported
+    once; duplicates can only occur within a (rule, document) pair, so this
+    needs no state beyond the current rule's hits.
+    """
+    for r in rules:
+        rule_hits = hits.get(r)
+        if not rule_hits:
+            continue
+        meta = r.meta if view is None else view.meta(r)
+        if len(rule_hits) == 1:
+            message, key = rule_hits[0]
+            yield r, CompactFinding(meta, message, r.format_path(key), idx)
+            continue
+        seen = set()
+        for message, key in rule_hits:
+            path = r.format_path(key)
+            if (message, path) in seen:
+                continue
+            seen.add((message, path))
+            yield r, CompactFinding(meta, message, path, idx)
+
+
+def run_rules(docs: List[Dict[str, Any]],
+              analyzers: Iterable[str] = ANALYZERS,
+              registry: Optional[RuleRegistry] = None,
+              on_error: Optional[Callable[[Rule, Exception], None]] = None,
+              deadline: Optional[float] = None,
+              profile: Optional[RuleProfile] = None,
+              policy: Optional[Policy] = None) -> List[CompactFinding]:
+    """
+    Evaluate every registered rule against ``docs`` in a single walk.
+
+    Findings are reported grouped by analyzer (schema, best practices, security),
+    then by document, then by rule registration order, matching the order of the
+    original per-analyzer passes.  When ``on_error`` is given, a failing rule is
+    reported to it and skipped instead of aborting the scan.  ``deadline`` is a
+    ``time.perf_counter()`` value; once passed, ``RuleTimeout`` is raised before
+    the next rule runs.  When ``profile`` is given, each rule's evaluation time
+    and call count are accumulated into it.  ``policy`` defaults to the active
+    policy (``get_policy()``); pass ``Policy()`` to evaluate every rule as
+    registered.  With more than one document, BUNDLE (cross-resource) rules see
+    a ``ResourceIndex`` of all of them, built once before the walk.
+    """
+    if registry is None:
+        _load_builtin_rules()
+        registry = REGISTRY
+    if policy is None:
+        policy = get_policy()
+    selected = frozenset(analyzers)
+    buckets: Dict[str, List[CompactFinding]] = {name: [] for name in ANALYZERS}
+    ordered_rules = registry.rules
+    memo = _scan_memo(docs)
+    bundle = _bundle(docs, registry, selected)
+
+    for idx, doc in enumerate(docs):
+        hits, view = _walk_document(doc, registry, selected, on_error, deadline, profile, policy, memo, bundle)
+        if not hits:
+            continue
+        for r, finding in _findings(hits, ordered_rules, idx, view):
+            buckets[r.analyzer].append(finding)
+
+    findings: List[CompactFinding] = []
+    for name in ANALYZERS:
+        findings.extend(buckets[name])
+    return findings
+
+
+def iter_findings(docs: Iterable[Tuple[int, Dict[str, Any]]],
+                  analyzers: Iterable[str] = ANALYZERS,
+                  registry: Optional[RuleRegistry] = None,
+                  on_error: Optional[Callable[[Rule, Exception], None]] = None,
+                  profile: Optional[RuleProfile] = None,
+                  policy: Optional[Policy] = None) -> Iterator[CompactFinding]:
+    """
+    Streaming variant of ``run_rules``.
+
+    Consumes ``(doc_index, doc)`` pairs lazily and yields each document's
+    findings (ordered by analyzer, then rule) before pulling the next document.
+    BUNDLE rules need every document up front, so they do not run here.
+    """
+    if registry is None:
+        _load_builtin_rules()
+        registry = REGISTRY
+    if policy is None:
+        policy = get_policy()
+    selected = frozenset(analyzers)
+    ordered_rules = tuple(sorted(registry.rules, key=lambda r: ANALYZERS.index(r.analyzer)))
+    memo = _scan_memo(docs)
+
+    for idx, doc in docs:
+        hits, view = _walk_document(doc, registry, selected, on_error, profile=profile, policy=policy, memo=memo)
+        if hits:
+            for _, finding in _findings(hits, ordered_rules, idx, view):
+                yield finding
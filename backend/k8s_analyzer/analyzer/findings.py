@@ -0,0 +1,127 @@
+# backend/app/analyzer/findings.py
+"""
+Compact internal finding record.
+
+Rules can fire tens of thousands of times per scan, so the analyzer does not
+build a Pydantic ``Finding`` per hit.  A ``CompactFinding`` holds the per-hit
+fields in ``__slots__`` and points at an interned ``RuleMeta`` (rule id, title,
+severity) shared by every finding of the same rule.  Conversion to the API
+models happens only at the boundary (``build_report`` / serializers).
+"""
+from typing import TYPE_CHECKING, Any, Dict, NamedTuple, Optional
+
+if TYPE_CHECKING:
+    from k8s_analyzer.api.v1.models import Finding
+
+# the Pydantic model, imported on first use: Pydantic is most of the startup
+# time of a CLI run, which never builds models
+_finding_model = None
+
+
+def _load_finding_model():
+    global _finding_model
+    from k8s_analyzer.api.v1.models import Finding
+
+    _finding_model = Finding
+    return Finding
+
+
+class RuleMeta(NamedTuple):
+    rule_id: str
+    title: str
+    severity: str
+
+
+_INTERNED: Dict[RuleMeta, RuleMeta] = {}
+
+
+def intern_meta(rule_id: str, title: str, severity: str) -> RuleMeta:
+    """Return the shared ``RuleMeta`` instance for this rule metadata."""
+    meta = RuleMeta(rule_id, title, severity)
+    return _INTERNED.setdefault(meta, meta)
+
+
+def _restore(rule_id, title, severity, message, path, doc_index, line=None, column=None) -> "CompactFinding":
+    return CompactFinding(intern_meta(rule_id, title, severity), message, path, doc_index, line, column)
+
+
+class CompactFinding:
+    __slots__ = ("meta", "message", "path", "doc_index", "line", "column")
+
+    def __init__(self, meta: RuleMeta, message: str, path: Optional[str] = None,
+                 doc_index: Optional[int] = None, line: Optional[int] = None,
+                 column: Optional[int] = None):
+        self.meta = meta
+        self.message = message
+        self.path = path
+        self.doc_index = doc_index
+        # 1-based source position, set by SourceMap.annotate when requested
+        self.line = line
+        self.column = column
+
+    @property
+    def rule_id(self) -> str:
+        return self.meta.rule_id
+
+    @property
+    def title(self) -> str:
+        return self.meta.title
+
+    @property
+    def severity(self) -> str:
+        return self.meta.severity
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "CompactFinding":
+        return cls(intern_meta(d["rule_id"], d["title"], d["severity"]),
+                   d["message"], d.get("path"), d.get("doc_index"), d.get("line"), d.get("column"))
+
+    def to_dict(self) -> Dict[str, Any]:
+        # same key order as Finding.model_dump()
+        meta = self.meta
+        d = {
+            "rule_id": meta.rule_id,
+            "title": meta.title,
+            "message": self.message,
+            "severity": meta.severity,
+            "path": self.path,
+            "doc_index": self.doc_index,
+        }
+        if self.line is not None:
+            d["line"] = self.line
+            d["column"] = self.column
+        return d
+
+    def to_model(self) -> "Finding":
+        # trusted analyzer output: skip Pydantic validation
+        meta = self.meta
+        return (_finding_model or _load_finding_model()).model_construct(
+            rule_id=meta.rule_id,
+            title=meta.title,
+            message=self.message,
+            severity=meta.severity,
+            path=self.path,
+            doc_index=self.doc_index,
+            line=self.line,
+            column=self.column,
+        )
+
+    def __reduce__(self):
+        # re-intern rule metadata when findings cross a process boundary
+        meta = self.meta
+        args = (meta.rule_id, meta.title, meta.severity, self.message, self.path, self.doc_index)
+        if self.line is not None:
+            args += (self.line, self.column)
+        return _restore, args
+
+    def __eq__(self, other):
+        if not isinstance(other, CompactFinding):
+            return NotImplemented
+        return (self.meta, self.message, self.path, self.doc_index, self.line, self.column) == \
+            (other.meta, other.message, other.path, other.doc_index, other.line, other.column)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return (f"CompactFinding(rule_id={self.rule_id!r}, severity={self.severity!r}, "
+                f"path={self.path!r}, doc_index={self.doc_index!r})")
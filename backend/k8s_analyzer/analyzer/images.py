@@ -0,0 +1,129 @@
+# backend/app/analyzer/images.py
+"""
+Container image references, parsed once, and the webhook's image policy.
+
+    [registry[:port]/]repository[:tag][@digest]
+
+The first path component is a registry when it has a ``.`` or a ``:`` (a
+port) or is ``localhost``, as in Docker's own resolution, so
+``registry:5000/app`` is the untagged ``app`` on ``registry:5000`` and not
+tag ``5000/app`` of ``registry``.  References without one come from
+``docker.io``.
+
+A fleet runs a few hundred distinct images across thousands of containers
+and admission reviews, so ``parse_image`` keeps the last
+``settings.IMAGE_REF_CACHE_SIZE`` results.  BP_002 and the admission webhook
+both read tags through it.
+
+``ImagePolicy`` is what the webhook enforces per image, compiled once from
+``KYA_IMAGE_*`` settings (comma-separated lists): allowed and denied
+registries, whether images must be pinned by digest, and image prefixes
+exempt from all of it (by default the analyzer's own backend image).
+"""
+from functools import lru_cache
+from typing import FrozenSet, NamedTuple, Optional, Tuple
+import hashlib
+import json
+
+from k8s_analyzer.analyzer.policy import PolicyError
+from k8s_analyzer.core.settings import settings
+
+# bumped when parsing changes what BP_002 reports; part of the ruleset fingerprint
+IMAGE_REF_VERSION = 1
+
+DEFAULT_REGISTRY = "docker.io"
+# names Docker Hub is also reached under
+_REGISTRY_ALIASES = {"index.docker.io": DEFAULT_REGISTRY, "registry-1.docker.io": DEFAULT_REGISTRY}
+
+
+class ImageRef(NamedTuple):
+    registry: str
+    repository: str
+    tag: Optional[str]
+    digest: Optional[str]
+
+    @property
+    def floating(self) -> bool:
+        """Neither pinned by digest nor tagged other than ``latest``."""
+        return self.digest is None and (self.tag is None or self.tag == "latest")
+
+
+def _registry(host: str) -> str:
+    host = host.lower()
+    return _REGISTRY_ALIASES.get(host, host)
+
+
+@lru_cache(maxsize=settings.IMAGE_REF_CACHE_SIZE)
+def parse_image(image: str) -> ImageRef:
+    """Split an image reference; empty tag and digest parts read as absent."""
+    name, _, digest = image.partition("@")
+    registry = DEFAULT_REGISTRY
+    slash = name.find("/")
+    if slash > 0:
+        head = name[:slash]
+        if "." in head or ":" in head or head == "localhost":
+            registry = _registry(head)
+            name = name[slash + 1:]
+    # a tag can only follow the last path component
+    colon = name.find(":", name.rfind("/") + 1)
+    if colon < 0:
+        return ImageRef(registry, name, None, digest or None)
+    return ImageRef(registry, name[:colon], name[colon + 1:] or None, digest or None)
+
+
+def _setting_list(raw: str) -> Tuple[str, ...]:
+    return tuple(s.strip() for s in raw.split(",") if s.strip())
+
+
+def _registries(raw: str, name: str) -> FrozenSet[str]:
+    hosts = _setting_list(raw)
+    for host in hosts:
+        if "/" in host:
+            raise PolicyError(f"KYA_{name}: '{host}' is not a registry host (no path)")
+    return frozenset(_registry(h) for h in hosts)
+
+
+class ImagePolicy:
+    def __init__(self, allowed_registries: str = "", denied_registries: str = "",
+                 require_digest: bool = False, bypass_prefixes: str = ""):
+        # no allowed registries: any registry not denied
+        self.allowed = _registries(allowed_registries, "IMAGE_ALLOWED_REGISTRIES") or None
+        self.denied = _registries(denied_registries, "IMAGE_DENIED_REGISTRIES")
+        self.require_digest = require_digest
+        # one str.startswith call for all of them
+        self.bypass_prefixes = _setting_list(bypass_prefixes)
+        canonical = json.dumps([sorted(self.allowed or ()), sorted(self.denied), require_digest,
+                                self.bypass_prefixes])
+        self.fingerprint = hashlib.sha256(canonical.encode()).hexdigest()[:16]
+
+    def violation(self, image: str) -> Optional[str]:
+        """Why the webhook denies ``image``, or None when it may run."""
+        if self.bypass_prefixes and image.startswith(self.bypass_prefixes):
+            return None
+        ref = parse_image(image)
+        if ref.registry in self.denied:
+            return f"Image {image} is from a denied registry ({ref.registry})."
+        if self.allowed is not None and ref.registry not in self.allowed:
+            return f"Image {image} is not from an allowed registry ({ref.registry})."
+        if self.require_digest and ref.digest is None:
+            return f"Image {image} is not pinned by digest."
+        if ref.floating:
+            return f"Disallowed image tag in {image} (no tag or :latest)."
+        return None
+
+
+_image_policy: Optional[ImagePolicy] = None
+
+
+def configure_image_policy() -> ImagePolicy:
+    """Compile and activate the image policy from ``settings``."""
+    global _image_policy
+    _image_policy = ImagePolicy(settings.IMAGE_ALLOWED_REGISTRIES, settings.IMAGE_DENIED_REGISTRIES,
+                                settings.IMAGE_REQUIRE_DIGEST, settings.IMAGE_BYPASS_PREFIXES)
+    return _image_policy
+
+
+def get_image_policy() -> ImagePolicy:
+    if _image_policy is None:
+        return configure_image_policy()
+    return _image_policy
@@ -0,0 +1,193 @@
+# backend/app/analyzer/incremental.py
+"""
+State for incremental CLI scans.
+
+A JSON state file maps every scanned file to its mtime, size, content hash and
+the findings of the run that produced them.  On the next run a file whose
+stat is unchanged (or, failing that, whose hash is unchanged) reuses its
+findings without being parsed.  The whole state is dropped when the ruleset,
+policy, app version or result variant (e.g. positions) changes.
+
+Content hashes are git blob ids, so with a ``GitBaseline`` files that
+``git diff --name-only <base>`` does not report are matched against the blob
+ids of ``<base>`` without being stat'ed or read (fresh CI checkouts have new
+mtimes on every file).
+"""
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+import hashlib
+import json
+import logging
+import os
+import subprocess
+import time
+
+from k8s_analyzer.analyzer.findings import CompactFinding
+from k8s_analyzer.core.settings import settings
+
+logger = logging.getLogger("k8s-yaml-analyzer.incremental")
+
+STATE_VERSION = 1
+
+# (mtime_ns, size, git blob id)
+FileStamp = Tuple[int, int, str]
+
+
+def git_blob_id(path: str) -> str:
+    """``git hash-object`` of a file (no clean filters / line-ending conversion)."""
+    with open(path, "rb") as fh:
+        data = fh.read()
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+@lru_cache(maxsize=4096)
+def _real_dir(directory: str) -> str:
+    return os.path.realpath(directory)
+
+
+def _state_key(path: str) -> str:
+    # resolve symlinks once per directory rather than per file
+    directory, name = os.path.split(os.path.abspath(path))
+    return os.path.join(_real_dir(directory), name)
+
+
+class GitBaseline(NamedTuple):
+    # real paths changed against the base in the working tree, plus untracked files
+    changed: Set[str]
+    # real path -> blob id at the base
+    blobs: Dict[str, str]
+
+
+def git_baseline(base: str, cwd: Optional[str] = None) -> GitBaseline:
+    """
+    Files changed against ``base`` and the blob ids of ``base``.  Raises
+    RuntimeError when git fails (not a repository, unknown ref, git missing).
+    """
+    def git(*args: str) -> List[str]:
+        # NUL-separated output: paths as they are, not C-quoted (non-ASCII,
+        # tabs, newlines), decoded the way os.fsdecode would
+        try:
+            out = subprocess.run(["git", *args], cwd=cwd, capture_output=True, check=True,
+                                 encoding="utf-8", errors="surrogateescape")
+        except (OSError, subprocess.CalledProcessError) as e:
+            detail = getattr(e, "stderr", "") or str(e)
+            raise RuntimeError(f"git {' '.join(args)} failed: {detail.strip()}") from e
+        return [entry for entry in out.stdout.split("\0") if entry]
+
+    top = os.path.realpath(git("rev-parse", "--show-toplevel")[0].rstrip("\n"))
+    # both relative to the top level, like ls-tree's, and over the whole tree
+    # (":/"), not only the directory git runs in
+    names = (git("diff", "-z", "--name-only", base, "--")
+             + git("ls-files", "-z", "--full-name", "--others", "--exclude-standard", "--", ":/"))
+    blobs: Dict[str, str] = {}
+    for line in git("ls-tree", "-z", "-r", "--full-tree", base):
+        info, _, name = line.partition("\t")
+        _, kind, blob = info.split()
+        if kind == "blob":
+            blobs[os.path.join(top, name)] = blob
+    return GitBaseline({os.path.join(top, name) for name in names}, blobs)
+
+
+class ScanState:
+    def __init__(self, path: str, fingerprint: str):
+        self.path = path
+        self.fingerprint = fingerprint
+        self._files: Dict[str, Dict[str, Any]] = {}
+        self._stamps: Dict[str, FileStamp] = {}
+        # mtimes at or after the previous run's start are not trusted: the file
+        # may have been edited within the same timestamp tick it was read in
+        self._trusted_before_ns = 0
+        self._started_ns = time.time_ns()
+        self._dirty = False
+        self.reused = 0
+        self.rescanned = 0
+
+    @classmethod
+    def load(cls, path: str, variant: str = "") -> "ScanState":
+        from k8s_analyzer.analyzer.engine import ruleset_fingerprint
+        from k8s_analyzer.analyzer.policy import get_policy
+
+        fingerprint = f"{ruleset_fingerprint()}:{get_policy().fingerprint}:{settings.APP_VERSION}"
+        state = cls(path, f"{fingerprint}:{variant}" if variant else fingerprint)
+        try:
+            with open(path, "r") as fh:
+                data = json.load(fh)
+        except FileNotFoundError:
+            return state
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable scan state %s: %s", path, e)
+            return state
+        if data.get("version") != STATE_VERSION or data.get("fingerprint") != state.fingerprint:
+            logger.info("Scan state %s is from another ruleset; rescanning everything", path)
+            return state
+        state._files = data.get("files") or {}
+        state._trusted_before_ns = data.get("started_ns") or 0
+        return state
+
+    def _reused(self, entry: Dict[str, Any]) -> List[CompactFinding]:
+        self.reused += 1
+        return [CompactFinding.from_dict(f) for f in entry["findings"]]
+
+    def reuse(self, path: str, baseline: Optional[GitBaseline] = None) -> Optional[List[CompactFinding]]:
+        """
+        Findings recorded for ``path`` if it is unchanged, else None.
+
+        With a ``baseline``, a file git reports as unchanged whose blob at the
+        base matches the recorded one is trusted without a stat.  On None the
+        file's stamp is remembered for ``record``.
+        """
+        key = _state_key(path)
+        entry = self._files.get(key)
+        if (entry is not None and baseline is not None and key not in baseline.changed
+                and baseline.blobs.get(key) == entry["blob"]):
+            return self._reused(entry)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        if (entry is not None and entry["size"] == st.st_size
+                and entry["mtime_ns"] == st.st_mtime_ns and st.st_mtime_ns < self._trusted_before_ns):
+            return self._reused(entry)
+        try:
+            stamp = (st.st_mtime_ns, st.st_size, git_blob_id(path))
+        except OSError:
+            return None
+        if entry is not None and entry["blob"] == stamp[2]:
+            entry["mtime_ns"], entry["size"] = stamp[0], stamp[1]
+            self._dirty = True
+            return self._reused(entry)
+        self._stamps[key] = stamp
+        return None
+
+    def record(self, path: str, findings: Iterable[CompactFinding]):
+        """Store findings for a file just scanned, under the stamp taken by ``reuse``."""
+        key = _state_key(path)
+        stamp = self._stamps.pop(key, None)
+        if stamp is None:
+            return
+        self.rescanned += 1
+        self._dirty = True
+        mtime_ns, size, blob = stamp
+        self._files[key] = {"mtime_ns": mtime_ns, "size": size, "blob": blob,
+                            "findings": [f.to_dict() for f in findings]}
+
+    def forget(self, path: str):
+        """Drop a file that failed to scan, so the next run retries it."""
+        key = _state_key(path)
+        if self._files.pop(key, None) is not None:
+            self._dirty = True
+        self._stamps.pop(key, None)
+
+    def save(self):
+        """Write the state atomically; a run that changed nothing leaves the file alone."""
+        if not self._dirty and os.path.exists(self.path):
+            return
+        # deleted files drop out; entries for files outside this run are kept
+        files = {k: v for k, v in self._files.items() if os.path.exists(k)}
+        data = {"version": STATE_VERSION, "fingerprint": self.fingerprint,
+                "started_ns": self._started_ns, "files": files}
+        tmp = f"{self.path}.tmp.{os.getpid()}"
+        with open(tmp, "w") as fh:
+            # dumps (not dump) so the C encoder is used
+            fh.write(json.dumps(data, ensure_ascii=False, separators=(",", ":")))
+        os.replace(tmp, self.path)
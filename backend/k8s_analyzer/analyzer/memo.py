@@ -0,0 +1,85 @@
+# backend/app/analyzer/memo.py
+"""
+Content-keyed memo for repeated manifest subtrees.
+
+Fleet dumps repeat the same pod template and sidecar containers across
+hundreds of documents (one Deployment per namespace, one chart per
+environment); work whose result depends only on such a subtree can be done
+once per distinct subtree.  Keys are the subtree's ``marshal`` bytes: exact
+(``1``, ``1.0`` and ``True`` differ) and several times cheaper to compute than
+JSON, with keys in document order.
+
+Hashing a subtree costs about as much as running the cheap container rules
+on it, so the memo watches its hit rate.  When a window of lookups finds too
+few repeats it stops hashing for the next several windows, then probes again;
+scans of all-distinct manifests keep close to their unmemoized speed.
+"""
+import marshal
+from typing import Any, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+from k8s_analyzer.core.settings import settings
+
+V = TypeVar("V")
+
+# lookups per hit-rate window, and windows skipped after a poor one
+_WINDOW = 256
+_BACKOFF = 8
+
+
+class SubtreeMemo(Generic[V]):
+    """
+    ``key(node, tag)`` returns None while the memo is bypassing (or for
+    subtrees ``marshal`` cannot encode, e.g. YAML timestamps loaded as
+    ``datetime``); callers then just do the work.  ``tag`` separates results
+    that also depend on something besides the subtree (the rules that ran, a
+    container index).  Counters may drift under concurrent use; entries never
+    go wrong, as a value is stored only once it is complete.
+    """
+
+    def __init__(self, max_entries: int = settings.SUBTREE_MEMO_MAX_ENTRIES,
+                 min_hit_rate: float = 0.25):
+        self.max_entries = max_entries
+        self.min_hit_rate = min_hit_rate
+        self._entries: Dict[Tuple[Hashable, bytes], V] = {}
+        self._window_hits = 0
+        self._window_lookups = 0
+        self._skip = 0
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+
+    def key(self, node: Any, tag: Hashable = None) -> Optional[Tuple[Hashable, bytes]]:
+        if self._skip:
+            self._skip -= 1
+            self.bypassed += 1
+            return None
+        try:
+            return tag, marshal.dumps(node)
+        except ValueError:
+            return None
+
+    def get(self, key: Tuple[Hashable, bytes]) -> Optional[V]:
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._window_hits += 1
+        self._window_lookups += 1
+        if self._window_lookups >= _WINDOW:
+            if self._window_hits < _WINDOW * self.min_hit_rate:
+                self._skip = _WINDOW * _BACKOFF
+            self._window_hits = self._window_lookups = 0
+        return value
+
+    def put(self, key: Tuple[Hashable, bytes], value: V):
+        if len(self._entries) >= self.max_entries:
+            self._entries.clear()
+        self._entries[key] = value
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "bypassed": self.bypassed,
+                "entries": len(self._entries)}
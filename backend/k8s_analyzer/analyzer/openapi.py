@@ -0,0 +1,357 @@
+# backend/app/analyzer/openapi.py
+"""
+Offline Kubernetes OpenAPI validation.
+
+Schemas are Swagger 2.0 documents (the format of upstream
+``api/openapi-spec/swagger.json``) named ``v<major>.<minor>.json``, bundled in
+``k8s_analyzer/schemas`` or found in ``settings.K8S_SCHEMA_DIR``, which is
+searched first so a full upstream spec can replace the trimmed bundled one.
+Definitions carrying ``x-kubernetes-group-version-kind`` are the validatable
+kinds; any other apiVersion/kind (CRDs, removed APIs) is not validated.
+
+Each definition is compiled into a closure the first time a document needs
+it, and the closures are kept for the life of the ``SchemaSet``: validating a
+document is a walk over its own fields with dict lookups, never a walk over
+the raw schema.  Scalars compile to a frozenset of accepted Python types.
+
+Kubernetes semantics rather than strict JSON Schema: null is accepted
+anywhere (the API server treats it as unset), ``int-or-string`` and
+``Quantity`` accept numbers or strings, and objects with ``properties`` reject
+unknown fields as ``kubectl --validate=strict`` does.
+
+PodSpec and Container validators remember the errors of each distinct
+subtree for the life of the set (see analyzer/memo.py), so the pod template
+repeated across a fleet's workloads is validated once.
+"""
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+import hashlib
+import json
+import os
+import re
+import threading
+
+from k8s_analyzer.analyzer.memo import SubtreeMemo
+from k8s_analyzer.core.settings import settings
+
+BUNDLED_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "schemas")
+
+# (message, path) pairs, path as in findings ("spec.containers[0].image")
+Errors = List[Tuple[str, str]]
+Validator = Callable[[Any, str, Errors], None]
+# a compiled schema: accepted scalar types, a validator, or None for "anything"
+Check = Union[frozenset, Validator, None]
+
+_STRING = frozenset({str})
+_INTEGER = frozenset({int})
+_NUMBER = frozenset({int, float})
+_BOOLEAN = frozenset({bool})
+_DATE_TIME = frozenset({str, datetime, date})
+_INT_OR_STRING = frozenset({int, str})
+_QUANTITY = frozenset({int, float, str})
+
+_LABELS = {
+    _STRING: "string", _INTEGER: "integer", _NUMBER: "number", _BOOLEAN: "boolean",
+    _DATE_TIME: "date-time string", _INT_OR_STRING: "integer or string", _QUANTITY: "quantity",
+}
+
+_SCALARS = {"string": _STRING, "integer": _INTEGER, "number": _NUMBER, "boolean": _BOOLEAN}
+
+_TYPE_NAMES = {dict: "object", list: "array", str: "string", int: "integer", float: "number", bool: "boolean"}
+
+_VERSION = re.compile(r"^v?(\d+)\.(\d+)(?:\.\d+)?$")
+
+# definitions whose results are memoized by subtree content, with the hit rate
+# below which hashing costs more than it saves (see memo.SubtreeMemo)
+_MEMOIZED = {"io.k8s.api.core.v1.PodSpec": 0.25, "io.k8s.api.core.v1.Container": 0.5}
+
+
+class SchemaError(ValueError):
+    """Raised when a schema set cannot be found or read."""
+
+
+def _type_name(value: Any) -> str:
+    return _TYPE_NAMES.get(type(value), type(value).__name__)
+
+
+def _join(path: str, key: Any) -> str:
+    return f"{path}.{key}" if path else str(key)
+
+
+def _type_error(check: frozenset, value: Any) -> str:
+    return f"Expected {_LABELS.get(check, 'value')}, got {_type_name(value)}"
+
+
+def _apply(check: Check, value: Any, path: str, errors: Errors):
+    # shared by object, map and array validators; null values are never checked
+    if check.__class__ is frozenset:
+        if type(value) not in check:
+            errors.append((_type_error(check, value), path))
+    else:
+        check(value, path, errors)
+
+
+def _memoized(validator: Validator, memo: "SubtreeMemo[Errors]") -> Validator:
+    # errors are recorded relative to the subtree and re-rooted at each path
+    def validate(value, path, errors):
+        key = memo.key(value)
+        found = memo.get(key) if key is not None else None
+        if found is None:
+            if key is None:
+                validator(value, path, errors)
+                return
+            found = []
+            validator(value, "", found)
+            memo.put(key, found)
+        if not path:
+            errors.extend(found)
+            return
+        for message, sub in found:
+            errors.append((message, f"{path}.{sub}" if sub else path))
+    return validate
+
+
+class _Compiler:
+    def __init__(self, definitions: Dict[str, Any], memo_entries: int = settings.SUBTREE_MEMO_MAX_ENTRIES):
+        self.definitions = definitions
+        self.memo_entries = memo_entries
+        self._compiled: Dict[str, Check] = {}
+
+    def ref(self, name: str) -> Check:
+        if name in self._compiled:
+            return self._compiled[name]
+        schema = self.definitions.get(name)
+        if schema is None:
+            # dangling reference: accept anything rather than reject valid input
+            self._compiled[name] = None
+            return None
+        # recursive definitions (e.g. JSONSchemaProps) see a forwarder until compiled
+        cell: List[Check] = []
+
+        def forward(value, path, errors):
+            if cell[0] is not None:
+                _apply(cell[0], value, path, errors)
+
+        self._compiled[name] = forward
+        if name.endswith(".api.resource.Quantity"):
+            # serialized as a string, but the API server also takes plain numbers
+            compiled: Check = _QUANTITY
+        else:
+            compiled = self.compile(schema)
+            if name in _MEMOIZED and self.memo_entries > 0 and callable(compiled):
+                compiled = _memoized(compiled, SubtreeMemo(self.memo_entries, _MEMOIZED[name]))
+        cell.append(compiled)
+        self._compiled[name] = compiled
+        return compiled
+
+    def compile(self, schema: Dict[str, Any]) -> Check:
+        if not isinstance(schema, dict):
+            return None
+        if "$ref" in schema:
+            return self.ref(schema["$ref"].rsplit("/", 1)[-1])
+        all_of = schema.get("allOf")
+        if isinstance(all_of, list) and len(all_of) == 1:
+            return self.compile(all_of[0])
+        if schema.get("x-kubernetes-preserve-unknown-fields"):
+            return None
+        if schema.get("format") == "int-or-string" or schema.get("x-kubernetes-int-or-string"):
+            return _INT_OR_STRING
+        kind = schema.get("type")
+        if kind == "object":
+            return self._object(schema)
+        if kind == "array":
+            return self._array(schema)
+        scalar = _SCALARS.get(kind)
+        if scalar is None:
+            return None
+        if kind == "string" and schema.get("format") == "date-time":
+            scalar = _DATE_TIME
+        if "enum" in schema:
+            return self._enum(scalar, schema["enum"])
+        return scalar
+
+    def _enum(self, scalar: frozenset, values: List[Any]) -> Validator:
+        allowed = frozenset(values)
+        shown = ", ".join(sorted(str(v) for v in values))
+
+        def validate(value, path, errors):
+            if type(value) not in scalar:
+                errors.append((_type_error(scalar, value), path))
+            elif value not in allowed:
+                errors.append((f"Unsupported value {value!r}; expected one of: {shown}", path))
+        return validate
+
+    def _array(self, schema: Dict[str, Any]) -> Validator:
+        item = self.compile(schema.get("items"))
+
+        def validate(value, path, errors):
+            if type(value) is not list:
+                errors.append((f"Expected array, got {_type_name(value)}", path))
+                return
+            if item is None:
+                return
+            for i, v in enumerate(value):
+                if v is not None:
+                    _apply(item, v, f"{path}[{i}]", errors)
+        return validate
+
+    def _object(self, schema: Dict[str, Any]) -> Validator:
+        properties = schema.get("properties")
+        additional = schema.get("additionalProperties")
+        if not properties:
+            values = self.compile(additional) if isinstance(additional, dict) else None
+
+            def validate_map(value, path, errors):
+                if type(value) is not dict:
+                    errors.append((f"Expected object, got {_type_name(value)}", path))
+                    return
+                if values is None:
+                    return
+                for k, v in value.items():
+                    if v is not None:
+                        _apply(values, v, _join(path, k), errors)
+            return validate_map
+
+        props = {name: self.compile(sub) for name, sub in properties.items()}
+        required = tuple(schema.get("required") or ())
+        # upstream object schemas are closed unless they say otherwise
+        closed = additional is None or additional is False
+
+        def validate(value, path, errors):
+            if type(value) is not dict:
+                errors.append((f"Expected object, got {_type_name(value)}", path))
+                return
+            for k, v in value.items():
+                check = props.get(k, _UNKNOWN)
+                if check is _UNKNOWN:
+                    if closed:
+                        errors.append((f'Unknown field "{k}"', _join(path, k)))
+                elif check is not None and v is not None:
+                    _apply(check, v, _join(path, k), errors)
+            for name in required:
+                if value.get(name) is None:
+                    errors.append((f'Missing required field "{name}"', _join(path, name)))
+        return validate
+
+
+_UNKNOWN = object()
+
+
+def _group_version(gvk: Dict[str, Any]) -> str:
+    group, version = gvk.get("group") or "", gvk.get("version") or ""
+    return f"{group}/{version}" if group else version
+
+
+class SchemaSet:
+    """The kinds of one Kubernetes version, compiled to validators on demand."""
+
+    def __init__(self, definitions: Optional[Dict[str, Any]] = None, version: Optional[str] = None,
+                 fingerprint: str = "none", source: Optional[str] = None):
+        self.version = version
+        self.fingerprint = fingerprint
+        self.source = source
+        self._compiler = _Compiler(definitions or {})
+        # (apiVersion, kind) -> definition name
+        self._kinds: Dict[Tuple[str, str], str] = {}
+        for name, schema in (definitions or {}).items():
+            for gvk in (schema.get("x-kubernetes-group-version-kind") or ()) if isinstance(schema, dict) else ():
+                self._kinds.setdefault((_group_version(gvk), gvk.get("kind")), name)
+        self._validators: Dict[Tuple[str, str], Check] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._kinds)
+
+    def knows(self, api_version: str, kind: str) -> bool:
+        return (api_version, kind) in self._kinds
+
+    def _validator_for(self, key: Tuple[str, str]) -> Check:
+        validator = self._validators.get(key, _UNKNOWN)
+        if validator is _UNKNOWN:
+            # compiling is not re-entrant (recursive refs are patched in place)
+            with self._lock:
+                validator = self._validators.get(key, _UNKNOWN)
+                if validator is _UNKNOWN:
+                    name = self._kinds.get(key)
+                    validator = self._compiler.ref(name) if name is not None else None
+                    self._validators[key] = validator
+        return validator
+
+    def validate(self, doc: Dict[str, Any]) -> Optional[Errors]:
+        """
+        Schema violations of ``doc`` as ``(message, path)`` pairs, or None when
+        its apiVersion/kind is not in this schema set.
+        """
+        api_version, kind = doc.get("apiVersion"), doc.get("kind")
+        if type(api_version) is not str or type(kind) is not str:
+            return None
+        validator = self._validator_for((api_version, kind))
+        if validator is None:
+            return None
+        errors: Errors = []
+        _apply(validator, doc, "", errors)
+        return errors
+
+
+def normalize_version(version: str) -> str:
+    """``"1.30"``, ``"v1.30"`` and ``"1.30.2"`` all select ``"1.30"``."""
+    m = _VERSION.match(version.strip())
+    if m is None:
+        raise SchemaError(f"Invalid Kubernetes version {version!r}; expected e.g. 1.30")
+    return f"{m.group(1)}.{m.group(2)}"
+
+
+def available_versions(directory: Optional[str] = settings.K8S_SCHEMA_DIR) -> List[str]:
+    found = set()
+    for d in (directory, BUNDLED_DIR):
+        if d and os.path.isdir(d):
+            for name in os.listdir(d):
+                m = re.match(r"^v(\d+\.\d+)\.json$", name)
+                if m:
+                    found.add(m.group(1))
+    return sorted(found, key=lambda v: tuple(int(p) for p in v.split(".")))
+
+
+def load_schemas(version: Optional[str] = settings.K8S_SCHEMA_VERSION,
+                 directory: Optional[str] = settings.K8S_SCHEMA_DIR) -> SchemaSet:
+    """The schema set for ``version``; an empty version disables validation."""
+    if not version or version.lower() == "none":
+        return SchemaSet()
+    version = normalize_version(version)
+    filename = f"v{version}.json"
+    for d in (directory, BUNDLED_DIR):
+        path = os.path.join(d, filename) if d else None
+        if path and os.path.isfile(path):
+            break
+    else:
+        known = ", ".join(available_versions(directory)) or "none"
+        raise SchemaError(f"No OpenAPI schemas for Kubernetes {version} (available: {known})")
+    try:
+        with open(path, "rb") as fh:
+            raw = fh.read()
+        definitions = json.loads(raw).get("definitions")
+    except (OSError, ValueError, AttributeError) as e:
+        raise SchemaError(f"Failed to load OpenAPI schemas {path}: {e}") from e
+    if not isinstance(definitions, dict):
+        raise SchemaError(f"{path} has no 'definitions' section")
+    return SchemaSet(definitions, version, hashlib.sha256(raw).hexdigest()[:16], path)
+
+
+_schemas: Optional[SchemaSet] = None
+
+
+def configure_schemas(version: Optional[str] = settings.K8S_SCHEMA_VERSION,
+                      directory: Optional[str] = settings.K8S_SCHEMA_DIR) -> SchemaSet:
+    """Load and activate the schemas for ``version`` (validators compile lazily)."""
+    global _schemas
+    schemas = load_schemas(version, directory)
+    # the same file again (cli.py --daemon's next run): keep the compiled validators
+    if _schemas is None or (_schemas.fingerprint, _schemas.source) != (schemas.fingerprint, schemas.source):
+        _schemas = schemas
+    return _schemas
+
+
+def get_schemas() -> SchemaSet:
+    if _schemas is None:
+        return configure_schemas()
+    return _schemas
@@ -1,8 +1,205 @@
 # backend/app/analyzer/parser.py
-from typing import List, Dict, Any
+"""
+Manifest parsing: YAML, JSON and NDJSON in, one dict per Kubernetes object out.
+
+The input format is sniffed: text starting with ``{`` or ``[`` is decoded with
+the JSON decoder (several times faster than libyaml on the same bytes), one
+top-level value after another, so a ``kubectl ... -o json`` dump,
+concatenated JSON and NDJSON all work.  YAML takes over at the first value
+that is not valid JSON, which covers flow-style YAML (``{a: 1}``) and JSON
+followed by ``---`` documents.  Positions (``source_map``) come from the YAML
+loader only, so scans that ask for them parse JSON as YAML.
+
+``List`` and ``*List`` wrappers (``kubectl get -o json`` / ``-o yaml`` output,
+API-server exports) are expanded: each of their ``items`` becomes a document
+of its own, numbered in input order, so its findings, paths and doc_index
+are those of the same object written as a separate document.
+"""
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Iterator, Tuple, Union, IO, TYPE_CHECKING
+import json
+import re
 import yaml
 
-def parse_yaml_documents(yaml_text: str) -> List[Dict[str, Any]]:
-    docs = list(yaml.safe_load_all(yaml_text))
-    docs = [d for d in docs if d is not None]
-    return docs
+if TYPE_CHECKING:
+    from k8s_analyzer.analyzer.source_map import SourceMap
+
+# Prefer the libyaml-backed C loader; fall back to the pure-Python one when
+# PyYAML was built without libyaml.
+try:
+    from yaml import CSafeLoader as FastSafeLoader
+    YAML_PARSER = "libyaml"
+except ImportError:  # pragma: no cover - depends on the PyYAML build
+    FastSafeLoader = yaml.SafeLoader
+    YAML_PARSER = "pure-python"
+
+# bump when parsing changes which documents an input yields; it is part of
+# the ruleset fingerprint, so cached results of the old parser are not reused
+PARSE_VERSION = 2
+
+_JSON_STARTS = frozenset("{[")
+_JSON_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_JSON = json.JSONDecoder()
+
+
+def _is_list(doc: Any) -> bool:
+    if not isinstance(doc, dict) or not isinstance(doc.get("items"), list):
+        return False
+    kind = doc.get("kind")
+    return isinstance(kind, str) and kind.endswith("List")
+
+
+def _load_json_all(text: str) -> Iterator[Any]:
+    """Top-level JSON values of ``text``; the rest as YAML from the first value that is not JSON."""
+    decode = _JSON.raw_decode
+    skip = _JSON_WHITESPACE.match
+    end = len(text)
+    pos = skip(text, 0).end()
+    while pos < end:
+        try:
+            value, pos = decode(text, pos)
+        except ValueError:
+            yield from yaml.load_all(text[pos:], Loader=FastSafeLoader)
+            return
+        yield value
+        pos = skip(text, pos).end()
+
+
+def _line_values(line: str) -> Optional[List[Any]]:
+    # the JSON values of one line, or None unless it holds nothing but whole values
+    decode = _JSON.raw_decode
+    skip = _JSON_WHITESPACE.match
+    values = []
+    pos, end = skip(line, 0).end(), len(line)
+    while pos < end:
+        try:
+            value, pos = decode(line, pos)
+        except ValueError:
+            return None
+        values.append(value)
+        pos = skip(line, pos).end()
+    return values
+
+
+def _load_json_stream(head: str, stream: IO) -> Iterator[Any]:
+    """
+    ``_load_json_all`` over a file, holding one line at a time while lines
+    are whole JSON values (NDJSON); from the first line that is not (a
+    pretty-printed document, YAML), the rest of the file is read at once.
+    """
+    line = head + stream.readline()
+    while line:
+        values = _line_values(line)
+        if values is None:
+            yield from _load_json_all(line + stream.read())
+            return
+        yield from values
+        line = stream.readline()
+
+
+class _Rewound:
+    """A text stream with the characters already read from it put back in front."""
+
+    def __init__(self, head: str, stream: IO):
+        self._head = head
+        self._stream = stream
+        # the YAML readers name the stream in error messages
+        self.name = getattr(stream, "name", "<file>")
+
+    def read(self, size: int = -1) -> str:
+        if not self._head:
+            return self._stream.read(size)
+        if size is None or size < 0:
+            data, self._head = self._head + self._stream.read(), ""
+        else:
+            data, self._head = self._head[:size], self._head[size:]
+        return data
+
+
+def _sniff(stream: IO) -> Tuple[str, bool]:
+    """Read up to the first non-whitespace character: (what was read, is it JSON)."""
+    head = ""
+    while True:
+        ch = stream.read(1)
+        head += ch
+        if not ch or not ch.isspace():
+            return head, ch in _JSON_STARTS
+
+
+@lru_cache(maxsize=None)
+def _position_loader(loader: type) -> type:
+    from k8s_analyzer.analyzer.source_map import position_loader
+    return position_loader(loader)
+
+
+def _load_all(stream: Union[str, IO], loader: Optional[type],
+              source_map: Optional["SourceMap"]) -> Iterator[Any]:
+    # an explicit loader means YAML (e.g. to force the pure-Python one)
+    if source_map is None and loader is None:
+        if not isinstance(stream, str):
+            head, is_json = _sniff(stream)
+            if is_json:
+                return _load_json_stream(head, stream)
+            stream = _Rewound(head, stream)
+        elif stream[_JSON_WHITESPACE.match(stream).end():][:1] in _JSON_STARTS:
+            return _load_json_all(stream)
+    if source_map is None:
+        return yaml.load_all(stream, Loader=loader or FastSafeLoader)
+    return _load_all_tracked(stream, _position_loader(loader or FastSafeLoader), source_map)
+
+
+def _documents(stream: Union[str, IO], loader: Optional[type],
+               source_map: Optional["SourceMap"]) -> Iterator[Any]:
+    # non-empty documents, with List wrappers replaced by their items
+    for doc in _load_all(stream, loader, source_map):
+        if doc is None:
+            continue
+        if not _is_list(doc):
+            yield doc
+            continue
+        items = doc["items"]
+        kept = [i for i, item in enumerate(items) if item is not None]
+        if source_map is not None:
+            # the List was just added to the map; renumber before the next document is loaded
+            source_map.expand_list(kept)
+        for i in kept:
+            yield items[i]
+
+
+def _load_all_tracked(stream: Union[str, IO], loader_cls: type, source_map: "SourceMap") -> Iterator[Any]:
+    # yaml.load_all, with the source map attached to the loader instance
+    loader = loader_cls(stream)
+    loader.source_map = source_map
+    try:
+        while loader.check_data():
+            yield loader.get_data()
+    finally:
+        loader.dispose()
+
+
+def parse_yaml_documents(yaml_text: str, loader: Optional[type] = None,
+                         source_map: Optional["SourceMap"] = None) -> List[Dict[str, Any]]:
+    """
+    Parse every document in ``yaml_text`` (YAML, JSON or NDJSON), dropping
+    empty ones and expanding ``List`` wrappers into their items.
+
+    ``loader`` overrides the default (fastest available) safe loader, e.g.
+    ``yaml.SafeLoader`` to force the pure-Python implementation; the input is
+    then always read as YAML.  With a ``source_map``, key and item positions
+    are recorded into it during the same pass.
+    """
+    return list(_documents(yaml_text, loader, source_map))
+
+
+def iter_yaml_documents(stream: Union[str, IO], loader: Optional[type] = None,
+                        source_map: Optional["SourceMap"] = None) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Lazily yield ``(doc_index, doc)`` for every non-empty document in ``stream``.
+
+    ``stream`` may be a string or an open file; with a YAML file, only the
+    document being composed is held in memory, with NDJSON only the current
+    line (any other JSON file is read whole, as it is one document anyway).  ``doc_index`` matches the index the same
+    document gets from ``parse_yaml_documents``.  A ``source_map`` keeps every
+    document's positions until the caller ``forget``s them.
+    """
+    return enumerate(_documents(stream, loader, source_map))
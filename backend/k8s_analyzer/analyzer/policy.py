@@ -0,0 +1,352 @@
+# backend/app/analyzer/policy.py
+"""
+Declarative rule policy, compiled once and consulted per document.
+
+    rules:
+      - rules: [SEC_003]            # rule ids or patterns ("SEC_*", "*")
+        action: disable             # disable | enable | severity
+        kinds: [Deployment]         # optional
+        namespaces: [dev, sandbox]  # optional; resources without one are "default"
+        selector:                   # optional Kubernetes label selector
+          matchLabels: {team: payments}
+          matchExpressions:
+            - {key: tier, operator: In, values: [frontend]}
+      - rules: ["BP_*"]
+        action: severity
+        severity: LOW
+    bypass:                         # admission webhook only
+      names: [analyzer-backend]     # substrings of metadata.name
+      namespaces: [kube-system]
+      labels: {skip-webhook: ["true"]}
+
+Entries apply in file order, later ones winning.  A resource can also opt out
+inline with the annotation ``k8s-yaml-analyzer/ignore: "SEC_001,BP_002"`` (or
+``"*"``).  The admission webhook ignores that annotation, since it would let
+a workload switch off its own enforcement, unless the server opts in with
+``settings.WEBHOOK_HONOR_IGNORE_ANNOTATION`` (see ``Policy.for_admission``).
+Each key given under ``bypass`` replaces that list of the built-in defaults.
+
+Documents with the same kind, namespace, matching selector entries and
+suppressions share one ``RuleView``; views are cached, and filter the engine's
+dispatch tuples so disabled rules are never evaluated.
+"""
+from fnmatch import fnmatchcase
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+import copy
+import hashlib
+import json
+import logging
+import re
+
+import yaml
+
+from k8s_analyzer.analyzer.findings import RuleMeta, intern_meta
+from k8s_analyzer.core.settings import settings
+
+logger = logging.getLogger("k8s-yaml-analyzer.policy")
+
+IGNORE_ANNOTATION = "k8s-yaml-analyzer/ignore"
+
+ACTIONS = ("disable", "enable", "severity")
+SEVERITIES = ("CRITICAL", "HIGH", "MEDIUM", "LOW")
+
+DEFAULT_BYPASS = {
+    # the analyzer's own components
+    "names": ["analyzer-backend", "analyzer-frontend", "analyzer-webhook"],
+    "namespaces": ["kube-system", "kube-public", "kube-node-lease"],
+    "labels": {
+        "skip-webhook": ["true"],
+        "app.kubernetes.io/name": ["coredns", "kube-proxy"],
+    },
+}
+
+# bound on cached (kind, namespace, ...) combinations in a long-running server
+_MAX_CACHED_VIEWS = 4096
+
+
+class PolicyError(ValueError):
+    """Raised when a policy file is malformed."""
+
+
+def _metadata(obj: Any) -> Dict[str, Any]:
+    md = obj.get("metadata") if isinstance(obj, dict) else None
+    return md if isinstance(md, dict) else {}
+
+
+def _str_list(value: Any, where: str) -> List[str]:
+    if isinstance(value, str):
+        return [value]
+    if not isinstance(value, list) or not all(isinstance(v, (str, int, bool)) for v in value):
+        raise PolicyError(f"{where} must be a string or a list of strings")
+    return [str(v).lower() if isinstance(v, bool) else str(v) for v in value]
+
+
+class LabelSelector:
+    """``matchLabels`` / ``matchExpressions`` as in Kubernetes (a plain mapping means matchLabels)."""
+
+    OPERATORS = ("In", "NotIn", "Exists", "DoesNotExist")
+
+    def __init__(self, spec: Any, where: str):
+        if not isinstance(spec, dict):
+            raise PolicyError(f"{where} must be a mapping")
+        if "matchLabels" not in spec and "matchExpressions" not in spec:
+            spec = {"matchLabels": spec}
+        self.match_labels: Dict[str, str] = {
+            str(k): str(v) for k, v in (spec.get("matchLabels") or {}).items()
+        }
+        self.expressions: List[Tuple[str, str, FrozenSet[str]]] = []
+        for i, expr in enumerate(spec.get("matchExpressions") or []):
+            at = f"{where}.matchExpressions[{i}]"
+            if not isinstance(expr, dict) or "key" not in expr:
+                raise PolicyError(f"{at} must have a key")
+            op = expr.get("operator")
+            if op not in self.OPERATORS:
+                raise PolicyError(f"{at}.operator must be one of {', '.join(self.OPERATORS)}")
+            values = frozenset(_str_list(expr.get("values") or [], f"{at}.values"))
+            self.expressions.append((str(expr["key"]), op, values))
+
+    def matches(self, labels: Dict[str, Any]) -> bool:
+        for k, v in self.match_labels.items():
+            if labels.get(k) != v:
+                return False
+        for key, op, values in self.expressions:
+            present = key in labels
+            if op == "In" and not (present and str(labels[key]) in values):
+                return False
+            if op == "NotIn" and present and str(labels[key]) in values:
+                return False
+            if op == "Exists" and not present:
+                return False
+            if op == "DoesNotExist" and present:
+                return False
+        return True
+
+
+class _Entry:
+    __slots__ = ("index", "patterns", "action", "severity", "kinds", "namespaces", "selector")
+
+    def __init__(self, index: int, spec: Any):
+        where = f"rules[{index}]"
+        if not isinstance(spec, dict):
+            raise PolicyError(f"{where} must be a mapping")
+        self.index = index
+        self.patterns = tuple(_str_list(spec.get("rules", spec.get("rule")), f"{where}.rules"))
+        self.action = spec.get("action")
+        if self.action not in ACTIONS:
+            raise PolicyError(f"{where}.action must be one of {', '.join(ACTIONS)}")
+        self.severity = None
+        if self.action == "severity":
+            self.severity = str(spec.get("severity") or "").upper()
+            if self.severity not in SEVERITIES:
+                raise PolicyError(f"{where}.severity must be one of {', '.join(SEVERITIES)}")
+        kinds = spec.get("kinds")
+        self.kinds = frozenset(k.lower() for k in _str_list(kinds, f"{where}.kinds")) if kinds else None
+        namespaces = spec.get("namespaces")
+        self.namespaces = frozenset(_str_list(namespaces, f"{where}.namespaces")) if namespaces else None
+        selector = spec.get("selector")
+        self.selector = LabelSelector(selector, f"{where}.selector") if selector else None
+
+    def applies_to(self, rule_id: str) -> bool:
+        return any(fnmatchcase(rule_id, p) for p in self.patterns)
+
+
+class RuleView:
+    """Effective rules for one group of documents: what runs, and at which severity."""
+
+    def __init__(self, entries: Tuple[_Entry, ...], ignored: FrozenSet[str]):
+        self._entries = entries
+        self._ignore_all = "*" in ignored or "all" in ignored
+        self._ignored = ignored
+        self._state: Dict[str, Tuple[bool, Optional[str]]] = {}
+        self._dispatch: Dict[Tuple[Any, str, str], tuple] = {}
+        self._metas: Dict[Any, RuleMeta] = {}
+
+    def _rule_state(self, rule_id: str) -> Tuple[bool, Optional[str]]:
+        state = self._state.get(rule_id)
+        if state is None:
+            enabled, severity = True, None
+            for e in self._entries:
+                if e.applies_to(rule_id):
+                    if e.action == "disable":
+                        enabled = False
+                    elif e.action == "enable":
+                        enabled = True
+                    else:
+                        severity = e.severity
+            if self._ignore_all or rule_id in self._ignored:
+                enabled = False
+            state = self._state[rule_id] = (enabled, severity)
+        return state
+
+    def rules_for(self, registry, node: str, kind: str) -> tuple:
+        key = (registry, node, kind)
+        rules = self._dispatch.get(key)
+        if rules is None:
+            rules = tuple(r for r in registry.rules_for(node, kind) if self._rule_state(r.rule_id)[0])
+            self._dispatch[key] = rules
+        return rules
+
+    def meta(self, rule) -> RuleMeta:
+        meta = self._metas.get(rule)
+        if meta is None:
+            severity = self._rule_state(rule.rule_id)[1]
+            meta = rule.meta if severity is None else intern_meta(rule.rule_id, rule.title, severity)
+            self._metas[rule] = meta
+        return meta
+
+
+class _Bypass:
+    def __init__(self, spec: Any):
+        if spec is None:
+            spec = {}
+        if not isinstance(spec, dict):
+            raise PolicyError("bypass must be a mapping")
+        names = _str_list(spec.get("names", DEFAULT_BYPASS["names"]), "bypass.names")
+        # one alternation instead of a substring test per name
+        self.names = re.compile("|".join(re.escape(n) for n in names)) if names else None
+        self.namespaces = frozenset(_str_list(spec.get("namespaces", DEFAULT_BYPASS["namespaces"]),
+                                              "bypass.namespaces"))
+        labels = spec.get("labels", DEFAULT_BYPASS["labels"]) or {}
+        if not isinstance(labels, dict):
+            raise PolicyError("bypass.labels must be a mapping of label to values")
+        self.labels: Dict[str, FrozenSet[str]] = {
+            str(k): frozenset(_str_list(v, f"bypass.labels.{k}")) for k, v in labels.items()
+        }
+
+    def matches(self, obj: Dict[str, Any]) -> bool:
+        md = _metadata(obj)
+        if (md.get("namespace") or "default") in self.namespaces:
+            return True
+        if self.names is not None and self.names.search(md.get("name") or ""):
+            return True
+        labels = md.get("labels")
+        if self.labels and isinstance(labels, dict):
+            for key, values in self.labels.items():
+                value = labels.get(key)
+                if isinstance(value, str) and value in values:
+                    return True
+        return False
+
+
+class Policy:
+    def __init__(self, data: Optional[Dict[str, Any]] = None, source: Optional[str] = None):
+        data = data or {}
+        if not isinstance(data, dict):
+            raise PolicyError("policy must be a mapping with 'rules' and/or 'bypass'")
+        unknown = set(data) - {"rules", "bypass"}
+        if unknown:
+            raise PolicyError(f"unknown policy keys: {', '.join(sorted(unknown))}")
+        rules = data.get("rules") or []
+        if not isinstance(rules, list):
+            raise PolicyError("rules must be a list")
+        self.source = source
+        self.entries = tuple(_Entry(i, spec) for i, spec in enumerate(rules))
+        self.bypass = _Bypass(data.get("bypass"))
+        # only the rules section changes scan results
+        canonical = json.dumps(rules, sort_keys=True, default=str)
+        self.fingerprint = hashlib.sha256(canonical.encode()).hexdigest()[:16]
+        # whether a resource's own ignore annotation suppresses rules
+        self.honor_annotations = True
+        self._by_scope: Dict[Tuple[str, str], Tuple[Tuple[_Entry, ...], Tuple[_Entry, ...]]] = {}
+        self._views: Dict[Tuple, RuleView] = {}
+        self._admission: Optional["Policy"] = None
+
+    def _scope(self, kind: str, namespace: str) -> Tuple[Tuple[_Entry, ...], Tuple[_Entry, ...]]:
+        """(entries for this kind/namespace, those of them with selectors)."""
+        key = (kind, namespace)
+        scope = self._by_scope.get(key)
+        if scope is None:
+            entries = tuple(
+                e for e in self.entries
+                if (e.kinds is None or kind in e.kinds) and (e.namespaces is None or namespace in e.namespaces)
+            )
+            scope = (entries, tuple(e for e in entries if e.selector is not None))
+            if len(self._by_scope) >= _MAX_CACHED_VIEWS:
+                self._by_scope.clear()
+            self._by_scope[key] = scope
+        return scope
+
+    def view_for(self, doc: Dict[str, Any], kind: str) -> Optional[RuleView]:
+        """The RuleView for ``doc``, or None when the policy changes nothing for it."""
+        md = doc.get("metadata")
+        if type(md) is not dict:
+            md = {}
+        annotations = md.get("annotations")
+        ignore = (annotations.get(IGNORE_ANNOTATION)
+                  if self.honor_annotations and type(annotations) is dict else None)
+        if ignore is not None and type(ignore) is not str:
+            # annotation values are strings; a list or mapping here suppresses nothing
+            logger.debug("Ignoring non-string %s annotation: %r", IGNORE_ANNOTATION, ignore)
+            ignore = None
+        if ignore is None and not self.entries:
+            return None
+        namespace = md.get("namespace")
+        if type(namespace) is not str or not namespace:
+            namespace = "default"
+        entries, with_selectors = self._scope(kind, namespace)
+        if with_selectors:
+            labels = md.get("labels")
+            labels = labels if isinstance(labels, dict) else {}
+            unmatched = frozenset(e.index for e in with_selectors if not e.selector.matches(labels))
+        else:
+            unmatched = frozenset()
+        if not entries and not ignore:
+            return None
+        key = (entries, unmatched, ignore)
+        view = self._views.get(key)
+        if view is None:
+            ignored = frozenset(s.strip() for s in ignore.split(",") if s.strip()) if ignore else frozenset()
+            view = RuleView(tuple(e for e in entries if e.index not in unmatched), ignored)
+            if len(self._views) >= _MAX_CACHED_VIEWS:
+                self._views.clear()
+            self._views[key] = view
+        return view
+
+    def for_admission(self) -> "Policy":
+        """
+        This policy as the admission webhook applies it: without resources'
+        own ignore annotations, unless ``settings.WEBHOOK_HONOR_IGNORE_ANNOTATION``.
+        """
+        if settings.WEBHOOK_HONOR_IGNORE_ANNOTATION:
+            return self
+        if self._admission is None:
+            admission = copy.copy(self)
+            admission.honor_annotations = False
+            admission._by_scope, admission._views = {}, {}
+            admission._admission = admission
+            self._admission = admission
+        return self._admission
+
+    def bypasses(self, obj: Dict[str, Any]) -> bool:
+        """Whether the admission webhook should skip ``obj`` entirely."""
+        return self.bypass.matches(obj)
+
+
+def load_policy(path: Optional[str]) -> Policy:
+    if not path:
+        return Policy()
+    try:
+        with open(path, "r") as fh:
+            data = yaml.safe_load(fh)
+    except (OSError, yaml.YAMLError) as e:
+        raise PolicyError(f"Failed to load policy {path}: {e}") from e
+    try:
+        return Policy(data, source=path)
+    except PolicyError as e:
+        raise PolicyError(f"{path}: {e}") from e
+
+
+_policy: Optional[Policy] = None
+
+
+def configure_policy(path: Optional[str] = settings.POLICY_PATH) -> Policy:
+    """Compile and activate the policy at ``path`` (None: built-in defaults only)."""
+    global _policy
+    _policy = load_policy(path)
+    return _policy
+
+
+def get_policy() -> Policy:
+    if _policy is None:
+        return configure_policy()
+    return _policy
@@ -1,16 +1,29 @@
-from typing import List
+from typing import TYPE_CHECKING, List, Union, Dict, Any, Iterable, Mapping, Tuple
 from collections import Counter
-from k8s_analyzer.api.v1.models import ScanResult, Finding
+from k8s_analyzer.analyzer.findings import CompactFinding
 
+if TYPE_CHECKING:
+    from k8s_analyzer.api.v1.models import ScanResult, Finding
 
-def build_report(findings_list: List[Finding]) -> ScanResult:
-    normalized = [
-        f if isinstance(f, Finding) else Finding(**f)
-        for f in findings_list
-    ]
 
-    summary_counter = Counter(f.severity.upper() for f in normalized)
+def _as_model(f: Union[CompactFinding, "Finding", Dict[str, Any]]) -> "Finding":
+    if isinstance(f, CompactFinding):
+        return f.to_model()
+    from k8s_analyzer.api.v1.models import Finding
 
+    if isinstance(f, Finding):
+        return f
+    # plain dicts come from outside the analyzer: validate them
+    return Finding(**f)
+
+
+def summarize(findings: Iterable[Union[CompactFinding, "Finding"]]) -> Tuple[bool, Dict[str, int]]:
+    """Return ``(ok, severity summary)`` for a list of findings."""
+    return summarize_counts(Counter(f.severity.upper() for f in findings))
+
+
+def summarize_counts(summary_counter: Mapping[str, int]) -> Tuple[bool, Dict[str, int]]:
+    """``summarize`` for findings already counted by upper-case severity."""
     summary = {
         "CRITICAL": summary_counter.get("CRITICAL", 0),
         "HIGH": summary_counter.get("HIGH", 0),
@@ -19,9 +32,18 @@ def build_report(findings_list: List[Finding]) -> ScanResult:
     }
 
     fail = summary["CRITICAL"] > 0 or summary["HIGH"] > 0
+    return not fail, summary
+
+
+def build_report(findings_list: List[Union[CompactFinding, "Finding", Dict[str, Any]]]) -> "ScanResult":
+    from k8s_analyzer.api.v1.models import ScanResult
+
+    normalized = [_as_model(f) for f in findings_list]
+    ok, summary = summarize(normalized)
 
-    return ScanResult(
-        ok=not fail,
+    # findings are already Finding instances, no need to re-validate them
+    return ScanResult.model_construct(
+        ok=ok,
         findings=normalized,
         summary=summary
     )
@@ -0,0 +1,296 @@
+# backend/app/analyzer/resource_index.py
+"""
+Indexes over one input's documents, for cross-resource rules.
+
+Built once per scan, before the rule walk, so a rule checking a document
+against the rest of the bundle does hash lookups instead of looping over
+every other document:
+
+* ``by_name``: ``(kind, namespace, name)`` -> doc index
+* an inverted label index over pod labels (a Pod's own, a workload's pod
+  template's): ``(namespace, key, value)`` -> doc indexes, so a selector
+  resolves by intersecting the sets of its ``matchLabels`` pairs
+* the reference graph: each document's references to ConfigMaps, Secrets
+  and PersistentVolumeClaims, with the path they appear at
+
+Kinds are lowercased and a missing ``metadata.namespace`` is read as
+``default``, which is where the API server puts it without ``-n``.
+"""
+from typing import Any, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Set, Tuple
+import json
+
+DEFAULT_NAMESPACE = "default"
+
+# workloads whose selector picks the pods of their own template
+CONTROLLER_KINDS = frozenset({"deployment", "replicaset", "statefulset", "daemonset", "replicationcontroller"})
+
+
+class Reference(NamedTuple):
+    kind: str             # "configmap", "secret" or "persistentvolumeclaim"
+    name: str
+    path: str             # as in findings, relative to the Pod ("spec.volumes[0].configMap.name")
+    optional: bool
+
+
+def _mapping(value: Any) -> Dict[str, Any]:
+    return value if isinstance(value, dict) else {}
+
+
+def _items(value: Any) -> Iterable[Tuple[int, Dict[str, Any]]]:
+    if isinstance(value, list):
+        for i, item in enumerate(value):
+            if isinstance(item, dict):
+                yield i, item
+
+
+def _ref(kind: str, source: Dict[str, Any], field: str, path: str, out: List[Reference]):
+    name = source.get(field)
+    if isinstance(name, str) and name:
+        out.append(Reference(kind, name, f"{path}.{field}", source.get("optional") is True))
+
+
+def _volume_references(pod_spec: Dict[str, Any], out: List[Reference]):
+    for i, volume in _items(pod_spec.get("volumes")):
+        path = f"spec.volumes[{i}]"
+        if "configMap" in volume:
+            _ref("configmap", _mapping(volume["configMap"]), "name", f"{path}.configMap", out)
+        if "secret" in volume:
+            _ref("secret", _mapping(volume["secret"]), "secretName", f"{path}.secret", out)
+        if "persistentVolumeClaim" in volume:
+            _ref("persistentvolumeclaim", _mapping(volume["persistentVolumeClaim"]), "claimName",
+                 f"{path}.persistentVolumeClaim", out)
+        projected = _mapping(volume.get("projected"))
+        for j, source in _items(projected.get("sources")):
+            source_path = f"{path}.projected.sources[{j}]"
+            if "configMap" in source:
+                _ref("configmap", _mapping(source["configMap"]), "name", f"{source_path}.configMap", out)
+            if "secret" in source:
+                _ref("secret", _mapping(source["secret"]), "name", f"{source_path}.secret", out)
+
+
+def _container_references(pod_spec: Dict[str, Any], out: List[Reference]):
+    for field in ("initContainers", "containers"):
+        for i, container in _items(pod_spec.get(field)):
+            path = f"spec.{field}[{i}]"
+            for j, source in _items(container.get("envFrom")):
+                if "configMapRef" in source:
+                    _ref("configmap", _mapping(source["configMapRef"]), "name",
+                         f"{path}.envFrom[{j}].configMapRef", out)
+                if "secretRef" in source:
+                    _ref("secret", _mapping(source["secretRef"]), "name", f"{path}.envFrom[{j}].secretRef", out)
+            for j, var in _items(container.get("env")):
+                value_from = _mapping(var.get("valueFrom"))
+                if "configMapKeyRef" in value_from:
+                    _ref("configmap", _mapping(value_from["configMapKeyRef"]), "name",
+                         f"{path}.env[{j}].valueFrom.configMapKeyRef", out)
+                if "secretKeyRef" in value_from:
+                    _ref("secret", _mapping(value_from["secretKeyRef"]), "name",
+                         f"{path}.env[{j}].valueFrom.secretKeyRef", out)
+
+
+def pod_references(pod_spec: Dict[str, Any]) -> List[Reference]:
+    """ConfigMaps, Secrets and PVCs a PodSpec's volumes and containers refer to."""
+    out: List[Reference] = []
+    _volume_references(pod_spec, out)
+    _container_references(pod_spec, out)
+    return out
+
+
+# engine.get_pod_spec and friends, tolerant of malformed documents: the index
+# is built before any rule runs, outside the engine's on_error handling
+
+def _pod_spec(doc: Dict[str, Any], kind: str) -> Dict[str, Any]:
+    spec = _mapping(doc.get("spec"))
+    if kind == "pod":
+        return spec
+    return _mapping(_mapping(spec.get("template")).get("spec"))
+
+
+def _pod_labels(doc: Dict[str, Any], kind: str) -> Optional[Dict[str, Any]]:
+    if kind == "pod":
+        return _mapping(_mapping(doc.get("metadata")).get("labels"))
+    template = _mapping(_mapping(doc.get("spec")).get("template"))
+    if not template:
+        return None
+    return _mapping(_mapping(template.get("metadata")).get("labels"))
+
+
+def _expression_matches(labels: Dict[str, Any], expression: Dict[str, Any]) -> bool:
+    key, operator = expression.get("key"), expression.get("operator")
+    values = expression.get("values")
+    if not isinstance(values, list):
+        values = ()
+    if not isinstance(key, str):
+        # rejected by the API server too: nothing is selected
+        return False
+    if operator == "In":
+        return key in labels and labels[key] in values
+    if operator == "NotIn":
+        return key not in labels or labels[key] not in values
+    if operator == "Exists":
+        return key in labels
+    if operator == "DoesNotExist":
+        return key not in labels
+    # unknown operator: the API server rejects it, so nothing is selected
+    return False
+
+
+class ResourceIndex:
+    def __init__(self, docs: Iterable[Any]):
+        self.by_name: Dict[Tuple[str, str, str], int] = {}
+        self._labels: Dict[Tuple[str, str, Any], Set[int]] = {}
+        # namespace -> docs carrying pod labels, for selectors without matchLabels
+        self._pods: Dict[str, Set[int]] = {}
+        self._pod_labels: Dict[int, Dict[str, Any]] = {}
+        self.references: Dict[int, List[Reference]] = {}
+        # doc index -> (kind as written, name)
+        self._identity: Dict[int, Tuple[str, str]] = {}
+        # ownerReferences as edges both ways: doc -> owner keys, owner key -> docs
+        self._owners: Dict[int, List[Tuple[str, str, str]]] = {}
+        self._owned: Dict[Tuple[str, str, str], List[int]] = {}
+        # (namespace, selector) -> controllers it matches, shared by equal selectors
+        self._selected: Dict[str, Tuple[Tuple[int, ...], FrozenSet[int]]] = {}
+        self._namespaces: Dict[int, str] = {}
+        # (kind, namespace) of every named resource
+        self._defined: Set[Tuple[str, str]] = set()
+        # id(doc) -> position; docs stay alive for as long as the index is used
+        self._positions: Dict[int, int] = {}
+
+        for idx, doc in enumerate(docs):
+            if not isinstance(doc, dict):
+                continue
+            self._positions[id(doc)] = idx
+            written = doc.get("kind")
+            kind = written.lower() if isinstance(written, str) else ""
+            namespace = self.namespace_of(doc)
+            metadata = _mapping(doc.get("metadata"))
+            name = metadata.get("name")
+            if kind and isinstance(name, str):
+                self.by_name.setdefault((kind, namespace, name), idx)
+                self._defined.add((kind, namespace))
+                self._identity[idx] = (written, name)
+                self._namespaces[idx] = namespace
+            for _, owner in _items(metadata.get("ownerReferences")):
+                if isinstance(owner.get("kind"), str) and isinstance(owner.get("name"), str):
+                    key = (owner["kind"].lower(), namespace, owner["name"])
+                    self._owners.setdefault(idx, []).append(key)
+                    self._owned.setdefault(key, []).append(idx)
+
+            labels = _pod_labels(doc, kind)
+            if labels is not None:
+                self._pod_labels[idx] = labels
+                self._pods.setdefault(namespace, set()).add(idx)
+                for key, value in labels.items():
+                    try:
+                        self._labels.setdefault((namespace, key, value), set()).add(idx)
+                    except TypeError:
+                        # unhashable label value (a schema error); not selectable
+                        pass
+
+            pod_spec = _pod_spec(doc, kind)
+            if pod_spec:
+                refs = pod_references(pod_spec)
+                if refs:
+                    self.references[idx] = refs
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    @staticmethod
+    def namespace_of(doc: Dict[str, Any]) -> str:
+        namespace = _mapping(doc.get("metadata")).get("namespace")
+        return namespace if isinstance(namespace, str) and namespace else DEFAULT_NAMESPACE
+
+    def index_of(self, doc: Any) -> Optional[int]:
+        """Position of ``doc`` (the same object) in the indexed input."""
+        return self._positions.get(id(doc))
+
+    def get(self, kind: str, namespace: str, name: str) -> Optional[int]:
+        return self.by_name.get((kind.lower(), namespace, name))
+
+    def identity(self, idx: int) -> Optional[Tuple[str, str]]:
+        """``(kind, name)`` of document ``idx`` as written, if it has both."""
+        return self._identity.get(idx)
+
+    def related(self, idx: int) -> Set[int]:
+        """Documents ``idx`` owns or is owned by, through ``ownerReferences``."""
+        related = set()
+        for key in self._owners.get(idx, ()):
+            owner = self.by_name.get(key)
+            if owner is not None:
+                related.add(owner)
+        identity = self._identity.get(idx)
+        if identity is not None and self._owned:
+            doc_key = (identity[0].lower(), self._namespaces[idx], identity[1])
+            related.update(self._owned.get(doc_key, ()))
+        return related
+
+    def defines(self, kind: str, namespace: str) -> bool:
+        """Whether the input has any named resource of ``kind`` in ``namespace``."""
+        return (kind.lower(), namespace) in self._defined
+
+    def has_pods(self, namespace: str) -> bool:
+        """Whether any Pod or pod template in ``namespace`` is in the input."""
+        return bool(self._pods.get(namespace))
+
+    def pod_labels(self, idx: int) -> Optional[Dict[str, Any]]:
+        return self._pod_labels.get(idx)
+
+    def select(self, namespace: str, match_labels: Optional[Dict[str, Any]] = None,
+               match_expressions: Optional[List[Dict[str, Any]]] = None) -> Set[int]:
+        """
+        Indexes of the documents in ``namespace`` whose pods a label selector
+        matches.  ``matchLabels`` pairs are intersected smallest set first; only
+        the survivors are tested against ``matchExpressions``.
+        """
+        if match_labels:
+            candidates: Optional[Set[int]] = None
+            try:
+                sets = sorted((self._labels.get((namespace, k, v), ()) for k, v in match_labels.items()), key=len)
+            except TypeError:
+                return set()
+            for found in sets:
+                candidates = set(found) if candidates is None else candidates & found
+                if not candidates:
+                    return set()
+        else:
+            candidates = set(self._pods.get(namespace, ()))
+        if match_expressions:
+            expressions = [e for e in match_expressions if isinstance(e, dict)]
+            candidates = {idx for idx in candidates
+                          if all(_expression_matches(self._pod_labels[idx], e) for e in expressions)}
+        return candidates
+
+    def selects_any(self, namespace: str, match_labels: Dict[str, Any]) -> bool:
+        """Whether an equality selector (a Service's) matches any pods, without building the set."""
+        try:
+            sets = sorted((self._labels.get((namespace, k, v), ()) for k, v in match_labels.items()), key=len)
+        except TypeError:
+            return False
+        if not sets or not sets[0]:
+            return False
+        rest = sets[1:]
+        return any(all(idx in found for found in rest) for idx in sets[0])
+
+    def controllers(self, namespace: str, match_labels: Optional[Dict[str, Any]] = None,
+                    match_expressions: Optional[List[Dict[str, Any]]] = None) -> Tuple[Tuple[int, ...], FrozenSet[int]]:
+        """
+        The controllers (``CONTROLLER_KINDS``) whose pods a selector matches, in
+        document order and as a set.  Workloads sharing labels tend to share
+        selectors too, so results are kept per distinct selector: n workloads
+        with one selector cost one ``select``, not n.
+        """
+        try:
+            key = json.dumps([namespace, match_labels, match_expressions], sort_keys=True)
+        except (TypeError, ValueError):
+            key = None
+        found = self._selected.get(key) if key is not None else None
+        if found is None:
+            members = tuple(sorted(
+                idx for idx in self.select(namespace, match_labels, match_expressions)
+                if idx in self._identity and self._identity[idx][0].lower() in CONTROLLER_KINDS
+            ))
+            found = (members, frozenset(members))
+            if key is not None:
+                self._selected[key] = found
+        return found
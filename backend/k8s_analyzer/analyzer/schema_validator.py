@@ -1,49 +1,52 @@
 from typing import List, Dict, Any
-from k8s_analyzer.api.v1.models import Finding
-
-
-def validate_schema_for_docs(docs: List[Dict[str, Any]]) -> List[Finding]:
-    findings = []
-
-    for idx, doc in enumerate(docs):
-
-        kind = doc.get("kind")
-        api_version = doc.get("apiVersion")
-        metadata = doc.get("metadata")
-
-        # CRITICAL errors
-        if not kind or not api_version or not metadata:
-            findings.append(Finding(
-                rule_id="SCHEMA_001",
-                title="Missing required top-level fields",
-                message="Missing one of: kind, apiVersion, metadata",
-                severity="CRITICAL",
-                path=None,
-                doc_index=idx
-            ))
-            continue
-
-        # MEDIUM: missing metadata.name
-        if not metadata.get("name"):
-            findings.append(Finding(
-                rule_id="SCHEMA_002",
-                title="Missing metadata.name",
-                message="Resource does not specify metadata.name",
-                severity="MEDIUM",
-                path="metadata.name",
-                doc_index=idx
-            ))
-
-        # LOW: missing labels
-        labels = metadata.get("labels", {})
-        if not labels:
-            findings.append(Finding(
-                rule_id="SCHEMA_003",
-                title="Missing labels",
-                message="Resource has no metadata.labels (recommended for selectors and grouping)",
-                severity="LOW",
-                path="metadata.labels",
-                doc_index=idx
-            ))
-
-    return findings
+from k8s_analyzer.analyzer.findings import CompactFinding
+from k8s_analyzer.analyzer.engine import rule, run_rules, DOCUMENT, _mapping
+from k8s_analyzer.analyzer.openapi import get_schemas
+
+
+def _has_required_fields(doc: Any) -> bool:
+    # a document that is not a mapping (a bare string, a list) has none of them
+    return isinstance(doc, dict) and bool(doc.get("kind") and doc.get("apiVersion") and doc.get("metadata"))
+
+
+def _metadata(doc: Any) -> Dict[str, Any]:
+    # empty unless the required fields are there and metadata is a mapping
+    # (SCHEMA_004 reports a metadata of another type)
+    return _mapping(doc["metadata"]) if _has_required_fields(doc) else {}
+
+
+# CRITICAL errors
+@rule("SCHEMA_001", "Missing required top-level fields", "CRITICAL", DOCUMENT, "schema")
+def _missing_top_level_fields(doc, _):
+    if not _has_required_fields(doc):
+        return "Missing one of: kind, apiVersion, metadata"
+
+
+# MEDIUM: missing metadata.name
+@rule("SCHEMA_002", "Missing metadata.name", "MEDIUM", DOCUMENT, "schema",
+      path="metadata.name")
+def _missing_name(doc, _):
+    md = _metadata(doc)
+    if md and not md.get("name"):
+        return "Resource does not specify metadata.name"
+
+
+# LOW: missing labels
+@rule("SCHEMA_003", "Missing labels", "LOW", DOCUMENT, "schema",
+      path="metadata.labels")
+def _missing_labels(doc, _):
+    md = _metadata(doc)
+    if md and not md.get("labels", {}):
+        return "Resource has no metadata.labels (recommended for selectors and grouping)"
+
+
+# HIGH: violations of the Kubernetes OpenAPI schema for the document's kind
+@rule("SCHEMA_004", "Invalid field for resource schema", "HIGH", DOCUMENT, "schema",
+      path="{key}")
+def _openapi_violations(doc, _):
+    if _has_required_fields(doc):
+        return get_schemas().validate(doc) or None
+
+
+def validate_schema_for_docs(docs: List[Dict[str, Any]]) -> List[CompactFinding]:
+    return run_rules(docs, analyzers=("schema",))
@@ -1,94 +1,56 @@
 from typing import List, Dict, Any
-from k8s_analyzer.api.v1.models import Finding
+from k8s_analyzer.analyzer.findings import CompactFinding
+from k8s_analyzer.analyzer.engine import rule, run_rules, CONTAINER, VOLUME, DOCUMENT, CONFIGMAP_KEY, _mapping
 
 
-def find_security_issues(docs: List[Dict[str, Any]]) -> List[Finding]:
-    findings = []
+# SEC_001: Privileged containers
+@rule("SEC_001", "Privileged container detected", "HIGH", CONTAINER, "security",
+      path="spec.containers[{index}].securityContext.privileged")
+def _privileged(c, i):
+    sc = _mapping(c.get("securityContext"))
+    if sc.get("privileged") is True:
+        return f"Container '{c.get('name', str(i))}' has privileged=true"
 
-    for idx, doc in enumerate(docs):
-        kind = (doc.get("kind") or "").lower()
-        spec = doc.get("spec", {})
 
-        # Determine PodSpec
-        if kind == "pod":
-            pod_spec = spec
-        else:
-            pod_spec = spec.get("template", {}).get("spec", {})
+# SEC_002: Running as root
+@rule("SEC_002", "Container may run as root", "MEDIUM", CONTAINER, "security",
+      path="spec.containers[{index}].securityContext")
+def _may_run_as_root(c, i):
+    sc = _mapping(c.get("securityContext"))
+    ran_nr = sc.get("runAsNonRoot")
+    run_user = sc.get("runAsUser")
 
-        # No pod spec = skip container/security checks
-        if pod_spec:
-            containers = pod_spec.get("containers", []) or []
+    if ran_nr is False or (run_user == 0) or (ran_nr is None and run_user is None):
+        return f"Container '{c.get('name', str(i))}' does not enforce non-root execution"
 
-            # SEC_001: Privileged containers
-            for i, c in enumerate(containers):
-                sc = c.get("securityContext", {})
-                if sc.get("privileged") is True:
-                    findings.append(Finding(
-                        rule_id="SEC_001",
-                        title="Privileged container detected",
-                        message=f"Container '{c.get('name', str(i))}' has privileged=true",
-                        severity="HIGH",
-                        path=f"spec.containers[{i}].securityContext.privileged",
-                        doc_index=idx
-                    ))
 
-            # SEC_002: Running as root
-            for i, c in enumerate(containers):
-                sc = c.get("securityContext", {})
-                ran_nr = sc.get("runAsNonRoot")
-                run_user = sc.get("runAsUser")
+# SEC_003: HostPath (only once per Pod)
+@rule("SEC_003", "Use of hostPath volume", "HIGH", VOLUME, "security",
+      path="spec.volumes", once_per_doc=True)
+def _host_path(v, _):
+    if "hostPath" in v:
+        return f"Pod uses hostPath volume '{v.get('name','unknown')}'. This risks host filesystem exposure."
 
-                if ran_nr is False or (run_user == 0) or (ran_nr is None and run_user is None):
-                    findings.append(Finding(
-                        rule_id="SEC_002",
-                        title="Container may run as root",
-                        message=f"Container '{c.get('name', str(i))}' does not enforce non-root execution",
-                        severity="MEDIUM",
-                        path=f"spec.containers[{i}].securityContext",
-                        doc_index=idx
-                    ))
 
-            # SEC_003: HostPath (only once per Pod)
-            volumes = pod_spec.get("volumes", [])
-            for v in volumes:
-                if "hostPath" in v:
-                    findings.append(Finding(
-                        rule_id="SEC_003",
-                        title="Use of hostPath volume",
-                        message=f"Pod uses hostPath volume '{v.get('name','unknown')}'. This risks host filesystem exposure.",
-                        severity="HIGH",
-                        path="spec.volumes",
-                        doc_index=idx
-                    ))
-                    break  # avoid duplicates
+# -------------------------------------------------------------------
+# Secret checks
+# -------------------------------------------------------------------
+@rule("SEC_004", "Secret contains stringData", "CRITICAL", DOCUMENT, "security",
+      path="stringData", kinds=["secret"])
+def _secret_string_data(doc, _):
+    if doc.get("stringData"):
+        return "stringData stores cleartext secrets"
 
-        # -------------------------------------------------------------------
-        # Secret checks
-        # -------------------------------------------------------------------
-        if kind == "secret":
-            if doc.get("stringData"):
-                findings.append(Finding(
-                    rule_id="SEC_004",
-                    title="Secret contains stringData",
-                    message="stringData stores cleartext secrets",
-                    severity="CRITICAL",
-                    path="stringData",
-                    doc_index=idx
-                ))
 
-        # -------------------------------------------------------------------
-        # ConfigMap dangerous keys
-        # -------------------------------------------------------------------
-        if kind == "configmap":
-            for key in (doc.get("data") or {}):
-                if any(x in key.lower() for x in ["password", "secret", "token", "key"]):
-                    findings.append(Finding(
-                        rule_id="SEC_005",
-                        title="Suspicious key in ConfigMap",
-                        message=f"Key '{key}' in ConfigMap appears to contain sensitive data",
-                        severity="CRITICAL",
-                        path=f"data.{key}",
-                        doc_index=idx
-                    ))
+# -------------------------------------------------------------------
+# ConfigMap dangerous keys
+# -------------------------------------------------------------------
+@rule("SEC_005", "Suspicious key in ConfigMap", "CRITICAL", CONFIGMAP_KEY, "security",
+      path="data.{key}", kinds=["configmap"])
+def _suspicious_configmap_key(key, _):
+    if any(x in str(key).lower() for x in ["password", "secret", "token", "key"]):
+        return f"Key '{key}' in ConfigMap appears to contain sensitive data"
 
-    return findings
+
+def find_security_issues(docs: List[Dict[str, Any]]) -> List[CompactFinding]:
+    return run_rules(docs, analyzers=("security",))
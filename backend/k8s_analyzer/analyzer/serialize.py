@@ -0,0 +1,200 @@
+# backend/app/analyzer/serialize.py
+"""
+Bulk serializers for scan reports.
+
+Write reports straight from analyzer findings, without building Pydantic
+models or re-validating them.  Output is byte-for-byte what the previous
+paths produced:
+
+- ``indent=2``  == ``json.dumps(report.model_dump(), indent=2, ensure_ascii=False)`` (CLI)
+- ``indent=None`` == FastAPI's JSONResponse rendering of the ScanResult (API)
+- ``ndjson_line`` == ``json.dumps(finding_dict, ensure_ascii=False)`` (--stream)
+- ``batch_item_json`` / ``dumps_batch`` == FastAPI's rendering of BatchScanResult
+- ``dumps_grouped_report`` == the same for a GroupedScanResult (small by
+  construction, so plain ``json.dumps``)
+
+``line``/``column`` follow ``doc_index`` only on findings that carry a position
+(the ``Finding`` model omits them otherwise too).
+
+Rule id/title/severity fragments are encoded once per rule and reused.
+"""
+from json.encoder import encode_basestring
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+import json
+
+from k8s_analyzer.analyzer.aggregate import FindingAggregator
+from k8s_analyzer.analyzer.findings import CompactFinding, RuleMeta, intern_meta
+from k8s_analyzer.analyzer.report import summarize
+
+FindingLike = Union[CompactFinding, Dict[str, Any], Any]
+
+PRETTY = "pretty"
+COMPACT = "compact"
+LINE = "line"
+
+# findings per chunk when streaming
+CHUNK_SIZE = 1000
+
+
+def _enc(value) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, str):
+        return encode_basestring(value)
+    if type(value) is int:
+        # doc_index/summary counts; same text as json.dumps
+        return str(value)
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _compact(f: FindingLike) -> CompactFinding:
+    if isinstance(f, CompactFinding):
+        return f
+    if isinstance(f, dict):
+        return CompactFinding.from_dict(f)
+    return CompactFinding(intern_meta(f.rule_id, f.title, f.severity), f.message, f.path, f.doc_index,
+                          getattr(f, "line", None), getattr(f, "column", None))
+
+
+# (style, meta) -> (prefix up to the message, middle up to the path)
+_FRAGMENTS: Dict[Tuple[str, RuleMeta], Tuple[str, str]] = {}
+
+
+def _fragments(style: str, meta: RuleMeta) -> Tuple[str, str]:
+    frag = _FRAGMENTS.get((style, meta))
+    if frag is None:
+        rid, title, sev = _enc(meta.rule_id), _enc(meta.title), _enc(meta.severity)
+        if style == PRETTY:
+            frag = (f'    {{\n      "rule_id": {rid},\n      "title": {title},\n      "message": ',
+                    f',\n      "severity": {sev},\n      "path": ')
+        elif style == COMPACT:
+            frag = (f'{{"rule_id":{rid},"title":{title},"message":',
+                    f',"severity":{sev},"path":')
+        else:
+            frag = (f'{{"rule_id": {rid}, "title": {title}, "message": ',
+                    f', "severity": {sev}, "path": ')
+        _FRAGMENTS[(style, meta)] = frag
+    return frag
+
+
+def _position(style: str, f: CompactFinding) -> str:
+    line, column = _enc(f.line), _enc(f.column)
+    if style == PRETTY:
+        return ',\n      "line": ' + line + ',\n      "column": ' + column
+    if style == COMPACT:
+        return ',"line":' + line + ',"column":' + column
+    return ', "line": ' + line + ', "column": ' + column
+
+
+def _finding(style: str, f: CompactFinding) -> str:
+    head, mid = _fragments(style, f.meta)
+    pos = "" if f.line is None else _position(style, f)
+    if style == PRETTY:
+        tail = ',\n      "doc_index": ' + _enc(f.doc_index) + pos + '\n    }'
+    elif style == COMPACT:
+        tail = ',"doc_index":' + _enc(f.doc_index) + pos + '}'
+    else:
+        tail = ', "doc_index": ' + _enc(f.doc_index) + pos + '}'
+    return head + _enc(f.message) + mid + _enc(f.path) + tail
+
+
+def _summary(style: str, summary: Dict[str, int]) -> str:
+    if style == PRETTY:
+        if not summary:
+            return "{}"
+        items = ",\n".join(f"    {_enc(k)}: {_enc(v)}" for k, v in summary.items())
+        return "{\n" + items + "\n  }"
+    return "{" + ",".join(f"{_enc(k)}:{_enc(v)}" for k, v in summary.items()) + "}"
+
+
+def iter_report_json(findings: Iterable[FindingLike], indent: Optional[int] = None,
+                     chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """
+    Yield a ScanResult JSON document in chunks of ``chunk_size`` findings.
+
+    ``indent`` is None (compact, API form) or 2 (pretty, CLI form).
+    """
+    if indent not in (None, 2):
+        raise ValueError("indent must be None or 2")
+    style = PRETTY if indent else COMPACT
+    items: List[CompactFinding] = [_compact(f) for f in findings]
+    ok, summary = summarize(items)
+    ok_text = "true" if ok else "false"
+
+    if style == PRETTY:
+        yield '{\n  "ok": ' + ok_text + ',\n  "findings": ['
+        sep, first, close = ",\n", "\n", "\n  ]"
+    else:
+        yield '{"ok":' + ok_text + ',"findings":['
+        sep, first, close = ",", "", "]"
+
+    for start in range(0, len(items), chunk_size):
+        chunk = sep.join(_finding(style, f) for f in items[start:start + chunk_size])
+        yield (first if start == 0 else sep) + chunk
+
+    if not items:
+        close = "]"
+    if style == PRETTY:
+        yield close + ',\n  "summary": ' + _summary(style, summary) + "\n}"
+    else:
+        yield close + ',"summary":' + _summary(style, summary) + "}"
+
+
+def dumps_report(findings: Iterable[FindingLike], indent: Optional[int] = None) -> str:
+    return "".join(iter_report_json(findings, indent=indent))
+
+
+def write_report(out, findings: Iterable[FindingLike], indent: Optional[int] = None):
+    """Write the report to a text stream chunk by chunk."""
+    for chunk in iter_report_json(findings, indent=indent):
+        out.write(chunk)
+
+
+def ndjson_line(finding: FindingLike, extra: Optional[Dict[str, Any]] = None) -> str:
+    """One finding as a JSON line (``json.dumps`` default separators), plus ``extra`` keys."""
+    line = _finding(LINE, _compact(finding))
+    if extra:
+        line = line[:-1] + "".join(f", {_enc(k)}: {_enc(v)}" for k, v in extra.items()) + "}"
+    return line + "\n"
+
+
+def iter_ndjson(findings: Iterable[FindingLike], extra: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+    for f in findings:
+        yield ndjson_line(f, extra)
+
+
+def dumps_grouped_report(aggregator: FindingAggregator, indent: Optional[int] = None) -> str:
+    """GroupedScanResult JSON: ``indent=None`` as the API renders it, 2 for the CLI."""
+    ok, summary = aggregator.summary()
+    data = {"ok": ok, "groups": [g.to_dict() for g in aggregator.groups()], "summary": summary}
+    if indent:
+        return json.dumps(data, indent=indent, ensure_ascii=False)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+
+def iter_grouped_ndjson(aggregator: FindingAggregator) -> Iterator[str]:
+    for group in aggregator.groups():
+        yield json.dumps(group.to_dict(), ensure_ascii=False) + "\n"
+
+
+def batch_item_json(index: int, name: str, findings: Optional[Iterable[FindingLike]] = None,
+                    error: Optional[str] = None) -> str:
+    """One BatchItemResult, compact; ``result`` is null when ``error`` is set."""
+    result = dumps_report(findings) if findings is not None else "null"
+    return ('{"index":' + _enc(index) + ',"name":' + _enc(name) + ',"result":' + result
+            + ',"error":' + _enc(error) + '}')
+
+
+def _batch_head(ok: bool, inputs: int, errors: int, summary: Dict[str, int]) -> str:
+    return ('{"ok":' + ("true" if ok else "false") + ',"inputs":' + _enc(inputs)
+            + ',"errors":' + _enc(errors) + ',"summary":' + _summary(COMPACT, summary))
+
+
+def batch_summary_json(ok: bool, inputs: int, errors: int, summary: Dict[str, int]) -> str:
+    """Aggregate batch summary (the last NDJSON line of a streamed batch)."""
+    return _batch_head(ok, inputs, errors, summary) + "}"
+
+
+def dumps_batch(items: List[str], ok: bool, inputs: int, errors: int, summary: Dict[str, int]) -> str:
+    """BatchScanResult from ``batch_item_json`` strings in input order."""
+    return _batch_head(ok, inputs, errors, summary) + ',"results":[' + ",".join(items) + "]}"
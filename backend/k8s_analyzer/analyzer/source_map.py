@@ -0,0 +1,207 @@
+# backend/app/analyzer/source_map.py
+"""
+Optional source positions for parsed manifests.
+
+``PositionLoader`` records, while the normal safe loader constructs each
+document, the line/column of every mapping key and sequence item.  Positions
+live in a side table keyed by the ``id()`` of the constructed dicts and lists
+(arrays of packed ints, aligned with dict key order); the documents stay plain
+Python objects and no YAML nodes are kept.  ``SourceMap.annotate`` then
+resolves each finding's dotted ``path`` to a 1-based ``line``/``column``.
+
+Only scans that ask for positions use this loader, so other paths pay nothing.
+"""
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+import re
+
+from yaml.nodes import MappingNode, SequenceNode
+
+from k8s_analyzer.analyzer.findings import CompactFinding
+
+# cache / scan-state variant for results that carry positions
+POSITIONS_VARIANT = "positions"
+
+_SHIFT = 32
+_MASK = (1 << _SHIFT) - 1
+
+_INDEX = re.compile(r"\[(\d+)\]")
+
+# per container: packed positions of its items in iteration order, or, for a
+# mapping whose keys were merged or repeated, {key: packed position}
+Table = Union[array, Dict[Any, int]]
+
+
+def _pack(mark) -> int:
+    return (mark.line << _SHIFT) | mark.column
+
+
+def _unpack(packed: int) -> Tuple[int, int]:
+    return (packed >> _SHIFT) + 1, (packed & _MASK) + 1
+
+
+def split_path(path: str) -> List[Union[str, int]]:
+    """``"spec.containers[0].image"`` -> ``["spec", "containers", 0, "image"]``."""
+    tokens: List[Union[str, int]] = []
+    for part in path.split("."):
+        name = _INDEX.split(part)
+        # re.split with a group alternates name / index / name ...
+        if name[0]:
+            tokens.append(name[0])
+        for i in range(1, len(name), 2):
+            tokens.append(int(name[i]))
+            if name[i + 1]:
+                tokens.append(name[i + 1])
+    return tokens
+
+
+class SourceMap:
+    def __init__(self):
+        self._docs: Dict[int, Any] = {}
+        self._starts: Dict[int, int] = {}
+        self._tables: Dict[int, Table] = {}
+        self._owned: Dict[int, List[int]] = {}
+        self._next_index = 0
+
+    def add_document(self, data: Any, root, constructed: Dict[Any, Any]) -> int:
+        """Record a document just constructed from ``root``; returns its doc_index."""
+        idx = self._next_index
+        self._next_index += 1
+        self._docs[idx] = data
+        self._starts[idx] = _pack(root.start_mark)
+        owned = self._owned[idx] = []
+        for node, obj in constructed.items():
+            if isinstance(node, MappingNode) and isinstance(obj, dict):
+                if len(obj) == len(node.value):
+                    # every key inserted once, so dict order is document order
+                    table: Table = array("Q", (_pack(key.start_mark) for key, _ in node.value))
+                else:
+                    table = {}
+                    for key_node, _ in node.value:
+                        try:
+                            # the last occurrence wins, as in the constructed dict
+                            table[constructed.get(key_node)] = _pack(key_node.start_mark)
+                        except TypeError:  # unhashable (complex) key
+                            continue
+            elif isinstance(node, SequenceNode) and isinstance(obj, list):
+                table = array("Q", (_pack(item.start_mark) for item in node.value))
+            else:
+                continue
+            self._tables[id(obj)] = table
+            owned.append(id(obj))
+        return idx
+
+    def expand_list(self, keep: List[int]):
+        """
+        Replace the document just added, a ``List``, by the items of its
+        ``items`` at the indexes ``keep``, numbered from its doc_index on; the
+        next document added follows them.
+        """
+        idx = self._next_index - 1
+        doc = self._docs.pop(idx)
+        start = self._starts.pop(idx)
+        owned = self._owned.pop(idx)
+        items = doc["items"]
+        table = self._tables.get(id(items))
+        for n, i in enumerate(keep):
+            self._docs[idx + n] = items[i]
+            self._starts[idx + n] = table[i] if table is not None and i < len(table) else start
+            self._owned[idx + n] = []
+        if keep:
+            # items share the List's tables; streaming forgets them after the last item
+            self._owned[idx + len(keep) - 1] = owned
+        else:
+            for key in owned:
+                self._tables.pop(key, None)
+        self._next_index = idx + len(keep)
+
+    def forget(self, doc_index: int):
+        """Drop one document's positions (streaming keeps only the current one)."""
+        self._docs.pop(doc_index, None)
+        self._starts.pop(doc_index, None)
+        for key in self._owned.pop(doc_index, ()):
+            self._tables.pop(key, None)
+
+    def document_start(self, doc_index: int) -> Optional[Tuple[int, int]]:
+        packed = self._starts.get(doc_index)
+        return _unpack(packed) if packed is not None else None
+
+    def _walk(self, node: Any, tokens: List[Union[str, int]], start: int) -> Tuple[bool, int]:
+        """Follow ``tokens`` from ``node``; returns (reached the end, last position found)."""
+        pos = start
+        i = 0
+        while i < len(tokens):
+            table = self._tables.get(id(node))
+            token = tokens[i]
+            if isinstance(node, dict) and isinstance(token, str):
+                # keys may contain dots (ConfigMap data keys): try the longest run of name tokens
+                key, step = token, 1
+                j = i + 1
+                while key not in node and j < len(tokens) and isinstance(tokens[j], str):
+                    key = f"{key}.{tokens[j]}"
+                    j += 1
+                    step += 1
+                if key not in node:
+                    return False, pos
+                if isinstance(table, dict):
+                    pos = table.get(key, pos)
+                elif table is not None:
+                    for n, k in enumerate(node):
+                        if k == key:
+                            pos = table[n]
+                            break
+                node = node[key]
+                i += step
+            elif isinstance(node, list) and isinstance(token, int) and token < len(node):
+                if table is not None and token < len(table):
+                    pos = table[token]
+                node = node[token]
+                i += 1
+            else:
+                return False, pos
+        return True, pos
+
+    def locate(self, doc_index: int, path: Optional[str]) -> Optional[Tuple[int, int]]:
+        """1-based (line, column) of ``path`` in a document, or its closest existing parent."""
+        if doc_index not in self._docs:
+            return None
+        doc = self._docs[doc_index]
+        start = self._starts[doc_index]
+        if not path:
+            return _unpack(start)
+        tokens = split_path(path)
+        found, pos = self._walk(doc, tokens, start)
+        if not found and tokens[0] == "spec" and isinstance(doc, dict) \
+                and str(doc.get("kind") or "").lower() != "pod":
+            # PodSpec rules report paths relative to a Pod; workloads nest the PodSpec
+            found_tpl, pos_tpl = self._walk(doc, ["spec", "template", "spec"] + tokens[1:], start)
+            if found_tpl or pos_tpl != start:
+                pos = pos_tpl
+        return _unpack(pos)
+
+    def annotate(self, findings: Iterable[CompactFinding]):
+        """Set ``line``/``column`` on findings from documents in this map."""
+        for f in findings:
+            if f.doc_index is None:
+                continue
+            loc = self.locate(f.doc_index, f.path)
+            if loc is not None:
+                f.line, f.column = loc
+
+
+def position_loader(base: type) -> type:
+    """Subclass of the loader class ``base`` that feeds a ``SourceMap``."""
+
+    class PositionLoader(base):
+        source_map: SourceMap
+
+        def construct_document(self, node):
+            # the base class resets constructed_objects; keep this document's
+            constructed = self.constructed_objects
+            data = super().construct_document(node)
+            if data is not None:
+                self.source_map.add_document(data, node, constructed)
+            return data
+
+    PositionLoader.__name__ = f"Position{base.__name__}"
+    return PositionLoader
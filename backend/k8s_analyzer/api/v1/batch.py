@@ -0,0 +1,122 @@
+# backend/app/api/v1/batch.py
+"""
+Input handling for ``POST /api/v1/scan/batch``.
+
+A batch is a JSON array of ``{"name": ..., "content": ...}`` objects, or a
+multipart form with any number of ``files`` parts and/or ``archive`` parts
+(zip or tar, optionally gzip/bz2/xz compressed).  Archive members with a YAML
+suffix become inputs named by their member path.  Item count and total size
+are capped by settings so archives cannot expand without bound.
+"""
+from typing import Any, List, NamedTuple, Optional
+import io
+import tarfile
+import zipfile
+import zlib
+
+from k8s_analyzer.core.settings import settings
+
+YAML_SUFFIXES = (".yaml", ".yml")
+
+
+class BatchError(ValueError):
+    """The batch as a whole is malformed; ``status_code`` is the HTTP status to answer with."""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class BatchInput(NamedTuple):
+    name: str
+    content: Optional[str]
+    size: int
+    # set instead of ``content`` when this input alone cannot be scanned
+    error: Optional[str] = None
+
+
+class BatchBudget:
+    """Running item count and byte total, checked before each input is read."""
+
+    def __init__(self, max_items: int = settings.SCAN_BATCH_MAX_ITEMS,
+                 max_bytes: int = settings.SCAN_BATCH_MAX_BYTES):
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.items = 0
+        self.bytes = 0
+
+    @property
+    def remaining_bytes(self) -> int:
+        return self.max_bytes - self.bytes
+
+    def add(self, size: int):
+        self.items += 1
+        self.bytes += size
+        if self.items > self.max_items:
+            raise BatchError(f"Batch exceeds {self.max_items} inputs", status_code=413)
+        if self.bytes > self.max_bytes:
+            raise BatchError(f"Batch exceeds {self.max_bytes} bytes", status_code=413)
+
+
+def decode_input(name: str, raw: bytes, budget: BatchBudget) -> BatchInput:
+    budget.add(len(raw))
+    try:
+        return BatchInput(name, raw.decode("utf-8"), len(raw))
+    except UnicodeDecodeError:
+        return BatchInput(name, None, len(raw), "Input is not valid UTF-8")
+
+
+def inputs_from_json(data: Any, budget: BatchBudget) -> List[BatchInput]:
+    if not isinstance(data, list):
+        raise BatchError("JSON batch must be an array of {\"name\", \"content\"} objects")
+    inputs: List[BatchInput] = []
+    for i, item in enumerate(data):
+        if not isinstance(item, dict) or not isinstance(item.get("content"), str):
+            raise BatchError(f"Batch item {i} must be an object with a string \"content\"")
+        name = item.get("name")
+        name = name if isinstance(name, str) and name else f"input-{i}"
+        size = len(item["content"].encode("utf-8", "surrogatepass"))
+        budget.add(size)
+        inputs.append(BatchInput(name, item["content"], size))
+    return inputs
+
+
+def _read_capped(fh, budget: BatchBudget, name: str) -> bytes:
+    # declared sizes in archive headers can lie; never read past the budget
+    data = fh.read(budget.remaining_bytes + 1)
+    if len(data) > budget.remaining_bytes:
+        raise BatchError(f"Batch exceeds {budget.max_bytes} bytes (at {name})", status_code=413)
+    return data
+
+
+def inputs_from_archive(data: bytes, filename: str, budget: BatchBudget) -> List[BatchInput]:
+    """YAML members of a zip or tar archive, in archive order."""
+    inputs: List[BatchInput] = []
+    if zipfile.is_zipfile(io.BytesIO(data)):
+        try:
+            with zipfile.ZipFile(io.BytesIO(data)) as zf:
+                for info in zf.infolist():
+                    if info.is_dir() or not info.filename.lower().endswith(YAML_SUFFIXES):
+                        continue
+                    with zf.open(info) as fh:
+                        raw = _read_capped(fh, budget, info.filename)
+                    inputs.append(decode_input(info.filename, raw, budget))
+        except (zipfile.BadZipFile, zlib.error, RuntimeError, NotImplementedError) as e:
+            raise BatchError(f"Failed to read zip archive {filename}: {e}")
+        return inputs
+    try:
+        with tarfile.open(fileobj=io.BytesIO(data), mode="r:*") as tf:
+            for member in tf:
+                if not member.isfile() or not member.name.lower().endswith(YAML_SUFFIXES):
+                    continue
+                fh = tf.extractfile(member)
+                if fh is None:
+                    continue
+                with fh:
+                    raw = _read_capped(fh, budget, member.name)
+                inputs.append(decode_input(member.name, raw, budget))
+    except tarfile.ReadError:
+        raise BatchError(f"Archive {filename} is neither a zip nor a tar file")
+    except (tarfile.TarError, EOFError, OSError) as e:
+        raise BatchError(f"Failed to read tar archive {filename}: {e}")
+    return inputs
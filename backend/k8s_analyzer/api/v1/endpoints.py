@@ -1,67 +1,242 @@
 # backend/app/api/v1/endpoints.py
-from fastapi import APIRouter, File, UploadFile, Body, HTTPException
-from typing import Optional
+from fastapi import APIRouter, File, UploadFile, Body, HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from collections import Counter
+from typing import Dict, List, NamedTuple, Optional
+import asyncio
 import logging
 
-from k8s_analyzer.api.v1.models import ScanResult, Finding
+from k8s_analyzer.api.v1.models import ScanResult, Finding, BatchScanResult
+from k8s_analyzer.api.v1.batch import (
+    BatchBudget, BatchError, BatchInput, decode_input, inputs_from_archive, inputs_from_json,
+)
 
-from k8s_analyzer.analyzer.parser import parse_yaml_documents
-from k8s_analyzer.analyzer.best_practices import find_best_practices_issues
-from k8s_analyzer.analyzer.security_checks import find_security_issues
-from k8s_analyzer.analyzer.schema_validator import validate_schema_for_docs
-from k8s_analyzer.analyzer.report import build_report
+from k8s_analyzer.analyzer.analyzer_core import analyze_text, YamlParseError
+from k8s_analyzer.analyzer.aggregate import group_findings
+from k8s_analyzer.analyzer.findings import CompactFinding
+from k8s_analyzer.analyzer.report import summarize
+from k8s_analyzer.analyzer.source_map import POSITIONS_VARIANT
+from k8s_analyzer.analyzer.serialize import (
+    dumps_report, iter_report_json, iter_ndjson, batch_item_json, batch_summary_json, dumps_batch,
+    dumps_grouped_report, iter_grouped_ndjson,
+)
+from k8s_analyzer.core.settings import settings
+from k8s_analyzer.analyzer.cache import get_scan_cache
+from k8s_analyzer.core.scan_pool import scan_dispatcher, ScanPoolFull
+from k8s_analyzer.core import metrics
 
 logger = logging.getLogger("k8s-yaml-analyzer.api")
 
 router = APIRouter()
 
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def _query_flag(request: Request, name: str) -> bool:
+    return request.query_params.get(name, "").lower() in ("1", "true", "yes")
+
+
+def _scan_response(request: Request, findings) -> Response:
+    """
+    Serialize analyzer findings directly; the output is trusted, so the
+    ScanResult response model is not rebuilt and re-validated.  Large reports
+    are streamed, and clients accepting NDJSON get one finding per line.
+    With ``?group=true`` the body is a GroupedScanResult (NDJSON: one group per line).
+    """
+    if _query_flag(request, "group"):
+        aggregator = group_findings(findings)
+        if NDJSON_MEDIA_TYPE in request.headers.get("accept", ""):
+            return StreamingResponse(iter_grouped_ndjson(aggregator), media_type=NDJSON_MEDIA_TYPE)
+        return Response(content=dumps_grouped_report(aggregator), media_type="application/json")
+    if NDJSON_MEDIA_TYPE in request.headers.get("accept", ""):
+        return StreamingResponse(iter_ndjson(findings), media_type=NDJSON_MEDIA_TYPE)
+    if len(findings) >= settings.SCAN_STREAM_MIN_FINDINGS:
+        return StreamingResponse(iter_report_json(findings), media_type="application/json")
+    return Response(content=dumps_report(findings), media_type="application/json")
+
+
+def _wants_positions(request: Request) -> bool:
+    return _query_flag(request, "positions")
+
+
 @router.post("/scan", response_model=ScanResult)
-async def scan(file: UploadFile = File(None), raw_yaml: Optional[str] = Body(None)):
+async def scan(request: Request, file: UploadFile = File(None), raw_yaml: Optional[str] = Body(None)):
     """
     Scan uploaded YAML file or raw YAML text for schema, security and best-practice issues.
     Provide either multipart file upload (file) or raw YAML text (raw_yaml).
+    Send ``Accept: application/x-ndjson`` to receive findings as NDJSON.
+    Add ``?positions=true`` to get the source ``line``/``column`` of each finding,
+    or ``?group=true`` to collapse identical findings across documents into
+    GroupedScanResult groups with an occurrence count and document indexes.
     """
     content = None
     if file is not None:
         try:
             content_bytes = await file.read()
+            payload_bytes = len(content_bytes)
             content = content_bytes.decode("utf-8")
         except Exception as e:
             logger.exception("Failed to read uploaded file")
             raise HTTPException(status_code=400, detail="Failed to read uploaded file")
     elif raw_yaml is not None:
         content = raw_yaml
+        payload_bytes = len(raw_yaml.encode("utf-8", "surrogatepass"))
     else:
         raise HTTPException(status_code=400, detail="No file or raw_yaml provided")
 
     try:
-        docs = parse_yaml_documents(content)
-    except Exception as e:
-        logger.exception("Parsing YAML failed")
+        findings = await _analyze(content, payload_bytes, _wants_positions(request))
+    except ScanPoolFull:
+        logger.warning("Scan rejected: %d scans pending", scan_dispatcher.pending)
+        raise HTTPException(status_code=503, detail="Scanner is busy, retry later",
+                            headers={"Retry-After": "1"})
+    except YamlParseError as e:
+        logger.warning("Parsing YAML failed: %s", e)
         raise HTTPException(status_code=400, detail=f"YAML parse error: {e}")
 
-    findings = []
+    return _scan_response(request, findings)
 
-    # schema validation (best-effort -- offline stub if no schema available)
-    try:
-        schema_issues = validate_schema_for_docs(docs)
-        findings.extend(schema_issues)
-    except Exception:
-        logger.exception("Schema validation failed, continuing with other checks")
 
-    # best practices
-    try:
-        bp_issues = find_best_practices_issues(docs)
-        findings.extend(bp_issues)
-    except Exception:
-        logger.exception("Best practices check failed")
+async def _analyze(content: str, payload_bytes: int, positions: bool = False) -> List[CompactFinding]:
+    """
+    Findings for one manifest, from the scan cache or the scan pools.
+    Raises ScanPoolFull when the pools are saturated and YamlParseError on bad YAML.
+    """
+    metrics.PAYLOAD_BYTES.observe(payload_bytes)
+    # unchanged manifests skip parsing and analysis entirely; hashing and
+    # decoding large payloads happens off the event loop too
+    cache = get_scan_cache()
+    cache_key = await run_in_threadpool(cache.key, content, POSITIONS_VARIANT if positions else "")
+    findings = await run_in_threadpool(cache.get, cache_key)
+    if findings is not None:
+        metrics.FINDINGS_PER_REQUEST.observe(len(findings))
+        return findings
+
+    findings, failed_rules, stats = await scan_dispatcher.run(
+        len(content), analyze_text, content, False, settings.METRICS_RULE_TIMING, positions)
+    stats.record()
+    # partial results (a rule failed) are not cached
+    if not failed_rules:
+        await run_in_threadpool(cache.put, cache_key, findings)
+    return findings
+
+
+async def _batch_inputs(request: Request) -> List[BatchInput]:
+    budget = BatchBudget()
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("application/json"):
+        try:
+            data = await request.json()
+        except ValueError:
+            raise BatchError("Request body is not valid JSON")
+        return inputs_from_json(data, budget)
+    if not content_type.startswith("multipart/form-data"):
+        raise BatchError("Send a JSON array or multipart/form-data with files/archive parts", status_code=415)
 
-    # security checks
+    limit = settings.SCAN_BATCH_MAX_ITEMS
+    form = await request.form(max_files=limit, max_fields=limit)
+    inputs: List[BatchInput] = []
+    for field, value in form.multi_items():
+        if not hasattr(value, "read"):
+            continue
+        raw = await value.read()
+        name = value.filename or field
+        if field == "files":
+            inputs.append(decode_input(name, raw, budget))
+        elif field == "archive":
+            inputs.extend(await run_in_threadpool(inputs_from_archive, raw, name, budget))
+    if not inputs:
+        raise BatchError("No files or archive entries provided")
+    return inputs
+
+
+class _ItemOutcome(NamedTuple):
+    index: int
+    json: str
+    error: bool
+    ok: bool = False
+    summary: Optional[Dict[str, int]] = None
+
+
+def _item_error(index: int, item: BatchInput, message: str) -> _ItemOutcome:
+    return _ItemOutcome(index, batch_item_json(index, item.name, error=message), True)
+
+
+async def _scan_item(index: int, item: BatchInput, limit: asyncio.Semaphore,
+                     positions: bool = False) -> _ItemOutcome:
+    """Scan one batch input. Per-input errors are reported in its result and don't fail the batch."""
+    if item.error is not None:
+        return _item_error(index, item, item.error)
+    async with limit:
+        try:
+            findings = await _analyze(item.content, item.size, positions)
+        except ScanPoolFull:
+            return _item_error(index, item, "Scanner is busy, retry later")
+        except YamlParseError as e:
+            return _item_error(index, item, f"YAML parse error: {e}")
+        except Exception:
+            logger.exception("Batch input %s failed", item.name)
+            return _item_error(index, item, "Internal error while scanning")
+    ok, summary = summarize(findings)
+    return _ItemOutcome(index, batch_item_json(index, item.name, findings), False, ok, summary)
+
+
+class _BatchTotals:
+    def __init__(self, inputs: int):
+        self.inputs = inputs
+        self.errors = 0
+        self.ok = True
+        self.summary: Counter = Counter({"CRITICAL": 0, "HIGH": 0, "MEDIUM": 0, "LOW": 0})
+
+    def add(self, outcome: _ItemOutcome):
+        if outcome.error:
+            self.errors += 1
+            self.ok = False
+        else:
+            self.ok = self.ok and outcome.ok
+            self.summary.update(outcome.summary)
+
+
+@router.post("/scan/batch", response_model=BatchScanResult)
+async def scan_batch(request: Request):
+    """
+    Scan many manifests in one request.
+
+    Send a JSON array of ``{"name", "content"}`` objects, or multipart/form-data
+    with any number of ``files`` parts and/or ``archive`` parts (zip, tar,
+    tar.gz).  Inputs are analyzed concurrently; the response has one
+    ScanResult (or error) per input plus an aggregate summary.  With
+    ``Accept: application/x-ndjson`` (or ``?stream=true``) each input's result
+    is sent as its own line as soon as it finishes, followed by a summary line.
+    ``?positions=true`` adds source ``line``/``column`` to every finding.
+    """
     try:
-        sec_issues = find_security_issues(docs)
-        findings.extend(sec_issues)
-    except Exception:
-        logger.exception("Security checks failed")
+        inputs = await _batch_inputs(request)
+    except BatchError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
+    limit = asyncio.Semaphore(max(1, settings.SCAN_BATCH_CONCURRENCY))
+    positions = _wants_positions(request)
+    tasks = [asyncio.ensure_future(_scan_item(i, item, limit, positions)) for i, item in enumerate(inputs)]
+    totals = _BatchTotals(len(inputs))
+
+    stream = NDJSON_MEDIA_TYPE in request.headers.get("accept", "") or _query_flag(request, "stream")
+    if stream:
+        async def lines():
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    outcome = await next_done
+                    totals.add(outcome)
+                    yield outcome.json + "\n"
+                yield batch_summary_json(totals.ok, totals.inputs, totals.errors, dict(totals.summary)) + "\n"
+            finally:
+                for task in tasks:
+                    task.cancel()
+        return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE)
 
-    result = build_report(findings)
-    return result
+    outcomes = await asyncio.gather(*tasks)
+    for outcome in outcomes:
+        totals.add(outcome)
+    body = dumps_batch([o.json for o in outcomes], totals.ok, totals.inputs, totals.errors, dict(totals.summary))
+    return Response(content=body, media_type="application/json")
@@ -1,6 +1,6 @@
 # backend/app/api/v1/models.py
 from typing import Optional, List, Dict
-from pydantic import BaseModel
+from pydantic import BaseModel, model_serializer
 
 class Finding(BaseModel):
     rule_id: str
@@ -9,8 +9,47 @@ class Finding(BaseModel):
     severity: str
     path: Optional[str] = None
     doc_index: Optional[int] = None
+    # 1-based source position; only present when the scan asked for positions
+    line: Optional[int] = None
+    column: Optional[int] = None
+
+    @model_serializer(mode="wrap")
+    def _omit_unset_position(self, handler):
+        data = handler(self)
+        if data.get("line") is None and data.get("column") is None:
+            data.pop("line", None)
+            data.pop("column", None)
+        return data
 
 class ScanResult(BaseModel):
     ok: bool
     findings: List[Finding]
     summary: Dict[str, int]
+
+class FindingGroup(BaseModel):
+    rule_id: str
+    title: str
+    message: str
+    severity: str
+    path: Optional[str] = None
+    # occurrences across documents; doc_indexes is capped, count is not
+    count: int
+    doc_indexes: List[int]
+
+class GroupedScanResult(BaseModel):
+    ok: bool
+    groups: List[FindingGroup]
+    summary: Dict[str, int]
+
+class BatchItemResult(BaseModel):
+    index: int
+    name: str
+    result: Optional[ScanResult] = None
+    error: Optional[str] = None
+
+class BatchScanResult(BaseModel):
+    ok: bool
+    inputs: int
+    errors: int
+    summary: Dict[str, int]
+    results: List[BatchItemResult]
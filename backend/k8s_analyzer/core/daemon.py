@@ -0,0 +1,269 @@
+# backend/app/core/daemon.py
+"""
+Warm scanner daemon for the CLI.
+
+Most of a small ``cli.py`` run is startup: importing the analyzer, loading
+the policy and OpenAPI schemas, compiling validators, and an empty scan
+cache.  ``cli.py --daemon`` pays for that once and then runs CLI invocations
+sent over a Unix socket; ``cli.py`` tries the socket first and scans
+in-process when nothing answers.
+
+One request per connection.  The client sends one JSON object: ``argv``,
+``cwd``, its ``KYA_*`` environment and the ``root`` of the code it would
+run, then half-closes.  The reply is ``{"code", "stdout", "stderr"}``, or
+``{"error"}`` when the daemon declines and the client should scan itself:
+another checkout, other ``KYA_*`` settings, or source files changed since the
+daemon started (in which case the daemon also exits, so the next start
+loads the new code).
+
+Only the user running the daemon may use it, and the client only trusts a
+daemon of its own user: the default socket lives in a directory private to
+the user (``$XDG_RUNTIME_DIR``, else ``kya-<uid>/`` under the temp directory,
+mode 0700), and the client checks the listener's uid (``SO_PEERCRED``, else
+the socket file's owner) before sending anything.
+
+Requests are served one at a time on the main thread: a run changes the
+working directory and redirects stdout, both process-wide, and ``--jobs``
+forks worker processes, which a threaded server should not do.
+"""
+from contextlib import redirect_stderr, redirect_stdout
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import io
+import json
+import logging
+import os
+import signal
+import socket
+import stat
+import struct
+import sys
+import tempfile
+
+from k8s_analyzer.core.settings import env_overrides, settings
+
+logger = logging.getLogger("k8s-yaml-analyzer.daemon")
+
+# runs one CLI invocation (argv without the program name), printing as cli.py would
+Handler = Callable[[List[str]], int]
+
+_BACKLOG = 64
+_CHUNK = 1 << 16
+
+
+class DaemonUnavailable(Exception):
+    """No daemon answered, or it declined the request: scan in-process."""
+
+
+def socket_path(path: Optional[str] = None) -> str:
+    path = path or settings.DAEMON_SOCKET
+    if path:
+        return path
+    runtime = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime:
+        # private to the user already
+        return os.path.join(runtime, f"kya-{os.getuid()}.sock")
+    return _temp_socket_path()
+
+
+def _temp_socket_path() -> str:
+    # the temp directory is shared: a directory of our own, made by the daemon
+    return os.path.join(tempfile.gettempdir(), f"kya-{os.getuid()}", "daemon.sock")
+
+
+def _private_dir(directory: str):
+    """Create ``directory`` mode 0700, or check an existing one is ours and private."""
+    try:
+        os.mkdir(directory, 0o700)
+    except FileExistsError:
+        pass
+    st = os.lstat(directory)
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+        raise RuntimeError(f"{directory} must be a directory owned by this user with mode 0700")
+
+
+def _peer_uid(conn: socket.socket, path: str) -> int:
+    """uid of the process listening on ``path``, as far as the platform tells."""
+    if hasattr(socket, "SO_PEERCRED"):
+        creds = conn.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+        return struct.unpack("3i", creds)[1]
+    return os.stat(path).st_uid
+
+
+def _settings_env() -> Dict[str, str]:
+    # KYA_* variables that change scan results; the socket settings only pick the daemon
+    return {k.upper(): v for k, v in env_overrides().items() if not k.upper().startswith("KYA_DAEMON_")}
+
+
+def source_stamp(paths: Iterable[str]) -> Tuple[int, int]:
+    """(file count, newest mtime) over ``paths`` (files, or directories walked recursively)."""
+    count = newest = 0
+    for path in paths:
+        if os.path.isfile(path):
+            files = [path]
+        else:
+            files = []
+            for root, dirs, names in os.walk(path):
+                dirs[:] = [d for d in dirs if d != "__pycache__"]
+                files.extend(os.path.join(root, n) for n in names)
+        for f in files:
+            try:
+                mtime = os.stat(f).st_mtime_ns
+            except OSError:
+                continue
+            count += 1
+            newest = max(newest, mtime)
+    return count, newest
+
+
+def _read_all(conn: socket.socket) -> bytes:
+    chunks = []
+    while True:
+        chunk = conn.recv(_CHUNK)
+        if not chunk:
+            return b"".join(chunks)
+        chunks.append(chunk)
+
+
+# -- client --------------------------------------------------------------------
+
+def run_remote(argv: List[str], root: str, path: Optional[str] = None,
+               timeout: float = settings.DAEMON_CONNECT_TIMEOUT_S) -> Dict[str, Any]:
+    """
+    Run ``argv`` on the daemon at ``path``; returns its ``code``, ``stdout``
+    and ``stderr``.  Raises ``DaemonUnavailable`` if there is no daemon, it
+    declines, or the connection drops before a reply (nothing was printed
+    yet, so the caller can still scan in-process).
+    """
+    path = socket_path(path)
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        conn.settimeout(timeout)
+        conn.connect(path)
+        # another user's listener could print anything and exit 0
+        if _peer_uid(conn, path) != os.getuid():
+            raise DaemonUnavailable(f"{path} is served by another user")
+        # the scan itself may take as long as it takes
+        conn.settimeout(None)
+        request = {"argv": argv, "cwd": os.getcwd(), "env": _settings_env(), "root": root}
+        conn.sendall(json.dumps(request).encode())
+        conn.shutdown(socket.SHUT_WR)
+        data = _read_all(conn)
+    except OSError as e:
+        raise DaemonUnavailable(str(e)) from e
+    finally:
+        conn.close()
+    try:
+        reply = json.loads(data)
+    except ValueError:
+        raise DaemonUnavailable("no reply from the daemon") from None
+    if "error" in reply:
+        raise DaemonUnavailable(reply["error"])
+    return reply
+
+
+# -- server --------------------------------------------------------------------
+
+class _Daemon:
+    def __init__(self, handler: Handler, root: str, sources: List[str]):
+        self.handler = handler
+        self.root = root
+        self.sources = sources
+        self.env = _settings_env()
+        self.stamp = source_stamp(sources)
+        self.served = 0
+        self.stopping = False
+
+    def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        if request.get("root") != self.root:
+            return {"error": f"daemon serves {self.root}"}
+        if request.get("env") != self.env:
+            return {"error": "daemon runs with other KYA_* settings"}
+        if source_stamp(self.sources) != self.stamp:
+            self.stopping = True
+            return {"error": "source files changed since the daemon started"}
+        out, err = io.StringIO(), io.StringIO()
+        cwd = os.getcwd()
+        try:
+            os.chdir(request["cwd"])
+            with redirect_stdout(out), redirect_stderr(err):
+                code = self.handler(list(request["argv"]))
+        except Exception as e:
+            # let the client run it and show the traceback itself
+            logger.exception("request failed")
+            return {"error": f"daemon failed: {e}"}
+        finally:
+            os.chdir(cwd)
+        self.served += 1
+        return {"code": code, "stdout": out.getvalue(), "stderr": err.getvalue()}
+
+    def serve_connection(self, conn: socket.socket):
+        try:
+            request = json.loads(_read_all(conn))
+            if not isinstance(request, dict):
+                raise ValueError("request must be an object")
+        except ValueError as e:
+            reply = {"error": f"bad request: {e}"}
+        else:
+            reply = self.handle(request)
+        try:
+            conn.sendall(json.dumps(reply).encode())
+        except OSError:
+            # client gave up (^C); nothing to clean up
+            pass
+
+
+def _claim(path: str):
+    """Remove a stale socket file; refuse to replace a daemon that still answers."""
+    if not os.path.exists(path):
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except OSError:
+        os.unlink(path)
+    else:
+        raise RuntimeError(f"a daemon is already listening on {path}")
+    finally:
+        probe.close()
+
+
+def serve(handler: Handler, root: str, sources: List[str], path: Optional[str] = None,
+          ready: Optional[Callable[[str], None]] = None) -> int:
+    """
+    Serve CLI runs on the socket at ``path`` until SIGINT/SIGTERM, or until a
+    file under ``sources`` changes; ``ready(path)`` is called once clients can
+    connect.  Returns the number of runs served.
+    """
+    path = socket_path(path)
+    if path == _temp_socket_path():
+        _private_dir(os.path.dirname(path))
+    _claim(path)
+    daemon = _Daemon(handler, root, sources)
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    # only the owner may connect
+    umask = os.umask(0o177)
+    try:
+        listener.bind(path)
+    finally:
+        os.umask(umask)
+    listener.listen(_BACKLOG)
+    previous = signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    logger.info("scanner daemon listening on %s", path)
+    if ready is not None:
+        ready(path)
+    try:
+        while not daemon.stopping:
+            conn, _ = listener.accept()
+            with conn:
+                daemon.serve_connection(conn)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        signal.signal(signal.SIGTERM, previous)
+        listener.close()
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+        logger.info("scanner daemon stopped after %d runs", daemon.served)
+    return daemon.served
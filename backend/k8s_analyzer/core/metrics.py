@@ -0,0 +1,174 @@
+# backend/app/core/metrics.py
+"""
+Minimal in-process metrics with Prometheus text exposition.
+
+No client library or external service: histograms and counters live in this
+process and ``REGISTRY.render()`` produces the text format served on
+``/metrics``.  Scrape-time callbacks let other modules (caches, pools) expose their
+own counters at scrape time.
+"""
+from bisect import bisect_left
+from typing import Callable, Dict, List, Sequence, Tuple, Union
+import threading
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 5, 10, 50, 100, 500, 1000, 5000, 10000, 50000, 100000)
+BYTES_BUCKETS = (1024, 10240, 102400, 1048576, 10485760, 104857600)
+
+LabelValues = Tuple[str, ...]
+
+
+def _fmt(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, buckets: Sequence[float] = LATENCY_BUCKETS,
+                 labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        # labels -> [bucket counts..., sum, count]
+        self._series: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, *labelvalues: str):
+        idx = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [0.0] * (len(self.buckets) + 2)
+            if idx < len(self.buckets):
+                series[idx] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {k: list(v) for k, v in self._series.items()}
+        for labelvalues, values in sorted(series.items()):
+            cumulative = 0.0
+            for bound, n in zip(self.buckets, values):
+                cumulative += n
+                le = _labels(self.labelnames, labelvalues, f'le="{_fmt(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {_fmt(cumulative)}")
+            inf = _labels(self.labelnames, labelvalues, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{inf} {_fmt(values[-1])}")
+            plain = _labels(self.labelnames, labelvalues)
+            lines.append(f"{self.name}_sum{plain} {_fmt(values[-2])}")
+            lines.append(f"{self.name}_count{plain} {_fmt(values[-1])}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, *labelvalues: str):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = dict(self._values)
+        for labelvalues, value in sorted(values.items()):
+            lines.append(f"{self.name}{_labels(self.labelnames, labelvalues)} {_fmt(value)}")
+        return lines
+
+
+CallbackValue = Union[float, Dict[LabelValues, float]]
+
+
+class CallbackMetric:
+    """Gauge or counter whose value(s) are read from a callback at scrape time."""
+
+    def __init__(self, name: str, help: str, fn: Callable[[], CallbackValue],
+                 labelnames: Sequence[str] = (), type: str = "gauge"):
+        self.name = name
+        self.help = help
+        self.fn = fn
+        self.labelnames = tuple(labelnames)
+        self.type = type
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        value = self.fn()
+        if isinstance(value, dict):
+            for labelvalues, v in sorted(value.items()):
+                lines.append(f"{self.name}{_labels(self.labelnames, labelvalues)} {_fmt(v)}")
+        else:
+            lines.append(f"{self.name} {_fmt(value)}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+
+    def _add(self, metric):
+        # idempotent so module reloads don't duplicate series
+        return self._metrics.setdefault(metric.name, metric)
+
+    def histogram(self, name: str, help: str, buckets: Sequence[float] = LATENCY_BUCKETS,
+                  labelnames: Sequence[str] = ()) -> Histogram:
+        return self._add(Histogram(name, help, buckets, labelnames))
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._add(Counter(name, help, labelnames))
+
+    def callback(self, name: str, help: str, fn: Callable[[], CallbackValue],
+                 labelnames: Sequence[str] = (), type: str = "gauge") -> CallbackMetric:
+        # replaces any previous callback, e.g. after a cache is reconfigured
+        metric = CallbackMetric(name, help, fn, labelnames, type)
+        self._metrics[name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+PARSE_SECONDS = REGISTRY.histogram(
+    "kya_parse_seconds", "Time spent parsing YAML per scan request")
+ANALYZE_SECONDS = REGISTRY.histogram(
+    "kya_analyze_seconds", "Time spent in the rule engine per scan request")
+ANALYZER_SECONDS = REGISTRY.histogram(
+    "kya_analyzer_seconds", "Rule evaluation time per analyzer per scan", labelnames=("analyzer",))
+RULE_SECONDS = REGISTRY.histogram(
+    "kya_rule_seconds", "Evaluation time per rule per scan", labelnames=("rule_id",))
+DOCUMENTS_PER_REQUEST = REGISTRY.histogram(
+    "kya_documents_per_request", "YAML documents per scan request", buckets=COUNT_BUCKETS)
+FINDINGS_PER_REQUEST = REGISTRY.histogram(
+    "kya_findings_per_request", "Findings per scan request", buckets=COUNT_BUCKETS)
+PAYLOAD_BYTES = REGISTRY.histogram(
+    "kya_payload_bytes", "Scan request payload size in bytes", buckets=BYTES_BUCKETS)
+WEBHOOK_REVIEW_SECONDS = REGISTRY.histogram(
+    "kya_webhook_review_seconds", "Admission review verdict latency", labelnames=("source",))
+WEBHOOK_VERDICTS = REGISTRY.counter(
+    "kya_webhook_verdicts_total", "Admission review verdicts", labelnames=("allowed",))
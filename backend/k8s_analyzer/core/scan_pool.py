@@ -0,0 +1,79 @@
+# backend/app/core/scan_pool.py
+"""
+Bounded worker pools for CPU-bound scans.
+
+Keeps YAML parsing and rule evaluation off the event loop: small payloads run
+on a thread pool, large ones on a process pool (so they don't hold the GIL
+against every other request).  The number of in-flight scans is capped, and
+callers beyond the cap are rejected with ``ScanPoolFull`` instead of queueing
+without bound.
+"""
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+import asyncio
+import multiprocessing
+
+from k8s_analyzer.core.settings import settings
+
+
+class ScanPoolFull(Exception):
+    """Raised when the maximum number of pending scans is reached."""
+
+
+class ScanDispatcher:
+    def __init__(self,
+                 thread_workers: int = settings.SCAN_THREAD_WORKERS,
+                 process_workers: int = settings.SCAN_PROCESS_WORKERS,
+                 process_threshold: int = settings.SCAN_PROCESS_THRESHOLD_BYTES,
+                 max_pending: int = settings.SCAN_MAX_PENDING):
+        self.thread_workers = thread_workers
+        self.process_workers = process_workers
+        self.process_threshold = process_threshold
+        self.max_pending = max_pending
+        self._threads: Optional[ThreadPoolExecutor] = None
+        self._processes: Optional[ProcessPoolExecutor] = None
+        # only touched from the event loop thread
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _executor_for(self, size: int) -> Executor:
+        if self.process_workers > 0 and size >= self.process_threshold:
+            if self._processes is None:
+                # spawn: forking a process that already runs threads is unsafe
+                self._processes = ProcessPoolExecutor(
+                    max_workers=self.process_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._processes
+        if self._threads is None:
+            self._threads = ThreadPoolExecutor(max_workers=self.thread_workers,
+                                               thread_name_prefix="scan")
+        return self._threads
+
+    async def run(self, size: int, fn: Callable[..., Any], *args) -> Any:
+        """Run ``fn(*args)`` on the pool matching a payload of ``size`` bytes."""
+        if self._pending >= self.max_pending:
+            raise ScanPoolFull(f"{self._pending} scans already pending")
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor_for(size), fn, *args)
+        finally:
+            self._pending -= 1
+
+    def stats(self) -> Dict[str, int]:
+        return {"pending": self._pending, "max_pending": self.max_pending}
+
+    def shutdown(self):
+        if self._threads is not None:
+            self._threads.shutdown(wait=False, cancel_futures=True)
+            self._threads = None
+        if self._processes is not None:
+            self._processes.shutdown(wait=False, cancel_futures=True)
+            self._processes = None
+
+
+scan_dispatcher = ScanDispatcher()
@@ -1,8 +1,21 @@
 # backend/app/core/settings.py
-from pydantic_settings import BaseSettings
+"""
+Settings, overridable through ``KYA_``-prefixed environment variables.
 
+Every module reads these at import time, so loading them is on the startup
+path of each CLI run.  Defaults and plain overrides (``KYA_PORT=9000``,
+``KYA_WEBHOOK_FAIL_OPEN=true``) need nothing but this module; pydantic-settings,
+a good part of the interpreter's startup cost, is imported only for a value
+that needs its parsing or rejection.
+"""
+import os
+import re
+from typing import Any, Optional
 
-class Settings(BaseSettings):
+ENV_PREFIX = "KYA_"
+
+
+class Settings:
     APP_NAME: str = "k8s-yaml-analyzer"
     APP_VERSION: str = "0.1.0"
     HOST: str = "0.0.0.0"
@@ -10,8 +23,128 @@ class Settings(BaseSettings):
     LOG_LEVEL: str = "INFO"
     # severity threshold (CI/CLI can use): CRITICAL,HIGH,MEDIUM,LOW
     FAIL_ON_SEVERITY: str = "HIGH"
+    # scan result cache: in-memory LRU budget and optional shared SQLite file
+    SCAN_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    SCAN_CACHE_PATH: Optional[str] = None
+    # rows kept per table of a shared SQLite cache file (scan results, webhook
+    # verdicts); the oldest writes beyond it are pruned, 0 keeps everything
+    SHARED_CACHE_MAX_ENTRIES: int = 100_000
+    # cli.py --incremental: per-file hashes and findings from the previous run
+    SCAN_STATE_PATH: str = ".kya-scan-state.json"
+    # /api/v1/scan worker pools: payloads at or above the threshold go to
+    # processes, smaller ones to threads; beyond MAX_PENDING requests get 503
+    SCAN_THREAD_WORKERS: int = 4
+    SCAN_PROCESS_WORKERS: int = 2
+    SCAN_PROCESS_THRESHOLD_BYTES: int = 1024 * 1024
+    SCAN_MAX_PENDING: int = 32
+    # /api/v1/scan reports with at least this many findings are streamed
+    SCAN_STREAM_MIN_FINDINGS: int = 5000
+    # /api/v1/scan/batch: input limits (after archive extraction) and how
+    # many inputs of one batch are analyzed at a time
+    SCAN_BATCH_MAX_ITEMS: int = 1000
+    SCAN_BATCH_MAX_BYTES: int = 64 * 1024 * 1024
+    SCAN_BATCH_CONCURRENCY: int = 8
+    # grouped reports (--group / ?group=true): document indexes kept per group
+    AGGREGATE_MAX_DOC_INDEXES: int = 1000
+    # rule policy file (enable/disable/severity by kind, namespace, labels, and
+    # webhook bypass lists); see analyzer/policy.py
+    POLICY_PATH: Optional[str] = None
+    # OpenAPI schema validation (SCHEMA_004): Kubernetes version to validate
+    # against ("" disables), and a directory of v<major>.<minor>.json specs
+    # searched before the bundled ones; see analyzer/openapi.py
+    K8S_SCHEMA_VERSION: str = "1.30"
+    K8S_SCHEMA_DIR: Optional[str] = None
+    # PodSpec / container subtrees whose rule hits (per scan) and schema
+    # errors (per process) are remembered by content; 0 disables
+    SUBTREE_MEMO_MAX_ENTRIES: int = 4096
+    # parsed image references kept per process (BP_002, admission webhook)
+    IMAGE_REF_CACHE_SIZE: int = 4096
+    # admission webhook image policy, comma-separated (see analyzer/images.py):
+    # registries images must come from ("" allows any) or must not, whether
+    # they must be pinned by digest, and image prefixes exempt from all of it
+    IMAGE_ALLOWED_REGISTRIES: str = ""
+    IMAGE_DENIED_REGISTRIES: str = ""
+    IMAGE_REQUIRE_DIGEST: bool = False
+    IMAGE_BYPASS_PREFIXES: str = "ghcr.io/ansh-verma1404/k8s-yaml-analyzer-backend"
+    # admission webhook fast path
+    WEBHOOK_VERDICT_CACHE_SIZE: int = 4096
+    # optional SQLite file backing the verdict cache, shared between processes
+    WEBHOOK_VERDICT_CACHE_PATH: Optional[str] = None
+    WEBHOOK_LATENCY_BUDGET_MS: float = 5.0
+    # hard per-review budget for running the ruleset; on timeout the review is
+    # allowed (fail open) or denied (fail closed, matches failurePolicy: Fail)
+    WEBHOOK_TIMEOUT_MS: float = 2000.0
+    WEBHOOK_FAIL_OPEN: bool = False
+    # let a resource's own k8s-yaml-analyzer/ignore annotation suppress rules
+    # in admission reviews too; off, since it lets workloads opt themselves out
+    WEBHOOK_HONOR_IGNORE_ANNOTATION: bool = False
+    WEBHOOK_WORKERS: int = 4
+    # per-rule timings for /metrics (one perf_counter pair per rule evaluation)
+    METRICS_RULE_TIMING: bool = True
+    # python -m k8s_analyzer.server: worker processes (0 = the container's CPU
+    # limit), requests a worker serves before it is replaced (0 = never),
+    # seconds a stopping worker gets to finish in-flight requests, and the
+    # SQLite file the workers share scan and verdict caches through (default:
+    # SCAN_CACHE_PATH, else a temporary file that lives as long as the server)
+    SERVER_WORKERS: int = 0
+    SERVER_MAX_REQUESTS: int = 10_000
+    SERVER_GRACEFUL_TIMEOUT_S: int = 30
+    SERVER_SHARED_CACHE_PATH: Optional[str] = None
+    # cli.py: Unix socket of the warm scanner daemon (cli.py --daemon), used
+    # whenever it is listening (and run by the same user); default
+    # $XDG_RUNTIME_DIR/kya-<uid>.sock, else kya-<uid>/daemon.sock in the temp
+    # directory, a subdirectory private to the user
+    DAEMON_SOCKET: Optional[str] = None
+    # client side: wait this long for the daemon before scanning in-process
+    DAEMON_CONNECT_TIMEOUT_S: float = 0.5
+
+
+def env_overrides() -> dict:
+    """The ``KYA_*`` environment variables (names matched case-insensitively)."""
+    return {k: v for k, v in os.environ.items() if k.upper().startswith(ENV_PREFIX)}
+
+
+# what pydantic makes of these values, without pydantic
+_INT = re.compile(r"[+-]?[0-9]+")
+_FLOAT = re.compile(r"[+-]?[0-9]+(\.[0-9]+)?")
+_BOOLS = {"1": True, "on": True, "t": True, "true": True, "y": True, "yes": True,
+          "0": False, "off": False, "f": False, "false": False, "n": False, "no": False}
+_UNPARSED = object()
+
+
+def _plain(kind: Any, raw: str) -> Any:
+    if kind is str or kind == Optional[str]:
+        return raw
+    if kind is int and _INT.fullmatch(raw):
+        return int(raw)
+    if kind is float and _FLOAT.fullmatch(raw):
+        return float(raw)
+    if kind is bool:
+        return _BOOLS.get(raw.lower(), _UNPARSED)
+    return _UNPARSED
+
+
+def _load() -> Settings:
+    loaded = Settings()
+    fields = Settings.__annotations__
+    values = {}
+    for key, raw in env_overrides().items():
+        name = key[len(ENV_PREFIX):].upper()
+        if name in fields:
+            values[name] = _plain(fields[name], raw)
+    if _UNPARSED not in values.values():
+        for name, value in values.items():
+            setattr(loaded, name, value)
+        return loaded
+    from pydantic_settings import BaseSettings, SettingsConfigDict
+
+    namespace = {name: getattr(Settings, name) for name in fields}
+    namespace.update(__annotations__=dict(fields), model_config=SettingsConfigDict(env_prefix=ENV_PREFIX))
+    # validation errors read as they always have
+    parsed = type("Settings", (BaseSettings,), namespace)()
+    for name in fields:
+        setattr(loaded, name, getattr(parsed, name))
+    return loaded
 
-    class Config:
-        env_prefix = "KYA_"
 
-settings = Settings()
+settings = _load()
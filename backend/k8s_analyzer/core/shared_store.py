@@ -0,0 +1,72 @@
+# backend/app/core/shared_store.py
+"""
+Key -> bytes table in a SQLite file that several processes use at once.
+
+The disk layer of the scan cache and of the webhook verdict cache: CLI runs
+sharing ``--cache FILE``, and the workers of ``k8s_analyzer.server``, which
+share one file so a result computed by one worker is a hit in all of them.
+WAL mode lets readers proceed while another process writes.
+
+The table is bounded: every ``_PRUNE_EVERY`` writes, rows beyond
+``max_entries`` are deleted oldest write first.  Connections are opened
+lazily, per process; a store must not be used across ``fork``.
+"""
+from typing import Optional
+import sqlite3
+import threading
+
+from k8s_analyzer.core.settings import settings
+
+_PRUNE_EVERY = 512
+
+
+class SharedStore:
+    def __init__(self, path: str, table: str, max_entries: int = settings.SHARED_CACHE_MAX_ENTRIES):
+        if not table.isidentifier():
+            raise ValueError(f"invalid table name {table!r}")
+        self.path = path
+        self.table = table
+        self.max_entries = max_entries
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(f"CREATE TABLE IF NOT EXISTS {self.table} (key TEXT PRIMARY KEY, payload BLOB NOT NULL)")
+            db.commit()
+            self._db = db
+        return self._db
+
+    def open(self):
+        """Connect now, so a bad path fails here rather than at first use."""
+        with self._lock:
+            self._connect()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._connect().execute(f"SELECT payload FROM {self.table} WHERE key = ?", (key,)).fetchone()
+        return bytes(row[0]) if row is not None else None
+
+    def put(self, key: str, payload: bytes):
+        with self._lock:
+            db = self._connect()
+            db.execute(f"INSERT OR REPLACE INTO {self.table} (key, payload) VALUES (?, ?)", (key, payload))
+            self._writes += 1
+            if self.max_entries > 0 and self._writes % _PRUNE_EVERY == 0:
+                # a replaced row gets a new rowid, so rowids follow write order
+                db.execute(f"DELETE FROM {self.table} WHERE rowid <= (SELECT MAX(rowid) FROM {self.table}) - ?",
+                           (self.max_entries,))
+            db.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connect().execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
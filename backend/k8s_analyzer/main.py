@@ -3,12 +3,23 @@ FastAPI application entrypoint.
 """
 
 import logging
+import os
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse
 import uvicorn
 
 from k8s_analyzer.core.settings import settings
 from k8s_analyzer.api.v1.endpoints import router as v1_router
 from k8s_analyzer.admission.router import router as admission_router
+from k8s_analyzer.admission.webhook_handler import verdict_cache, webhook_stats
+from k8s_analyzer.analyzer.parser import YAML_PARSER
+from k8s_analyzer.analyzer.cache import get_scan_cache
+from k8s_analyzer.analyzer.engine import ruleset_fingerprint
+from k8s_analyzer.analyzer.images import get_image_policy
+from k8s_analyzer.analyzer.policy import get_policy
+from k8s_analyzer.analyzer.openapi import get_schemas
+from k8s_analyzer.core.scan_pool import scan_dispatcher
+from k8s_analyzer.core import metrics
 
 from k8s_analyzer.core.logging_setup import configure_logging
 
@@ -29,18 +40,66 @@ app.include_router(v1_router, prefix="/api/v1")
 # Admission webhook route
 app.include_router(admission_router)   # exposes POST /validate
 
+# /health readiness (503 unless "ok"): "starting" until on_startup has loaded
+# everything a request needs, "draining" once this worker shuts down
+# (recycled or stopped), so only workers that can answer fast count as ready
+_state = "starting"
+
 @app.on_event("startup")
 async def on_startup():
-    logger.info("Starting K8s YAML Analyzer backend (version=%s)", settings.APP_VERSION)
+    global _state
+    # compile the policies and load the schemas up front so a broken file or
+    # setting, or an unknown Kubernetes version, fails startup, not a request
+    policy = get_policy()
+    get_image_policy()
+    schemas = get_schemas()
+    # load the rules, and open the shared cache files for the same reason
+    ruleset_fingerprint()
+    get_scan_cache().open()
+    verdict_cache.open()
+    _state = "ok"
+    logger.info("Starting K8s YAML Analyzer backend (version=%s, yaml_parser=%s, policy=%s, k8s_schemas=%s)",
+                settings.APP_VERSION, YAML_PARSER, policy.source or "built-in", schemas.version or "disabled")
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    global _state
+    _state = "draining"
+    scan_dispatcher.shutdown()
 
 @app.get("/", include_in_schema=False)
 def root():
     return {"status": "ok", "service": "k8s-yaml-analyzer", "version": settings.APP_VERSION}
 
+# cache/pool/webhook counters are read at scrape time
+metrics.REGISTRY.callback(
+    "kya_scan_cache_events_total", "Scan cache lookups and evictions",
+    lambda: {(k,): v for k, v in get_scan_cache().stats().items() if k not in ("entries", "bytes")},
+    labelnames=("event",), type="counter")
+metrics.REGISTRY.callback(
+    "kya_scan_cache_bytes", "Scan cache in-memory payload size", lambda: get_scan_cache().stats()["bytes"])
+metrics.REGISTRY.callback(
+    "kya_scan_pending", "Scans queued or running on the worker pools", lambda: scan_dispatcher.stats()["pending"])
+metrics.REGISTRY.callback(
+    "kya_webhook_events_total", "Admission webhook cache and budget events",
+    lambda: {(k,): v for k, v in webhook_stats().items()
+             if k in ("verdict_cache_hits", "verdict_cache_shared_hits", "verdict_cache_misses",
+                      "over_budget", "timeouts", "errors")},
+    labelnames=("event",), type="counter")
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
 @app.get("/health")
 def health():
-    return {"status": "ok"}
+    # counters are this worker's; "pid" tells the workers of one server apart
+    body = {"status": _state, "pid": os.getpid(), "yaml_parser": YAML_PARSER,
+            "scan_cache": get_scan_cache().stats(), "scan_pool": scan_dispatcher.stats(),
+            "webhook": webhook_stats()}
+    return JSONResponse(body, status_code=200 if _state == "ok" else 503)
 
 if __name__ == "__main__":
+    # development server; production runs python -m k8s_analyzer.server
     uvicorn.run("k8s_analyzer.main:app", host="0.0.0.0", port=8443, reload=True)
 
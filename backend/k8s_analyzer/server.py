@@ -0,0 +1,160 @@
+# backend/app/server.py
+"""
+Production server: pre-forked uvicorn workers on one listening socket.
+
+    python -m k8s_analyzer.server [--host H] [--port P] [--workers N]
+                                  [--ssl-keyfile F --ssl-certfile F]
+
+``main.py``'s ``__main__`` is the single-process development server.  This
+one runs ``settings.SERVER_WORKERS`` workers, or as many as the container's
+CPU limit allows (its cgroup quota, else the CPUs the process may run on),
+so one pod can use every core it is given for both ``/api/v1/scan`` and
+``/validate``.
+
+* uvicorn's supervisor replaces workers that exit.  Each serves about
+  ``SERVER_MAX_REQUESTS`` requests (jittered per worker so they do not all
+  recycle at once), then stops accepting, gets ``SERVER_GRACEFUL_TIMEOUT_S``
+  to finish in-flight ones and exits.  SIGHUP replaces every worker, one at
+  a time; SIGTERM stops the server.
+* Scan results and webhook verdicts are shared through one SQLite file
+  (``SERVER_SHARED_CACHE_PATH``, else ``SCAN_CACHE_PATH``, else a temporary
+  file removed on exit), so a result computed by one worker is a hit in all
+  of them; each worker keeps its own in-memory LRU in front of it.
+* The workers are the processes, so with more than one, ``/api/v1/scan``
+  does not start process pools of its own (``SCAN_PROCESS_WORKERS``
+  defaults to 0).
+
+An explicit ``KYA_*`` variable wins over each of these defaults.  Readiness
+is per worker: ``/health`` answers 503 until the worker has loaded the
+policy, schemas and rules.
+"""
+from typing import List, Optional
+import argparse
+import asyncio
+import math
+import os
+import shutil
+import socket
+import tempfile
+
+import uvicorn
+from uvicorn.supervisors import Multiprocess
+
+from k8s_analyzer.core.settings import ENV_PREFIX, settings
+
+_CGROUP_V2_CPU = "/sys/fs/cgroup/cpu.max"
+_CGROUP_V1_QUOTA = "/sys/fs/cgroup/cpu/cpu.cfs_quota_us"
+_CGROUP_V1_PERIOD = "/sys/fs/cgroup/cpu/cpu.cfs_period_us"
+
+# after a worker stops accepting, how long connections it accepted just
+# before get to send their request before it starts closing idle ones
+_ACCEPT_GRACE_S = 0.2
+
+
+def _read(path: str) -> str:
+    with open(path) as fh:
+        return fh.read().strip()
+
+
+def cpu_limit() -> int:
+    """CPUs this process may use: the cgroup CPU quota rounded up, else the CPUs it can run on."""
+    try:
+        quota, period = _read(_CGROUP_V2_CPU).split()[:2]
+        if quota != "max":
+            return max(1, math.ceil(int(quota) / int(period)))
+    except (OSError, ValueError):
+        try:
+            quota, period = int(_read(_CGROUP_V1_QUOTA)), int(_read(_CGROUP_V1_PERIOD))
+            if quota > 0 and period > 0:
+                return max(1, math.ceil(quota / period))
+        except (OSError, ValueError):
+            pass
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def _worker_default(name: str, value: str):
+    # for the workers, which load settings from the environment on start
+    if not any(k.upper() == ENV_PREFIX + name for k in os.environ):
+        os.environ[ENV_PREFIX + name] = value
+
+
+class WorkerConfig(uvicorn.Config):
+    """``uvicorn.Config`` whose ``limit_max_requests`` differs per worker process."""
+
+    @property
+    def limit_max_requests(self) -> Optional[int]:
+        limit = self._limit_max_requests
+        if not limit:
+            return limit
+        # up to 10% more, fixed per process: workers started together recycle apart
+        return limit + os.getpid() % (limit // 10 + 1)
+
+    @limit_max_requests.setter
+    def limit_max_requests(self, value: Optional[int]):
+        self._limit_max_requests = value
+
+
+class WorkerServer(uvicorn.Server):
+    async def shutdown(self, sockets: Optional[List[socket.socket]] = None):
+        # uvicorn closes connections without a request in progress right away,
+        # dropping clients whose request was still on the way, a race every
+        # recycle would lose now and then
+        for server in self.servers:
+            server.close()
+        for sock in sockets or []:
+            sock.close()
+        await asyncio.sleep(_ACCEPT_GRACE_S)
+        await super().shutdown(sockets)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m k8s_analyzer.server", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default=settings.HOST)
+    parser.add_argument("--port", type=int, default=settings.PORT)
+    parser.add_argument("--workers", type=int, default=settings.SERVER_WORKERS,
+                        help="worker processes (default: KYA_SERVER_WORKERS, 0 = the container's CPU limit)")
+    parser.add_argument("--ssl-keyfile")
+    parser.add_argument("--ssl-certfile")
+    args = parser.parse_args(argv)
+    if args.workers < 0:
+        parser.error("--workers must not be negative")
+    workers = args.workers or cpu_limit()
+
+    shared_dir = None
+    shared_path = settings.SERVER_SHARED_CACHE_PATH or settings.SCAN_CACHE_PATH
+    if shared_path is None:
+        shared_dir = tempfile.mkdtemp(prefix="kya-server-")
+        shared_path = os.path.join(shared_dir, "cache.sqlite")
+    _worker_default("SCAN_CACHE_PATH", shared_path)
+    _worker_default("WEBHOOK_VERDICT_CACHE_PATH", shared_path)
+    if workers > 1:
+        _worker_default("SCAN_PROCESS_WORKERS", "0")
+
+    config = WorkerConfig(
+        "k8s_analyzer.main:app",
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        log_level=settings.LOG_LEVEL.lower(),
+        limit_max_requests=settings.SERVER_MAX_REQUESTS or None,
+        timeout_graceful_shutdown=settings.SERVER_GRACEFUL_TIMEOUT_S,
+        ssl_keyfile=args.ssl_keyfile,
+        ssl_certfile=args.ssl_certfile,
+    )
+    server = WorkerServer(config)
+    sock = config.bind_socket()
+    try:
+        # the supervisor even for one worker: it is what recycles workers
+        Multiprocess(config, target=server.run, sockets=[sock]).run()
+    finally:
+        sock.close()
+        if shared_dir is not None:
+            shutil.rmtree(shared_dir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
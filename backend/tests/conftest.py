@@ -0,0 +1,6 @@
+# backend/tests/conftest.py
+"""Run the tests against this checkout's ``k8s_analyzer`` and ``benchmarks``."""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
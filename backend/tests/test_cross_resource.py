@@ -0,0 +1,189 @@
+# backend/tests/test_cross_resource.py
+"""Cross-resource rules (XREF_001/002/003) over multi-document inputs, and the ResourceIndex behind them."""
+import pytest
+
+from k8s_analyzer.analyzer.engine import run_rules
+from k8s_analyzer.analyzer.parser import parse_yaml_documents
+from k8s_analyzer.analyzer.policy import Policy
+from k8s_analyzer.analyzer.resource_index import Reference, ResourceIndex
+
+
+def _deployment(name, labels="app: web", selector=None, namespace="default", extra=""):
+    selector = selector or f"matchLabels: {{{labels}}}"
+    return f"""
+apiVersion: apps/v1
+kind: Deployment
+metadata: {{name: {name}, namespace: {namespace}}}
+spec:
+  selector: {{{selector}}}
+  template:
+    metadata: {{labels: {{{labels}}}}}
+    spec:
+      containers: [{{name: c, image: "nginx:1.25"}}]{extra}
+"""
+
+
+def _service(name, selector="app: web", namespace="default", type_="ClusterIP"):
+    return f"""
+apiVersion: v1
+kind: Service
+metadata: {{name: {name}, namespace: {namespace}}}
+spec: {{type: {type_}, selector: {{{selector}}}, ports: [{{port: 80}}]}}
+"""
+
+
+def _configmap(name, namespace="default"):
+    return f"""
+apiVersion: v1
+kind: ConfigMap
+metadata: {{name: {name}, namespace: {namespace}}}
+data: {{a: b}}
+"""
+
+
+REPLICASET = """
+apiVersion: apps/v1
+kind: ReplicaSet
+metadata:
+  name: web-7d9f
+  ownerReferences: [{apiVersion: apps/v1, kind: Deployment, name: web, uid: u}]
+spec:
+  selector: {matchLabels: {app: web}}
+  template:
+    metadata: {labels: {app: web}}
+    spec:
+      containers: [{name: c, image: "nginx:1.25"}]
+"""
+
+
+def _xref(*docs):
+    """{(rule id, doc index, severity): message} for the XREF findings on the joined documents."""
+    parsed = parse_yaml_documents("---".join(docs))
+    return {(f.rule_id, f.doc_index, f.severity): f.message
+            for f in run_rules(parsed, policy=Policy()) if f.rule_id.startswith("XREF_")}
+
+
+# XREF_003
+
+def test_deployment_and_its_own_replicaset_do_not_overlap():
+    assert _xref(_deployment("web"), REPLICASET) == {}
+
+
+def test_unowned_replicaset_overlaps():
+    orphan = REPLICASET.replace("  ownerReferences: [{apiVersion: apps/v1, kind: Deployment, name: web, uid: u}]\n", "")
+    assert _xref(_deployment("web"), orphan) == {
+        ("XREF_003", 0, "HIGH"): "Selector also matches the pods of ReplicaSet 'web-7d9f'",
+        ("XREF_003", 1, "HIGH"): "Selector also matches the pods of Deployment 'web'",
+    }
+
+
+def test_deployments_sharing_a_selector_overlap():
+    assert _xref(_deployment("web"), _deployment("web-canary")) == {
+        ("XREF_003", 0, "HIGH"): "Selector also matches the pods of Deployment 'web-canary'",
+        ("XREF_003", 1, "HIGH"): "Selector also matches the pods of Deployment 'web'",
+    }
+
+
+def test_same_selector_in_other_namespaces_does_not_overlap():
+    assert _xref(_deployment("web"), _deployment("web", namespace="staging")) == {}
+
+
+def test_overlap_message_names_a_few_workloads():
+    found = _xref(*[_deployment(f"web-{i}") for i in range(6)])
+    assert len(found) == 6
+    assert found[("XREF_003", 0, "HIGH")] == ("Selector also matches the pods of Deployment 'web-1', "
+                                              "Deployment 'web-2', Deployment 'web-3' and 2 more workloads")
+
+
+@pytest.mark.parametrize("expressions, overlaps", [
+    ("[{key: app, operator: In, values: [web, api]}]", True),
+    ("[{key: app, operator: NotIn, values: [web]}]", False),
+    ("[{key: app, operator: Exists}]", True),
+    ("[{key: tier, operator: DoesNotExist}]", True),
+    ("[{key: tier, operator: Exists}]", False),
+    ("[{key: app, operator: Like, values: [web]}]", False),
+])
+def test_match_expressions(expressions, overlaps):
+    wide = _deployment("wide", labels="app: wide", selector=f"matchExpressions: {expressions}")
+    found = _xref(_deployment("web"), wide)
+    assert (("XREF_003", 1, "HIGH") in found) is overlaps
+
+
+# XREF_001
+
+def test_services_only_file_is_not_reported():
+    assert _xref(_service("web"), _service("api", selector="app: api")) == {}
+
+
+def test_service_selecting_no_pods():
+    assert _xref(_deployment("web"), _service("api", selector="app: api, tier: backend")) == {
+        ("XREF_001", 1, "MEDIUM"): "Selector app=api, tier=backend matches no Pod or workload template in namespace "
+                                   "'default'",
+    }
+
+
+@pytest.mark.parametrize("service", [
+    _service("web"),
+    _service("web", selector="app: api", type_="ExternalName"),
+    # no workloads in its namespace: proves nothing, as for a services-only file
+    _service("web", selector="app: api", namespace="staging"),
+])
+def test_service_not_reported(service):
+    assert _xref(_deployment("web"), service) == {}
+
+
+# XREF_002
+
+MOUNTS_WEB_CONFIG = """
+      volumes:
+        - {name: config, configMap: {name: web-config}}
+        - {name: data, persistentVolumeClaim: {claimName: web-data}}
+        - {name: tls, secret: {secretName: web-tls, optional: true}}"""
+
+
+def test_references_are_not_reported_without_the_kind_in_the_input():
+    assert _xref(_deployment("web", extra=MOUNTS_WEB_CONFIG), _service("web")) == {}
+
+
+def test_reference_missing_from_an_input_that_defines_the_kind():
+    found = _xref(_deployment("web", extra=MOUNTS_WEB_CONFIG), _configmap("other"))
+    assert found == {
+        ("XREF_002", 0, "LOW"): "ConfigMap 'web-config' is not defined in namespace 'default' of this input",
+    }
+
+
+def test_reference_defined_in_the_input():
+    assert _xref(_deployment("web", extra=MOUNTS_WEB_CONFIG), _configmap("web-config")) == {}
+
+
+def test_kind_defined_only_in_another_namespace():
+    assert _xref(_deployment("web", extra=MOUNTS_WEB_CONFIG), _configmap("web-config", namespace="staging")) == {}
+
+
+# ResourceIndex
+
+def test_resource_index():
+    docs = parse_yaml_documents("---".join([
+        _deployment("web", extra=MOUNTS_WEB_CONFIG), REPLICASET, _service("web"), _configmap("cfg", "staging"),
+        "\njust a string\n",
+    ]))
+    index = ResourceIndex(docs)
+    assert len(index) == 4
+    assert index.get("Deployment", "default", "web") == 0
+    assert index.get("configmap", "staging", "cfg") == 3
+    assert index.get("configmap", "default", "cfg") is None
+    assert index.index_of(docs[2]) == 2 and index.index_of(dict(docs[2])) is None
+    assert index.identity(1) == ("ReplicaSet", "web-7d9f")
+    assert index.related(0) == {1} and index.related(1) == {0}
+    assert index.defines("ConfigMap", "staging") and not index.defines("configmap", "default")
+    assert index.has_pods("default") and not index.has_pods("staging")
+    assert index.select("default", {"app": "web"}) == {0, 1}
+    assert index.select("default", {"app": "web", "tier": "x"}) == set()
+    assert index.select("default", None, [{"key": "app", "operator": "Exists"}]) == {0, 1}
+    assert index.selects_any("default", {"app": "web"}) and not index.selects_any("default", {"app": "api"})
+    assert index.controllers("default", {"app": "web"}) == ((0, 1), frozenset({0, 1}))
+    assert index.references[0] == [
+        Reference("configmap", "web-config", "spec.volumes[0].configMap.name", False),
+        Reference("persistentvolumeclaim", "web-data", "spec.volumes[1].persistentVolumeClaim.claimName", False),
+        Reference("secret", "web-tls", "spec.volumes[2].secret.secretName", True),
+    ]
@@ -0,0 +1,95 @@
+# backend/tests/test_images.py
+"""Image reference parsing, and the webhook's image policy as the KYA_IMAGE_* settings configure it."""
+import pytest
+
+from k8s_analyzer.admission.webhook_handler import evaluate_object
+from k8s_analyzer.analyzer import images
+from k8s_analyzer.analyzer.images import ImageRef, configure_image_policy, parse_image
+from k8s_analyzer.analyzer.policy import PolicyError
+from k8s_analyzer.core.settings import settings
+
+
+@pytest.mark.parametrize("image, ref", [
+    ("nginx", ImageRef("docker.io", "nginx", None, None)),
+    ("nginx:1.25", ImageRef("docker.io", "nginx", "1.25", None)),
+    ("a:", ImageRef("docker.io", "a", None, None)),
+    ("a@sha256:abc", ImageRef("docker.io", "a", None, "sha256:abc")),
+    ("a:1@sha256:abc", ImageRef("docker.io", "a", "1", "sha256:abc")),
+    ("a@", ImageRef("docker.io", "a", None, None)),
+    ("library/nginx:latest", ImageRef("docker.io", "library/nginx", "latest", None)),
+    ("registry:5000/app", ImageRef("registry:5000", "app", None, None)),
+    ("registry:5000/team/app:2", ImageRef("registry:5000", "team/app", "2", None)),
+    ("localhost:5000/a:1", ImageRef("localhost:5000", "a", "1", None)),
+    ("localhost/a", ImageRef("localhost", "a", None, None)),
+    ("GHCR.io/org/app:v1", ImageRef("ghcr.io", "org/app", "v1", None)),
+    ("index.docker.io/library/nginx:1", ImageRef("docker.io", "library/nginx", "1", None)),
+])
+def test_parse_image(image, ref):
+    assert parse_image(image) == ref
+
+
+@pytest.mark.parametrize("image, floating", [
+    ("nginx", True),
+    ("nginx:latest", True),
+    ("a:", True),
+    ("registry:5000/app", True),
+    ("nginx:1.25", False),
+    ("a@sha256:abc", False),
+    ("nginx:latest@sha256:abc", False),
+])
+def test_floating(image, floating):
+    assert parse_image(image).floating is floating
+
+
+@pytest.fixture
+def image_settings(monkeypatch):
+    """Set KYA_IMAGE_* values (by setting name) and recompile the active image policy."""
+    def configure(**values):
+        for name, value in values.items():
+            monkeypatch.setattr(settings, name, value)
+        return configure_image_policy()
+
+    yield configure
+    monkeypatch.undo()
+    configure_image_policy()
+
+
+@pytest.mark.parametrize("values, image, violation", [
+    ({"IMAGE_BYPASS_PREFIXES": "corp.io/tools/", "IMAGE_REQUIRE_DIGEST": True}, "corp.io/tools/debug", None),
+    ({"IMAGE_DENIED_REGISTRIES": "docker.io, quay.io"}, "nginx:1.25",
+     "Image nginx:1.25 is from a denied registry (docker.io)."),
+    ({"IMAGE_ALLOWED_REGISTRIES": "corp.io,registry:5000"}, "ghcr.io/org/app:1",
+     "Image ghcr.io/org/app:1 is not from an allowed registry (ghcr.io)."),
+    ({"IMAGE_REQUIRE_DIGEST": True}, "nginx:1.25", "Image nginx:1.25 is not pinned by digest."),
+    ({}, "nginx", "Disallowed image tag in nginx (no tag or :latest)."),
+    ({"IMAGE_ALLOWED_REGISTRIES": "registry:5000", "IMAGE_REQUIRE_DIGEST": True},
+     "registry:5000/app@sha256:abc", None),
+], ids=["bypass", "denied registry", "not allowed registry", "no digest", "floating tag", "allowed"])
+def test_image_policy(image_settings, values, image, violation):
+    assert image_settings(**values).violation(image) == violation
+
+
+def test_denied_registry_wins_over_allowed(image_settings):
+    policy = image_settings(IMAGE_ALLOWED_REGISTRIES="docker.io", IMAGE_DENIED_REGISTRIES="index.docker.io")
+    assert policy.violation("nginx:1.25") == "Image nginx:1.25 is from a denied registry (docker.io)."
+
+
+def test_registry_with_a_path_is_rejected(image_settings):
+    with pytest.raises(PolicyError, match="KYA_IMAGE_ALLOWED_REGISTRIES: 'corp.io/team'"):
+        image_settings(IMAGE_ALLOWED_REGISTRIES="corp.io/team")
+
+
+def test_fingerprint_follows_settings(image_settings):
+    default = image_settings().fingerprint
+    assert image_settings(IMAGE_REQUIRE_DIGEST=True).fingerprint != default
+    assert image_settings(IMAGE_REQUIRE_DIGEST=False).fingerprint == default
+
+
+def test_webhook_applies_the_active_policy(image_settings):
+    pod = {"apiVersion": "v1", "kind": "Pod", "metadata": {"name": "p", "namespace": "team", "labels": {"a": "b"}},
+           "spec": {"containers": [{"name": "c", "image": "quay.io/org/app:1",
+                                    "securityContext": {"runAsNonRoot": True}}]}}
+    assert evaluate_object(pod)[0] is True
+    image_settings(IMAGE_DENIED_REGISTRIES="quay.io")
+    assert images.get_image_policy().denied == frozenset(["quay.io"])
+    assert evaluate_object(pod) == (False, "Image quay.io/org/app:1 is from a denied registry (quay.io).")
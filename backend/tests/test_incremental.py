@@ -0,0 +1,170 @@
+# backend/tests/test_incremental.py
+"""Incremental scan state (cli.py --incremental) and the git baseline of --changed-since."""
+import json
+import os
+import subprocess
+
+import pytest
+
+from k8s_analyzer.analyzer.findings import CompactFinding, intern_meta
+from k8s_analyzer.analyzer.incremental import ScanState, git_baseline, git_blob_id
+
+FINDINGS = [CompactFinding(intern_meta("SEC_001", "Privileged container detected", "HIGH"),
+                           "Container 'c' has privileged=true", "spec.containers[0].securityContext.privileged", 0)]
+
+
+def _run(state, paths, baseline=None):
+    """One incremental run over ``paths``: {path: reused?}, with rescanned files recorded."""
+    reused = {}
+    for path in paths:
+        found = state.reuse(str(path), baseline)
+        reused[path] = found is not None
+        if found is None:
+            state.record(str(path), FINDINGS)
+        else:
+            assert found == FINDINGS
+    state.save()
+    return reused
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    files = tmp_path / "manifests"
+    files.mkdir()
+    for name in ("a.yaml", "b.yaml", "c.yaml"):
+        (files / name).write_text(f"kind: ConfigMap  # {name}\n")
+    return tmp_path, sorted(files.iterdir())
+
+
+def test_unchanged_files_are_reused(workspace):
+    tmp_path, paths = workspace
+    state_path = str(tmp_path / "state.json")
+    assert _run(ScanState.load(state_path), paths) == {p: False for p in paths}
+    state = ScanState.load(state_path)
+    assert _run(state, paths) == {p: True for p in paths}
+    assert (state.reused, state.rescanned) == (3, 0)
+
+
+def test_touched_files_with_the_same_content_are_reused(workspace):
+    tmp_path, paths = workspace
+    state_path = str(tmp_path / "state.json")
+    _run(ScanState.load(state_path), paths)
+    st = os.stat(paths[0])
+    os.utime(paths[0], ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert _run(ScanState.load(state_path), paths) == {p: True for p in paths}
+    # the new mtime is recorded, so the next run trusts the stat again
+    saved = json.load(open(state_path))["files"]
+    assert saved[os.path.realpath(paths[0])]["mtime_ns"] == st.st_mtime_ns + 10**9
+
+
+def test_edited_files_are_rescanned(workspace):
+    tmp_path, paths = workspace
+    state_path = str(tmp_path / "state.json")
+    _run(ScanState.load(state_path), paths)
+    paths[1].write_text("kind: Secret\n")
+    state = ScanState.load(state_path)
+    assert _run(state, paths) == {paths[0]: True, paths[1]: False, paths[2]: True}
+    assert (state.reused, state.rescanned) == (2, 1)
+    saved = json.load(open(state_path))["files"][os.path.realpath(paths[1])]
+    assert saved["blob"] == git_blob_id(str(paths[1]))
+
+
+def test_changed_fingerprint_rescans_everything(workspace, monkeypatch):
+    tmp_path, paths = workspace
+    state_path = str(tmp_path / "state.json")
+    _run(ScanState.load(state_path), paths)
+    assert _run(ScanState.load(state_path, "positions"), paths) == {p: False for p in paths}
+    from k8s_analyzer.core.settings import settings
+    monkeypatch.setattr(settings, "APP_VERSION", "99.0.0")
+    assert _run(ScanState.load(state_path, "positions"), paths) == {p: False for p in paths}
+
+
+@pytest.mark.parametrize("content", ["{not json", '{"version": 0, "files": {}}', ""])
+def test_unusable_state_is_ignored(workspace, content):
+    tmp_path, paths = workspace
+    state_path = tmp_path / "state.json"
+    state_path.write_text(content)
+    assert _run(ScanState.load(str(state_path)), paths) == {p: False for p in paths}
+    assert json.load(open(state_path))["version"] == 1
+
+
+def test_save(workspace):
+    tmp_path, paths = workspace
+    state_path = str(tmp_path / "state.json")
+    _run(ScanState.load(state_path), paths)
+    # a run that changed nothing leaves the file alone
+    before = os.stat(state_path).st_mtime_ns
+    os.utime(state_path, ns=(before - 10**9, before - 10**9))
+    _run(ScanState.load(state_path), paths)
+    assert os.stat(state_path).st_mtime_ns == before - 10**9
+    # on the next save, deleted files drop out; files outside the run are kept
+    paths[0].unlink()
+    paths[2].write_text("kind: Secret\n")
+    _run(ScanState.load(state_path), paths[2:])
+    assert sorted(json.load(open(state_path))["files"]) == [os.path.realpath(p) for p in paths[1:]]
+    assert not [name for name in os.listdir(tmp_path) if ".tmp." in name]
+
+
+def test_forget(workspace):
+    tmp_path, paths = workspace
+    state_path = str(tmp_path / "state.json")
+    _run(ScanState.load(state_path), paths)
+    state = ScanState.load(state_path)
+    state.forget(str(paths[0]))
+    state.save()
+    assert _run(ScanState.load(state_path), paths)[paths[0]] is False
+
+
+# tracked names git would C-quote without -z
+ODD_NAMES = ["with space.yaml", "ünïcode.yaml", "tab\there.yaml", "new\nline.yaml"]
+
+
+def _git(repo, *args):
+    subprocess.run(["git", "-c", "user.name=t", "-c", "user.email=t@t", "-c", "commit.gpgsign=false", *args],
+                   cwd=repo, check=True, capture_output=True)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    repo = tmp_path / "repo"
+    (repo / "sub").mkdir(parents=True)
+    _git(repo, "init", "-q")
+    for name in ["plain.yaml", "sub/nested.yaml", *ODD_NAMES]:
+        (repo / name).write_text(f"kind: ConfigMap  # {name!r}\n")
+    _git(repo, "add", "-A")
+    _git(repo, "commit", "-q", "-m", "base")
+    return repo
+
+
+def test_git_baseline(repo):
+    (repo / "plain.yaml").write_text("kind: Secret\n")
+    (repo / ODD_NAMES[3]).write_text("kind: Secret\n")
+    (repo / "untracked\tfile.yaml").write_text("kind: Secret\n")
+    real = os.path.realpath(repo)
+    # from a subdirectory too: paths are the top level's
+    baseline = git_baseline("HEAD", cwd=str(repo / "sub"))
+    assert baseline.changed == {os.path.join(real, n) for n in ("plain.yaml", ODD_NAMES[3], "untracked\tfile.yaml")}
+    tracked = ["plain.yaml", "sub/nested.yaml", *ODD_NAMES]
+    assert sorted(baseline.blobs) == sorted(os.path.join(real, n) for n in tracked)
+    for name in ["sub/nested.yaml", *ODD_NAMES[:3]]:
+        assert baseline.blobs[os.path.join(real, name)] == git_blob_id(str(repo / name))
+
+
+def test_baseline_skips_the_stat_of_files_unchanged_in_git(repo, tmp_path):
+    paths = [repo / n for n in ["plain.yaml", "sub/nested.yaml", *ODD_NAMES]]
+    state_path = str(tmp_path / "state.json")
+    _run(ScanState.load(state_path), paths)
+    # a fresh checkout: every mtime is new; one file really changed
+    for p in paths:
+        os.utime(p, ns=(os.stat(p).st_atime_ns, os.stat(p).st_mtime_ns + 10**9))
+    (repo / ODD_NAMES[1]).write_text("kind: Secret\n")
+    state = ScanState.load(state_path)
+    reused = _run(state, paths, git_baseline("HEAD", cwd=str(repo)))
+    assert reused == {p: p.name != ODD_NAMES[1] for p in paths}
+
+
+@pytest.mark.parametrize("base", ["HEAD", "no-such-ref"])
+def test_git_baseline_failures(tmp_path, repo, base):
+    cwd = tmp_path if base == "HEAD" else repo
+    with pytest.raises(RuntimeError, match="git .* failed"):
+        git_baseline(base, cwd=str(cwd))
@@ -0,0 +1,105 @@
+# backend/tests/test_malformed_input.py
+"""Documents of the wrong shape are reported on, never fail a rule."""
+import copy
+
+import pytest
+
+from k8s_analyzer.analyzer.analyzer_core import analyze_text
+from k8s_analyzer.analyzer.engine import run_rules
+from k8s_analyzer.analyzer.policy import Policy
+
+DEPLOYMENT = {
+    "apiVersion": "apps/v1",
+    "kind": "Deployment",
+    "metadata": {"name": "web", "labels": {"app": "web"}},
+    "spec": {
+        "selector": {"matchLabels": {"app": "web"}},
+        "template": {
+            "metadata": {"labels": {"app": "web"}},
+            "spec": {
+                "containers": [{"name": "c", "image": "nginx:1.25",
+                                "resources": {"requests": {"cpu": "1"}, "limits": {"cpu": "1"}},
+                                "securityContext": {"runAsNonRoot": True}}],
+                "volumes": [{"name": "v", "configMap": {"name": "web-config"}}],
+            },
+        },
+    },
+}
+
+
+def _with(path, value):
+    doc = copy.deepcopy(DEPLOYMENT)
+    node = doc
+    for key in path[:-1]:
+        node = node[key]
+    node[path[-1]] = value
+    return doc
+
+
+def _scan(docs, doc_index=0):
+    """Rule ids reported on ``docs[doc_index]``, with no rule failing."""
+    failed = []
+    findings = run_rules(docs, policy=Policy(), on_error=lambda r, e: failed.append(r.rule_id))
+    assert failed == []
+    return {f.rule_id for f in findings if f.doc_index == doc_index}
+
+
+@pytest.mark.parametrize("text", ["foo", "- a\n- b\n", "42\n", "true\n"])
+def test_non_mapping_documents_are_missing_required_fields(text):
+    findings, failed, _ = analyze_text(text)
+    assert failed == []
+    assert [f.rule_id for f in findings] == ["SCHEMA_001"]
+
+
+def test_non_mapping_metadata_is_a_schema_violation():
+    findings, failed, _ = analyze_text("apiVersion: v1\nkind: ConfigMap\nmetadata: foo\n")
+    assert failed == []
+    assert [f.rule_id for f in findings] == ["SCHEMA_004"]
+
+
+CONTAINER = ("spec", "template", "spec", "containers", 0)
+
+
+@pytest.mark.parametrize("path, value, reported", [
+    (CONTAINER + ("resources",), [1], {"BP_001"}),
+    (CONTAINER + ("resources",), "none", {"BP_001"}),
+    (CONTAINER + ("securityContext",), "bad", {"SEC_002"}),
+    (CONTAINER + ("securityContext",), ["privileged"], {"SEC_002"}),
+    (CONTAINER + ("image",), ["nginx"], set()),
+    (CONTAINER + ("image",), 1, set()),
+    (CONTAINER[:-1], "c", set()),
+    (CONTAINER[:-1], ["c", 1], set()),
+    (("spec", "template", "spec", "volumes"), {"name": "v"}, set()),
+    (("spec", "template", "spec"), [], set()),
+    (("spec",), "web", set()),
+    (("metadata", "labels"), ["app"], set()),
+])
+def test_malformed_fields_are_skipped_or_reported(path, value, reported):
+    # SCHEMA_004 reports each malformed field itself
+    assert _scan([_with(path, value)]) - {"SCHEMA_004"} == reported
+
+
+@pytest.mark.parametrize("selector", [
+    {"matchLabels": ["app"]},
+    {"matchLabels": "app=web"},
+    {"matchExpressions": "app"},
+    {"matchExpressions": [{"key": ["app"], "operator": "Exists"}]},
+    {"matchExpressions": [{"key": "app", "operator": "In", "values": 1}]},
+    ["app"],
+])
+def test_malformed_selectors_overlap_nothing(selector):
+    docs = [_with(("spec", "selector"), selector), _with(("metadata", "name"), "api")]
+    assert "XREF_003" not in _scan(docs)
+
+
+@pytest.mark.parametrize("spec", ["x", [1], {"selector": ["app"]}, {"selector": "app"}])
+def test_malformed_service_selectors_match_nothing(spec):
+    service = {"apiVersion": "v1", "kind": "Service", "metadata": {"name": "s"}, "spec": spec}
+    assert "XREF_001" not in _scan([DEPLOYMENT, service], doc_index=1)
+
+
+@pytest.mark.parametrize("data", [{1: "x", "db_password": "x"}, "x", ["password"]])
+def test_malformed_configmap_data(data):
+    configmap = {"apiVersion": "v1", "kind": "ConfigMap", "metadata": {"name": "c", "labels": {"a": "b"}},
+                 "data": data}
+    assert ("SEC_005" in _scan([configmap])) is isinstance(data, dict)
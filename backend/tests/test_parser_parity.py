@@ -0,0 +1,87 @@
+# backend/tests/test_parser_parity.py
+"""
+The libyaml loader (CSafeLoader) and the pure-Python SafeLoader yield the
+same documents, and so the same findings, for the repo's fixtures, generated
+manifests, and YAML features the two implement separately.
+"""
+import glob
+import os
+
+import pytest
+import yaml
+
+from benchmarks.generator import generate_yaml
+from k8s_analyzer.analyzer.engine import run_rules
+from k8s_analyzer.analyzer.parser import parse_yaml_documents
+from k8s_analyzer.analyzer.policy import Policy
+
+CSafeLoader = getattr(yaml, "CSafeLoader", None)
+pytestmark = pytest.mark.skipif(CSafeLoader is None, reason="PyYAML built without libyaml")
+
+FIXTURES = os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, "tests")
+
+EDGE_CASES = {
+    "anchors and merge keys": """
+apiVersion: v1
+kind: Pod
+metadata: {name: merged, labels: &labels {app: a}}
+spec:
+  containers:
+    - &base
+      name: app
+      image: nginx
+      resources: {limits: {cpu: "1"}}
+    - <<: *base
+      name: sidecar
+      env: [{name: LABELS, value: "x"}]
+  nodeSelector: *labels
+""",
+    "scalars": """
+apiVersion: v1
+kind: ConfigMap
+metadata: {name: scalars, labels: {app: "ünïcødé ✓ 😀"}}
+data:
+  octal: 0755
+  float: 1e3
+  bool: yes
+  date: 2024-01-01
+  null_value: ~
+  folded: >
+    one
+    two
+  literal: |
+    line
+""",
+    "empty and comment-only documents": "---\n# nothing\n---\n\n---\napiVersion: v1\nkind: Namespace\nmetadata: {name: ns}\n",
+    "flow style": "{apiVersion: v1, kind: Pod, metadata: {name: flow}, spec: {containers: [{name: c, image: 'x:latest'}]}}",
+}
+
+
+def _fixture_texts():
+    paths = sorted(glob.glob(os.path.join(FIXTURES, "**", "*.yaml"), recursive=True))
+    for path in paths:
+        with open(path, encoding="utf-8") as fh:
+            yield os.path.relpath(path, FIXTURES), fh.read()
+
+
+def _cases():
+    yield from _fixture_texts()
+    yield from EDGE_CASES.items()
+    for seed in (0, 1, 2):
+        yield f"generated seed={seed}", generate_yaml(count=150, seed=seed, containers=3, violation_rate=0.3)
+
+
+def _findings(docs):
+    return [(f.rule_id, f.severity, f.message, f.path, f.doc_index) for f in run_rules(docs, policy=Policy())]
+
+
+@pytest.mark.parametrize("text", [text for _, text in _cases()], ids=[name for name, _ in _cases()])
+def test_loaders_agree(text):
+    fast = parse_yaml_documents(text, loader=CSafeLoader)
+    pure = parse_yaml_documents(text, loader=yaml.SafeLoader)
+    assert fast == pure
+    assert _findings(fast) == _findings(pure)
+
+
+def test_fixtures_found():
+    assert len(list(_fixture_texts())) >= 3
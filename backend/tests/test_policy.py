@@ -0,0 +1,137 @@
+# backend/tests/test_policy.py
+"""Policy compilation, and what a compiled policy leaves the engine to evaluate."""
+import copy
+
+import pytest
+
+from k8s_analyzer.analyzer.engine import run_rules
+from k8s_analyzer.analyzer.policy import IGNORE_ANNOTATION, Policy, PolicyError, load_policy
+
+POD = {
+    "apiVersion": "v1",
+    "kind": "Pod",
+    "metadata": {"name": "p", "namespace": "team", "labels": {"tier": "web"}},
+    "spec": {"containers": [{"name": "c", "image": "nginx:1.25", "securityContext": {"privileged": True},
+                             "resources": {"requests": {"cpu": "1"}, "limits": {"cpu": "1"}}}]},
+}
+
+
+def _pod(**metadata):
+    doc = copy.deepcopy(POD)
+    doc["metadata"].update(metadata)
+    return doc
+
+
+def _results(doc, policy):
+    # SCHEMA_004 also flags the malformed metadata some of these documents carry
+    return {(f.rule_id, f.severity) for f in run_rules([doc], policy=policy) if f.rule_id != "SCHEMA_004"}
+
+
+def test_no_policy_reports_every_rule():
+    assert _results(POD, Policy()) == {("SEC_001", "HIGH"), ("SEC_002", "MEDIUM")}
+
+
+@pytest.mark.parametrize("data, error", [
+    ("rules", "policy must be a mapping"),
+    ({"rule": []}, "unknown policy keys: rule"),
+    ({"rules": {"SEC_001": "disable"}}, "rules must be a list"),
+    ({"rules": ["SEC_001"]}, r"rules\[0\] must be a mapping"),
+    ({"rules": [{"rules": "SEC_001", "action": "drop"}]}, r"rules\[0\].action must be one of"),
+    ({"rules": [{"rules": "SEC_001", "action": "severity", "severity": "URGENT"}]}, r"rules\[0\].severity"),
+    ({"rules": [{"rules": {"a": 1}, "action": "disable"}]}, r"rules\[0\].rules must be a string or a list"),
+    ({"rules": [{"rules": "*", "action": "disable", "selector": ["tier"]}]}, r"rules\[0\].selector must be"),
+    ({"rules": [{"rules": "*", "action": "disable",
+                 "selector": {"matchExpressions": [{"key": "tier", "operator": "Like"}]}}]}, "operator must be"),
+    ({"bypass": ["kube-system"]}, "bypass must be a mapping"),
+    ({"bypass": {"labels": ["skip-webhook"]}}, "bypass.labels must be a mapping"),
+])
+def test_malformed_policies_are_rejected(data, error):
+    with pytest.raises(PolicyError, match=error):
+        Policy(data)
+
+
+def test_load_policy_names_the_file(tmp_path):
+    path = tmp_path / "policy.yaml"
+    path.write_text("rules:\n  - rules: [SEC_001]\n    action: mute\n")
+    with pytest.raises(PolicyError, match=f"^{path}: rules\\[0\\].action"):
+        load_policy(str(path))
+    with pytest.raises(PolicyError, match="Failed to load policy"):
+        load_policy(str(tmp_path / "missing.yaml"))
+    assert load_policy(None).entries == ()
+
+
+def test_later_entries_win(tmp_path):
+    path = tmp_path / "policy.yaml"
+    path.write_text(
+        "rules:\n"
+        "  - {rules: ['SEC_*'], action: disable}\n"
+        "  - {rules: [SEC_002], action: enable}\n"
+        "  - {rules: [SEC_002], action: severity, severity: low}\n"
+    )
+    assert _results(POD, load_policy(str(path))) == {("SEC_002", "LOW")}
+
+
+@pytest.mark.parametrize("scope, applies", [
+    ({"kinds": ["pod"]}, True),
+    ({"kinds": ["Deployment"]}, False),
+    ({"namespaces": ["team"]}, True),
+    ({"namespaces": ["default"]}, False),
+    ({"selector": {"tier": "web"}}, True),
+    ({"selector": {"tier": "db"}}, False),
+    ({"selector": {"matchExpressions": [{"key": "tier", "operator": "In", "values": ["web", "api"]}]}}, True),
+    ({"selector": {"matchExpressions": [{"key": "tier", "operator": "NotIn", "values": ["web"]}]}}, False),
+    ({"selector": {"matchExpressions": [{"key": "tier", "operator": "Exists"}]}}, True),
+    ({"selector": {"matchExpressions": [{"key": "tier", "operator": "DoesNotExist"}]}}, False),
+])
+def test_entries_apply_within_their_scope(scope, applies):
+    policy = Policy({"rules": [dict(scope, rules="SEC_001", action="disable")]})
+    assert (("SEC_001", "HIGH") not in _results(POD, policy)) is applies
+
+
+def test_fingerprint_covers_rules_only():
+    rules = [{"rules": "SEC_001", "action": "disable"}]
+    assert Policy({"rules": rules}).fingerprint == Policy({"rules": rules, "bypass": {"names": []}}).fingerprint
+    assert Policy({"rules": rules}).fingerprint != Policy().fingerprint
+
+
+@pytest.mark.parametrize("ignore, reported", [
+    ("SEC_001", {"SEC_002"}),
+    (" SEC_001 , SEC_002 ", set()),
+    ("*", set()),
+    ("all", set()),
+    ("", {"SEC_001", "SEC_002"}),
+    ("BP_001", {"SEC_001", "SEC_002"}),
+])
+def test_ignore_annotation(ignore, reported):
+    doc = _pod(annotations={IGNORE_ANNOTATION: ignore})
+    assert {rule_id for rule_id, _ in _results(doc, Policy())} == reported
+
+
+@pytest.mark.parametrize("ignore", [["SEC_001"], {"SEC_001": True}, 1, None])
+def test_non_string_ignore_annotation_suppresses_nothing(ignore):
+    doc = _pod(annotations={IGNORE_ANNOTATION: ignore})
+    assert {rule_id for rule_id, _ in _results(doc, Policy())} == {"SEC_001", "SEC_002"}
+
+
+@pytest.mark.parametrize("metadata, reported", [
+    ({"annotations": [IGNORE_ANNOTATION]}, set()),
+    # no usable namespace reads as "default"
+    ({"namespace": ["team"]}, {"SEC_001"}),
+    ({"namespace": {"name": "team"}}, {"SEC_001"}),
+    ({"labels": ["tier"]}, {"SEC_002"}),
+])
+def test_malformed_metadata_is_scanned_with_the_policy(metadata, reported):
+    policy = Policy({"rules": [{"rules": "SEC_001", "action": "disable", "namespaces": ["team"]},
+                               {"rules": "SEC_002", "action": "disable", "selector": {"tier": "web"}}]})
+    assert {rule_id for rule_id, _ in _results(_pod(**metadata), policy)} == reported
+
+
+def test_admission_ignores_the_annotation_unless_enabled(monkeypatch):
+    from k8s_analyzer.core.settings import settings
+
+    doc = _pod(annotations={IGNORE_ANNOTATION: "*"})
+    policy = Policy()
+    assert _results(doc, policy) == set()
+    assert {rule_id for rule_id, _ in _results(doc, policy.for_admission())} == {"SEC_001", "SEC_002"}
+    monkeypatch.setattr(settings, "WEBHOOK_HONOR_IGNORE_ANNOTATION", True)
+    assert policy.for_admission() is policy
@@ -0,0 +1,85 @@
+# backend/tests/test_serialize.py
+"""
+The direct serializers write byte for byte what ``json.dumps`` of the
+Pydantic report wrote: pretty (CLI), compact (API) and NDJSON lines.
+"""
+import json
+
+import pytest
+from fastapi.responses import JSONResponse
+
+from k8s_analyzer.analyzer.findings import CompactFinding, intern_meta
+from k8s_analyzer.analyzer.report import build_report
+from k8s_analyzer.analyzer.serialize import dumps_report, iter_report_json, ndjson_line
+
+MESSAGES = [
+    "plain",
+    'quotes " and backslashes \\',
+    "control \x00 \x01 \x08 \t \n \r \x1f \x7f",
+    "line separators \u2028 \u2029",
+    "non-ASCII é ü ß ✓",
+    "non-BMP 😀 𝄞 \U0010ffff",
+    "",
+]
+
+
+def _findings():
+    sec = intern_meta("SEC_001", "Privileged container detected", "HIGH")
+    odd = intern_meta("X_é", "Title with \"quotes\" and 😀", "LOW")
+    findings = [CompactFinding(sec, m, f"spec.containers[{i}]", i) for i, m in enumerate(MESSAGES)]
+    findings.append(CompactFinding(odd, "no path", None, None))
+    findings.append(CompactFinding(sec, "with position", "spec", 3, line=12, column=5))
+    return findings
+
+
+CASES = {
+    "empty": [],
+    "one": _findings()[:1],
+    "mixed": _findings(),
+}
+
+
+def _pretty(findings):
+    return json.dumps(build_report(findings).model_dump(), indent=2, ensure_ascii=False)
+
+
+def _compact(findings):
+    return JSONResponse(content=build_report(findings).model_dump()).body.decode()
+
+
+@pytest.mark.parametrize("name", CASES)
+def test_pretty_matches_json_dumps(name):
+    findings = CASES[name]
+    assert dumps_report(findings, indent=2) == _pretty(findings)
+
+
+@pytest.mark.parametrize("name", CASES)
+def test_compact_matches_json_response(name):
+    findings = CASES[name]
+    assert dumps_report(findings) == _compact(findings)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 1000])
+def test_chunks_join_to_the_same_report(chunk_size):
+    findings = _findings()
+    for indent, expected in ((2, _pretty(findings)), (None, _compact(findings))):
+        assert "".join(iter_report_json(findings, indent=indent, chunk_size=chunk_size)) == expected
+
+
+def test_ndjson_line_matches_json_dumps():
+    for f in _findings():
+        d = build_report([f]).model_dump()["findings"][0]
+        assert ndjson_line(f) == json.dumps(d, ensure_ascii=False) + "\n"
+        extra = {"file": "dir/ünï 😀.yaml", "n": 3}
+        assert ndjson_line(f, extra) == json.dumps({**d, **extra}, ensure_ascii=False) + "\n"
+
+
+def test_dict_findings_serialize_like_compact_ones():
+    findings = _findings()
+    dicts = [f.to_dict() for f in findings]
+    assert dumps_report(dicts, indent=2) == dumps_report(findings, indent=2)
+
+
+def test_other_indents_rejected():
+    with pytest.raises(ValueError):
+        dumps_report([], indent=4)
@@ -0,0 +1,76 @@
+# backend/tests/test_webhook.py
+"""Admission webhook verdicts through POST /validate."""
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from k8s_analyzer.admission.webhook_handler import NO_OBJECT_MESSAGE, admission_review_response
+from k8s_analyzer.main import app
+
+PRIVILEGED_POD = {
+    "apiVersion": "v1",
+    "kind": "Pod",
+    "metadata": {"name": "p", "namespace": "team"},
+    "spec": {"containers": [{"name": "c", "image": "nginx:1.25", "securityContext": {"privileged": True}}]},
+}
+
+
+@pytest.fixture(scope="module")
+def client():
+    return TestClient(app)
+
+
+def _review(client, request):
+    response = client.post("/validate", content=json.dumps({"request": request}))
+    assert response.status_code == 200
+    return response.json()["response"]
+
+
+@pytest.mark.parametrize("request_", [
+    {"uid": "u", "object": None},
+    {"uid": "u"},
+    {"uid": "u", "object": {}},
+    {"uid": "u", "operation": "DELETE", "object": None, "oldObject": PRIVILEGED_POD},
+    {"uid": "u", "operation": "CONNECT", "object": {"kind": "PodExecOptions"}},
+], ids=["null object", "no object", "empty object", "delete", "connect"])
+def test_nothing_to_validate_is_allowed(client, request_):
+    response = _review(client, request_)
+    assert response == {"uid": "u", "allowed": True, "status": {"message": NO_OBJECT_MESSAGE}}
+    assert admission_review_response({"request": request_})[0]["response"] == response
+
+
+def test_privileged_pod_is_denied(client):
+    for operation in ("CREATE", "UPDATE"):
+        response = _review(client, {"uid": "u", "operation": operation, "object": PRIVILEGED_POD})
+        assert response["allowed"] is False
+        assert "SEC_001" in response["status"]["message"]
+
+
+@pytest.mark.parametrize("body", [
+    '{"request": 5}',
+    '{"request": {"object": 5}}',
+    '{"request": {"object": {"metadata": 5}}}',
+    '{"request": {"object": {"metadata": {"annotations": 5}}}}',
+    '[1]',
+])
+def test_malformed_reviews_are_rejected(client, body):
+    assert client.post("/validate", content=body).status_code == 400
+
+
+def test_over_budget_reviews_are_logged_once_per_interval(monkeypatch, caplog):
+    from k8s_analyzer.admission import webhook_handler
+
+    clock = [1000.0]
+    monkeypatch.setattr(webhook_handler.time, "monotonic", lambda: clock[0])
+    latency = webhook_handler.WebhookLatency(budget_ms=5.0, warn_interval_s=60.0)
+    with caplog.at_level("WARNING", logger="webhook_handler"):
+        for elapsed_ms in (9.0, 1.0, 7.0, 12.0, 6.0):
+            latency.observe(elapsed_ms)
+        clock[0] += 60.0
+        latency.observe(8.0)
+    assert (latency.reviews, latency.over_budget, latency.max_ms) == (6, 5, 12.0)
+    assert [r.getMessage() for r in caplog.records] == [
+        "1 admission review(s) over the 5.00ms budget since the last report (slowest 9.00ms)",
+        "4 admission review(s) over the 5.00ms budget since the last report (slowest 12.00ms)",
+    ]